@@ -0,0 +1,11 @@
+"""MPStats API: client, models and CLIs for Ozon, Wildberries, Yandex Market.
+
+Single entry point (run from PRJ_ANALYTICS or with it on PYTHONPATH):
+    python -m mpstats sku 123456789 --platform wb
+    python -m mpstats category "Электроника/Смартфоны"
+    python -m mpstats limit
+    python -m mpstats startup        # startup time and import report
+
+The package imports nothing on purpose: modules are flat (client, models,
+analyze_*) and loaded by __main__ only for the requested command.
+"""
@@ -0,0 +1,47 @@
+"""python -m mpstats <command> [args] — dispatch to a CLI module.
+
+Only the module of the requested command is imported; httpx and
+python-dotenv load later, when (and if) they are needed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+COMMANDS = {
+    "sku": ("analyze_sku", "анализ товара по ID"),
+    "category": ("analyze_category", "анализ категории"),
+    "limit": ("check_limit", "проверка лимитов API"),
+    "keywords": ("analyze_keywords", "покрытие ключевых слов vs конкуренты (WB)"),
+    "sizes": ("analyze_sizes", "спрос и остатки по размерам (WB)"),
+    "monitor": ("monitor", "мониторинг цен и остатков конкурентов (только изменения)"),
+    "ym": ("explore_ym", "исследование эндпоинтов Яндекс Маркет"),
+    "daemon": ("daemon", "локальный демон: общий клиент, кэш и лимит запросов"),
+    "startup": ("startup", "время запуска CLI и отчёт по импортам"),
+}
+
+USAGE = "usage: python -m mpstats {" + ",".join(COMMANDS) + "} [args]\n\n" + "\n".join(
+    f"  {name:<10} {help_}" for name, (_, help_) in COMMANDS.items()
+)
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(USAGE)
+        sys.exit(0 if argv else 2)
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"{USAGE}\n\nmpstats: unknown command {command!r}", file=sys.stderr)
+        sys.exit(2)
+
+    # Modules import each other flat (from client import ...), as when run as scripts
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module = __import__(COMMANDS[command][0])
+    sys.argv = [f"mpstats {command}", *rest]
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
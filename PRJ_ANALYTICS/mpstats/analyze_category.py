@@ -8,6 +8,7 @@ Usage:
     uv run --with httpx,python-dotenv PRJ_ANALYTICS/mpstats/analyze_category.py "Электроника/Смартфоны"
     uv run --with httpx,python-dotenv PRJ_ANALYTICS/mpstats/analyze_category.py "Электроника" --platform wb
     uv run --with httpx,python-dotenv,openpyxl PRJ_ANALYTICS/mpstats/analyze_category.py "Электроника" --xlsx report.xlsx
+    uv run --with httpx,python-dotenv PRJ_ANALYTICS/mpstats/analyze_category.py "одеяла" --find
 """
 
 from __future__ import annotations
@@ -219,6 +220,8 @@ def main() -> None:
     parser.add_argument("--platform", choices=["oz", "wb", "ym"], default="oz", help="Маркетплейс (default: oz)")
     parser.add_argument("--days", type=int, default=30, help="Период анализа в днях (default: 30)")
     parser.add_argument("--xlsx", metavar="FILE", help="Экспорт в Excel (путь к файлу)")
+    parser.add_argument("--find", action="store_true",
+                        help="Найти категории, путь которых содержит все слова аргумента (дерево рубрикатора)")
     args = parser.parse_args()
 
     try:
@@ -227,6 +230,14 @@ def main() -> None:
         print(f"ERROR: {e}")
         sys.exit(1)
 
+    if args.find:
+        from daemon import find_categories
+
+        with client:
+            paths = find_categories(client, args.category, args.platform, limit=50)
+        print("\n".join(paths) if paths else f"Категории по запросу «{args.category}» не найдены.")
+        return
+
     d2 = datetime.now().strftime("%Y-%m-%d")
     d1 = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d")
     mp = PLATFORM_NAMES.get(args.platform, args.platform)
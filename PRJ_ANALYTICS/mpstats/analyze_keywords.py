@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Keyword coverage of our WB items against the top competitors of their categories.
+
+For every our item the category comes from the item card; the category's
+top-N items by revenue are its competitors. Keyword lists of all items are
+fetched concurrently (one shared client, rate-limited) into an inverted
+index (keywords.py), then per category:
+  - coverage: share of competitors' keyword demand our items also cover
+  - gaps: keywords several competitors rank for and none of ours has
+  - closest competitors of each our item by keyword Jaccard
+and over all items: near-duplicate keyword sets (MinHash + LSH), e.g. our
+own items cannibalising each other or competitor listing clones.
+
+Usage:
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/analyze_keywords.py 123456789 987654321
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/analyze_keywords.py --ours-file our_wb_ids.txt --top 30
+    uv run --with httpx,python-dotenv,numpy,openpyxl PRJ_ANALYTICS/mpstats/analyze_keywords.py --ours-file ids.txt --xlsx keywords.xlsx
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from client import MPStatsClient, RateLimiter, create_client, fetch_many, read_ids
+from models import CategoryProduct, ItemSummary, _fmt
+
+
+def collect(client: MPStatsClient, our_ids: list[int], top: int, d1: str, d2: str, workers: int):
+    """Our item cards and top competitors per category.
+
+    Returns (ours: {id: ItemSummary}, competitors: {category: [id]}).
+    """
+    cards = fetch_many(lambda i: client.get_item(i, platform="wb"), our_ids, workers)
+    ours = {i: ItemSummary.from_api(raw, platform="wb") for i, raw in cards.items() if raw}
+    categories = sorted({item.category for item in ours.values() if item.category})
+    listings = fetch_many(
+        lambda path: client.get_category_products(path, d1, d2, "wb", end_row=top + len(ours)),
+        categories, workers,
+    )
+    competitors = {}
+    for path, listing in listings.items():
+        rows = listing.get("data", []) if isinstance(listing, dict) else []
+        ids = [p.id for p in (CategoryProduct.from_api(r, platform="wb") for r in rows) if p.id not in ours]
+        competitors[path] = ids[:top]
+    return ours, competitors
+
+
+def analyze(index, ours: dict, competitors: dict, gaps_top: int, min_competitors: int,
+            similar: float) -> dict:
+    """Coverage, gaps and closest competitors per category; near-duplicates overall."""
+    import numpy as np
+    from keywords import MAX_BUCKET, coverage_gaps, jaccard_to_all, similar_pairs
+
+    by_category = {}
+    for path, comp_ids in competitors.items():
+        our_rows = [index.row[i] for i, item in ours.items() if item.category == path]
+        comp_rows = [index.row[i] for i in comp_ids if i in index.row]
+        cov = coverage_gaps(index, our_rows, comp_rows, min_competitors)
+        gaps = [{
+            "keyword": index.vocab[k],
+            "frequency": float(index.demand[k]),
+            "competitors": int(cov["competitors"][k]),
+            "best_position": float(cov["best_position"][k]) if np.isfinite(cov["best_position"][k]) else None,
+        } for k in cov["gaps"][:gaps_top]]
+
+        closest = []
+        comp_mask = np.zeros(len(index), dtype=bool)
+        comp_mask[comp_rows] = True
+        for row in our_rows:
+            jac = np.where(comp_mask, jaccard_to_all(index, row), -1.0)
+            best = np.argsort(-jac, kind="stable")[:3]
+            closest.append({
+                "item": index.items[row],
+                "keywords": int(index.set_size[row]),
+                "closest": [(index.items[j], float(jac[j])) for j in best if jac[j] > 0],
+            })
+        by_category[path] = {
+            "ours": len(our_rows), "competitors": len(comp_rows),
+            "coverage": float(cov["coverage"]), "covered": cov["covered"], "total": cov["total"],
+            "gaps": gaps, "closest": closest,
+        }
+
+    found, crowded = similar_pairs(index, similar)
+    pairs = [(index.items[i], index.items[j], jac) for i, j, jac in found]
+    return {"categories": by_category, "similar": pairs, "crowded": crowded, "max_bucket": MAX_BUCKET}
+
+
+def print_report(result: dict, ours: dict) -> None:
+    for path, cat in result["categories"].items():
+        print(f"\n{'=' * 70}\n  {path}\n  Наших SKU: {cat['ours']}, конкурентов: {cat['competitors']}\n{'=' * 70}")
+        print(f"Покрытие спроса конкурентов: {cat['coverage'] * 100:.0f}% "
+              f"(ключей: {cat['covered']} из {cat['total']})")
+        if cat["gaps"]:
+            print("\n--- Пробелы: ключи конкурентов, которых нет у нас ---")
+            print(f"{'#':>3}  {'Ключ':<40}{'Частота':>10}{'Конкур.':>9}{'Лучш. поз.':>11}")
+            for n, g in enumerate(cat["gaps"], 1):
+                pos = f"{g['best_position']:.0f}" if g["best_position"] is not None else "—"
+                print(f"{n:>3}  {g['keyword'][:39]:<40}{_fmt(int(g['frequency'])):>10}{g['competitors']:>9}{pos:>11}")
+        print("\n--- Ближайшие конкуренты по семантике (Jaccard) ---")
+        for c in cat["closest"]:
+            name = ours[c["item"]].name[:40] if c["item"] in ours else ""
+            near = ", ".join(f"{i} ({j:.2f})" for i, j in c["closest"]) or "нет общих ключей"
+            print(f"  {c['item']} {name} [{c['keywords']} ключей]: {near}")
+
+    pairs = result["similar"]
+    print(f"\n--- Похожие наборы ключей (все товары, MinHash + LSH): {len(pairs)} пар ---")
+    if result["crowded"]:
+        print(f"  Группы почти одинаковых наборов крупнее {result['max_bucket']} товаров: "
+              f"{result['crowded']} товаров сравнены точным Jaccard со всеми")
+    for a, b, jac in pairs[:20]:
+        mark = "  ← оба наши" if a in ours and b in ours else ""
+        print(f"  {a} ↔ {b}: {jac:.2f}{mark}")
+
+
+def export_to_xlsx(result: dict, filepath: str) -> None:
+    """Export gaps, coverage and similar pairs to Excel."""
+    import openpyxl
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Покрытие"
+    ws.append(["Категория", "Наших SKU", "Конкурентов", "Покрытие спроса, %", "Ключей покрыто", "Ключей у конкурентов"])
+    for path, cat in result["categories"].items():
+        ws.append([path, cat["ours"], cat["competitors"], round(cat["coverage"] * 100, 1), cat["covered"], cat["total"]])
+
+    ws2 = wb.create_sheet("Пробелы")
+    ws2.append(["Категория", "Ключ", "Частота", "Конкурентов с ключом", "Лучшая позиция"])
+    for path, cat in result["categories"].items():
+        for g in cat["gaps"]:
+            ws2.append([path, g["keyword"], g["frequency"], g["competitors"], g["best_position"]])
+
+    ws3 = wb.create_sheet("Похожие")
+    ws3.append(["Товар A", "Товар B", "Jaccard"])
+    for a, b, jac in result["similar"]:
+        ws3.append([a, b, round(jac, 3)])
+
+    for sheet in wb.worksheets:
+        for cell in sheet[1]:
+            cell.font = Font(bold=True)
+    wb.save(filepath)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Покрытие ключевых слов: наши SKU vs топ конкурентов категории (WB)")
+    parser.add_argument("item_ids", type=int, nargs="*", help="ID наших товаров на WB")
+    parser.add_argument("--ours-file", metavar="FILE", help="Файл с ID наших товаров (по одному в строке)")
+    parser.add_argument("--top", type=int, default=30, help="Конкурентов на категорию (топ по выручке, default: 30)")
+    parser.add_argument("--days", type=int, default=30, help="Период для топа категории, дней (default: 30)")
+    parser.add_argument("--gaps", type=int, default=20, help="Сколько пробелов показать на категорию (default: 20)")
+    parser.add_argument("--min-competitors", type=int, default=2,
+                        help="Пробел — ключ хотя бы у стольких конкурентов (default: 2)")
+    parser.add_argument("--similar", type=float, default=0.6,
+                        help="Порог Jaccard для похожих наборов ключей (default: 0.6)")
+    parser.add_argument("--workers", type=int, default=8, help="Параллельных запросов (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Запросов к API в секунду без демона (default: 5)")
+    parser.add_argument("--xlsx", metavar="FILE", help="Экспорт в Excel (путь к файлу)")
+    args = parser.parse_args()
+
+    our_ids = read_ids(args.item_ids, args.ours_file)
+    if not our_ids:
+        parser.error("нужны ID товаров: аргументами или --ours-file")
+
+    try:
+        client = create_client()
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if isinstance(client, MPStatsClient) and client.limiter is None:
+        client.limiter = RateLimiter(args.rate)
+
+    from keywords import KeywordIndex, parse_keywords      # numpy — только после разбора аргументов
+
+    d2 = datetime.now().strftime("%Y-%m-%d")
+    d1 = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+
+    with client:
+        print(f"Загрузка карточек: {len(our_ids)} товаров...")
+        ours, competitors = collect(client, our_ids, args.top, d1, d2, args.workers)
+        missing = [i for i in our_ids if i not in ours]
+        if missing:
+            print(f"Не найдены на WB: {', '.join(map(str, missing))}")
+        if not ours:
+            sys.exit(1)
+        all_ids = list(ours) + [i for ids in competitors.values() for i in ids]
+        print(f"Категорий: {len(competitors)}, загрузка ключей: {len(set(all_ids))} товаров...")
+        raw = fetch_many(client.get_item_keywords, all_ids, args.workers)
+
+    index = KeywordIndex({i: parse_keywords(r) for i, r in raw.items()})
+    empty = int((index.set_size == 0).sum())
+    print(f"Индекс: {len(index.vocab)} ключей, {len(index.kw)} вхождений"
+          + (f", без ключей: {empty} товаров" if empty else ""))
+
+    result = analyze(index, ours, competitors, args.gaps, args.min_competitors, args.similar)
+    print_report(result, ours)
+
+    if args.xlsx:
+        export_to_xlsx(result, args.xlsx)
+        print(f"\nExcel-отчёт сохранён: {args.xlsx}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Size-level demand and stock of a batch of WB items (by_size endpoint).
+
+by_size data of all items is fetched concurrently (one shared client,
+rate-limited) into one (item, size, date) table (sizes.py); then, for all
+items at once:
+  - size curve: share of each size in the item's sales
+  - stockout rate: share of days a size had zero balance
+  - recommended size mix: demand per in-stock day, so sizes that ran out
+    are not understated the way they are in the sales curve
+  - current stock mix, days of cover and what to order for --cover days
+Bedding sets (1.5-сп / 2-сп / Евро, 160×200 / 180×200) are normalized to
+one size column across items.
+
+Usage:
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/analyze_sizes.py 123456789 987654321
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/analyze_sizes.py --ids-file bedding_wb_ids.txt --days 60
+    uv run --with httpx,python-dotenv,numpy,openpyxl PRJ_ANALYTICS/mpstats/analyze_sizes.py --ids-file ids.txt --xlsx sizes.xlsx
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from client import MPStatsClient, RateLimiter, create_client, fetch_many, read_ids
+from models import _fmt
+
+
+def order_plan(metrics: dict, cover: int):
+    """Units to order per item × size to hold `cover` days of demand."""
+    import numpy as np
+
+    return np.ceil(np.maximum(metrics["rate"] * cover - metrics["balance"], 0) * metrics["offered"])
+
+
+def print_grid(table, metrics: dict) -> None:
+    """Pooled size grid over all items."""
+    pooled = metrics["pooled"]
+    print(f"\n{'=' * 78}\n  Размерная сетка: {len(table.items)} товаров, {len(table.sizes)} размеров\n{'=' * 78}")
+    print(f"{'Размер':<14}{'Товаров':>8}{'Продажи':>10}{'Доля':>7}{'Нет в нал.':>11}"
+          f"{'Реком.':>8}{'Сток':>7}{'Δ, п.п.':>9}")
+    for j, size in enumerate(table.sizes):
+        delta = (pooled["stock_mix"][j] - pooled["recommended"][j]) * 100
+        print(f"{size[:13]:<14}{int(pooled['items'][j]):>8}{_fmt(int(pooled['sales'][j])):>10}"
+              f"{pooled['curve'][j] * 100:>6.0f}%{pooled['stockout'][j] * 100:>10.0f}%"
+              f"{pooled['recommended'][j] * 100:>7.0f}%{pooled['stock_mix'][j] * 100:>6.0f}%{delta:>+9.1f}")
+    print("Реком. — доля спроса на день в наличии; Δ — сток минус рекомендация (минус — недозатарено)")
+
+
+def print_items(table, metrics: dict, plan, show: int) -> None:
+    """Per-item size tables for the top items by sales."""
+    import numpy as np
+
+    totals = metrics["sales"].sum(1)
+    top = np.argsort(-totals, kind="stable")[:show]
+    print(f"\n--- Товары: топ {len(top)} по продажам ---")
+    for i in top:
+        print(f"\n  {table.items[i]}: продажи {_fmt(int(totals[i]))}")
+        print(f"  {'Размер':<14}{'Продажи':>9}{'Доля':>7}{'Нет в нал.':>11}{'Реком.':>8}"
+              f"{'Остаток':>9}{'Дней запаса':>13}{'Дозаказ':>9}")
+        for j in np.flatnonzero(metrics["offered"][i]):
+            cover = metrics["cover_days"][i, j]
+            cover = "—" if not np.isfinite(cover) else f"{cover:.0f}"
+            print(f"  {table.sizes[j][:13]:<14}{_fmt(int(metrics['sales'][i, j])):>9}"
+                  f"{metrics['curve'][i, j] * 100:>6.0f}%{metrics['stockout'][i, j] * 100:>10.0f}%"
+                  f"{metrics['recommended'][i, j] * 100:>7.0f}%{_fmt(int(metrics['balance'][i, j])):>9}"
+                  f"{cover:>13}{_fmt(int(plan[i, j])):>9}")
+
+
+def print_risks(table, metrics: dict, stockout: float, min_cover: int) -> None:
+    """Item × size cells that run out often or will run out soon."""
+    import numpy as np
+
+    risky = metrics["offered"] & (metrics["rate"] > 0) & (
+        (metrics["stockout"] >= stockout) | (metrics["cover_days"] < min_cover))
+    cells = np.argwhere(risky)
+    print(f"\n--- Риск дефицита: нет в наличии ≥ {stockout * 100:.0f}% дней "
+          f"или запаса < {min_cover} дн. — {len(cells)} позиций ---")
+    cells = sorted(cells, key=lambda c: -metrics["rate"][c[0], c[1]])
+    for i, j in cells[:30]:
+        print(f"  {table.items[i]} {table.sizes[j]}: нет в наличии {metrics['stockout'][i, j] * 100:.0f}% дней, "
+              f"запас {metrics['cover_days'][i, j]:.0f} дн., спрос {metrics['rate'][i, j]:.1f} шт./день")
+
+
+def export_to_xlsx(table, metrics: dict, plan, filepath: str) -> None:
+    """Export the pooled grid and item × size rows to Excel."""
+    import numpy as np
+    import openpyxl
+    from openpyxl.styles import Font
+
+    pooled = metrics["pooled"]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Сетка"
+    ws.append(["Размер", "Товаров", "Продажи", "Доля продаж, %", "Нет в наличии, % дней",
+               "Рекомендуемый микс, %", "Сток, %"])
+    for j, size in enumerate(table.sizes):
+        ws.append([size, int(pooled["items"][j]), float(pooled["sales"][j]),
+                   round(pooled["curve"][j] * 100, 1), round(pooled["stockout"][j] * 100, 1),
+                   round(pooled["recommended"][j] * 100, 1), round(pooled["stock_mix"][j] * 100, 1)])
+
+    ws2 = wb.create_sheet("Товары")
+    ws2.append(["Товар", "Размер", "Дней", "Дней без остатка", "Продажи", "Доля продаж, %",
+                "Спрос, шт./день", "Рекомендуемый микс, %", "Остаток", "Дней запаса", "Дозаказ"])
+    for i, j in np.argwhere(metrics["offered"]):
+        cover = metrics["cover_days"][i, j]
+        ws2.append([table.items[i], table.sizes[j], int(metrics["days"][i, j]), int(metrics["out_days"][i, j]),
+                    float(metrics["sales"][i, j]), round(metrics["curve"][i, j] * 100, 1),
+                    round(float(metrics["rate"][i, j]), 2), round(metrics["recommended"][i, j] * 100, 1),
+                    float(metrics["balance"][i, j]), round(float(cover), 1) if np.isfinite(cover) else None,
+                    int(plan[i, j])])
+
+    for sheet in wb.worksheets:
+        for cell in sheet[1]:
+            cell.font = Font(bold=True)
+    wb.save(filepath)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Спрос и остатки по размерам (WB by_size)")
+    parser.add_argument("item_ids", type=int, nargs="*", help="ID товаров на WB")
+    parser.add_argument("--ids-file", metavar="FILE", help="Файл с ID товаров (по одному в строке)")
+    parser.add_argument("--days", type=int, default=30, help="Период анализа, дней (default: 30)")
+    parser.add_argument("--cover", type=int, default=30, help="Дозаказ до запаса на N дней (default: 30)")
+    parser.add_argument("--stockout", type=float, default=0.3,
+                        help="Риск: доля дней без остатка от (default: 0.3)")
+    parser.add_argument("--min-cover", type=int, default=7, help="Риск: запаса меньше N дней (default: 7)")
+    parser.add_argument("--show", type=int, default=10, help="Сколько товаров показать подробно (default: 10)")
+    parser.add_argument("--workers", type=int, default=8, help="Параллельных запросов (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Запросов к API в секунду без демона (default: 5)")
+    parser.add_argument("--xlsx", metavar="FILE", help="Экспорт в Excel (путь к файлу)")
+    args = parser.parse_args()
+
+    item_ids = read_ids(args.item_ids, args.ids_file)
+    if not item_ids:
+        parser.error("нужны ID товаров: аргументами или --ids-file")
+
+    try:
+        client = create_client()
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if isinstance(client, MPStatsClient) and client.limiter is None:
+        client.limiter = RateLimiter(args.rate)
+
+    from sizes import SizeTable, parse_by_size, size_metrics      # numpy — только после разбора аргументов
+
+    d2 = datetime.now().strftime("%Y-%m-%d")
+    d1 = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+
+    with client:
+        print(f"Загрузка данных по размерам: {len(item_ids)} товаров, {d1} — {d2}...")
+        raw = fetch_many(lambda i: client.get_item_by_size(i, d1, d2), item_ids, args.workers)
+
+    rows = {i: parse_by_size(r) for i, r in raw.items()}
+    missing = [i for i, r in rows.items() if not r]
+    if missing:
+        print(f"Нет данных по размерам: {', '.join(map(str, missing[:20]))}"
+              + (f" и ещё {len(missing) - 20}" if len(missing) > 20 else ""))
+    table = SizeTable({i: r for i, r in rows.items() if r})
+    if not table.items:
+        sys.exit(1)
+
+    metrics = size_metrics(table)
+    plan = order_plan(metrics, args.cover)
+    print(f"Таблица: {len(table)} строк (товар × размер × день)")
+
+    print_grid(table, metrics)
+    print_items(table, metrics, plan, args.show)
+    print_risks(table, metrics, args.stockout, args.min_cover)
+    print(f"\nДозаказ до запаса на {args.cover} дн.: {_fmt(int(plan.sum()))} шт.")
+
+    if args.xlsx:
+        export_to_xlsx(table, metrics, plan, args.xlsx)
+        print(f"\nExcel-отчёт сохранён: {args.xlsx}")
+
+
+if __name__ == "__main__":
+    main()
@@ -97,7 +97,7 @@ def export_to_xlsx(item: ItemSummary, niche: NicheContext | None, filepath: str)
         ("Цена", item.final_price),
         ("Цена без скидки", item.price),
         ("Скидка %", item.discount),
-        ("Рейтинг", round(item.rating, 1)),
+        ("Рейтинг", None if item.rating is None else round(item.rating, 1)),
         ("Отзывов", item.reviews_count),
         ("Остаток", item.balance),
     ]
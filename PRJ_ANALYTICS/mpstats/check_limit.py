@@ -7,6 +7,7 @@ Usage:
 
 from __future__ import annotations
 
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -18,6 +19,8 @@ from client import create_client
 
 
 def main() -> None:
+    argparse.ArgumentParser(description="Проверка лимитов MPStats API").parse_args()
+
     try:
         client = create_client()
     except ValueError as e:
@@ -4,21 +4,53 @@ Usage:
     from client import MPStatsClient
     client = MPStatsClient(api_key="...")
     item = client.get_item(123456, platform="oz")
+
+httpx (~60 ms to import) is imported on the first request, not with this
+module, so CLI startup, --help and argument errors stay cheap.
 """
 
 from __future__ import annotations
 
 import logging
 import os
+import threading
 import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import httpx
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
 PLATFORMS = ("oz", "wb", "ym")
 
 
+class RateLimiter:
+    """Thread-safe pacing of upstream requests: at most `rate` per second.
+
+    One limiter shared by every thread of a client (daemon, concurrent
+    fetchers) keeps them all inside a single quota budget.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.requests = 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next request slot is free."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            self.requests += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class MPStatsClient:
     """Sync client for MPStats API with retry and rate-limit handling.
 
@@ -30,14 +62,24 @@ class MPStatsClient:
         api_key: str,
         base_url: str = "https://mpstats.io/api",
         timeout: float = 30.0,
+        transport: httpx.BaseTransport | None = None,
+        limiter: RateLimiter | None = None,
     ):
+        """transport — custom httpx transport (e.g. httpx.MockTransport for
+        offline runs and benchmarks); None means real network.
+        limiter — RateLimiter applied to every attempt, retries included.
+        """
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.transport = transport
+        self.limiter = limiter
         self._client: httpx.Client | None = None
 
     def _get_client(self) -> httpx.Client:
         if self._client is None or self._client.is_closed:
+            import httpx
+
             self._client = httpx.Client(
                 base_url=self.base_url,
                 headers={
@@ -45,6 +87,7 @@ class MPStatsClient:
                     "Content-Type": "application/json",
                 },
                 timeout=self.timeout,
+                transport=self.transport,
             )
         return self._client
 
@@ -68,12 +111,16 @@ class MPStatsClient:
         max_retries: int = 3,
     ) -> dict | list | None:
         """Make HTTP request with retry and rate-limit handling."""
+        import httpx
+
         client = self._get_client()
         backoff = 1.0
 
         for attempt in range(1, max_retries + 1):
             try:
                 logger.debug("MPStats %s /%s (attempt %d)", method, endpoint, attempt)
+                if self.limiter is not None:
+                    self.limiter.wait()
 
                 if method == "GET":
                     resp = client.get(f"/{endpoint}", params=params or {})
@@ -120,6 +167,18 @@ class MPStatsClient:
 
         return None
 
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: dict | None = None,
+        json_body: dict | None = None,
+        max_retries: int = 3,
+    ) -> dict | list | None:
+        """Raw call of any endpoint (e.g. probing undocumented ones), same retries as get_*."""
+        return self._request(method, endpoint, params=params, json_body=json_body, max_retries=max_retries)
+
     @staticmethod
     def _check_platform(platform: str) -> None:
         if platform not in PLATFORMS:
@@ -159,9 +218,10 @@ class MPStatsClient:
         """GET /wb/get/item/{id}/seo (WB only)."""
         return self._request("GET", f"wb/get/item/{item_id}/seo")
 
-    def get_item_by_size(self, item_id: int) -> list | None:
-        """GET /wb/get/item/{id}/by_size (WB only)."""
-        return self._request("GET", f"wb/get/item/{item_id}/by_size")
+    def get_item_by_size(self, item_id: int, d1: str | None = None, d2: str | None = None) -> list | None:
+        """GET /wb/get/item/{id}/by_size (WB only). d1/d2 — period, API default if omitted."""
+        params = {"d1": d1, "d2": d2} if d1 and d2 else None
+        return self._request("GET", f"wb/get/item/{item_id}/by_size", params=params)
 
     # ── Category endpoints ─────────────────────────────────────────
 
@@ -314,12 +374,56 @@ class MPStatsClient:
         return self._request("GET", "user/report_api_limit")
 
 
-def create_client() -> MPStatsClient:
-    """Create MPStatsClient from .env file. Raises ValueError if key missing."""
-    from dotenv import load_dotenv
+def fetch_many(fetch, keys, workers: int = 8) -> dict:
+    """Call fetch(key) for every distinct key concurrently; returns {key: result}.
+
+    The threads share one client: httpx.Client pools connections, and the
+    client's RateLimiter (or the daemon's) keeps the total rate in budget.
+    Failed requests come back as None, like single calls.
+    """
+    keys = list(dict.fromkeys(keys))
+    if workers <= 1 or len(keys) <= 1:
+        return {key: fetch(key) for key in keys}
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(keys))) as pool:
+        return dict(zip(keys, pool.map(fetch, keys)))
+
+
+def read_ids(ids: list[int], path: str | None = None) -> list[int]:
+    """Item IDs from arguments and a file (one per line, # comments allowed), deduplicated."""
+    out = list(ids)
+    if path:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                out.append(int(line))
+    return list(dict.fromkeys(out))
+
+
+def create_client(use_daemon: bool = True) -> MPStatsClient:
+    """Create MPStatsClient from the environment or .env file. Raises ValueError if key missing.
+
+    If the local daemon (daemon.py) is running, returns its thin client
+    instead: same get_* methods, shared cache and quota, no API key needed.
+    MPSTATS_NO_DAEMON=1 or use_daemon=False forces a direct client.
+
+    .env is read only when MPSTATS_API_KEY is not already set, so shell loops
+    with an exported key skip python-dotenv entirely.
+    """
+    if use_daemon and os.getenv("MPSTATS_NO_DAEMON") != "1":
+        from daemon import DaemonClient
+
+        remote = DaemonClient.connect()
+        if remote is not None:
+            return remote
 
-    load_dotenv()
     api_key = os.getenv("MPSTATS_API_KEY")
+    if not api_key:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv("MPSTATS_API_KEY")
     if not api_key:
         raise ValueError(
             "MPSTATS_API_KEY not found in environment. "
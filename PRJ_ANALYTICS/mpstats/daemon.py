@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""Local MPStats daemon: one warm client shared by every CLI run.
+
+The daemon keeps in memory what each CLI run used to build and throw away:
+the httpx connection pool (TLS sessions), a rate limiter (one quota budget
+for all callers), a TTL response cache and the category tree index. It
+serves them over a Unix socket (mode 0600), one JSON object per line in
+both directions; a connection may carry many calls:
+    → {"method": "get_item", "args": [123], "kwargs": {"platform": "wb"}}
+    ← {"ok": true, "result": {...}, "cached": false}
+    ← {"ok": false, "error": "ValueError", "message": "..."}
+Callable remotely: every get_* of MPStatsClient and request() (raw endpoint).
+
+create_client() returns DaemonClient whenever the socket answers, so the
+CLIs become thin clients: the client side of this module is stdlib-only and
+needs neither httpx nor the API key. MPSTATS_NO_DAEMON=1 bypasses the daemon.
+
+Usage:
+    python -m mpstats daemon                   # foreground, Ctrl+C to stop
+    python -m mpstats daemon --rate 5 --ttl 900 &
+    python -m mpstats daemon --status
+    python -m mpstats daemon --stop
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from client import MPStatsClient
+
+SOCKET_ENV = "MPSTATS_SOCKET"
+DEFAULT_RATE = 5.0           # upstream requests per second, all callers together
+DEFAULT_TTL = 600            # seconds a response stays fresh
+CACHE_MAX = 10_000           # cached responses (LRU beyond that)
+# Per-method TTL: the rubricator changes rarely, limits must always be live
+TTL = {"get_categories_tree": 24 * 3600, "get_api_limit": 0}
+
+
+def socket_path() -> str:
+    """$MPSTATS_SOCKET or $TMPDIR/mpstats-<uid>.sock."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(
+        os.environ.get("TMPDIR", "/tmp"), f"mpstats-{os.getuid()}.sock")
+
+
+# ── Client side (stdlib only) ─────────────────────────────────────
+
+
+def _open_socket(path: str) -> socket.socket | None:
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(1.0)
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)           # upstream calls with retries may take a while
+    return sock
+
+
+class DaemonClient:
+    """Thin client with the same get_* methods and request() as MPStatsClient.
+
+    Thread-safe like MPStatsClient: each thread gets its own connection, so
+    fetch_many() runs concurrently through the daemon too.
+    """
+
+    def __init__(self, sock: socket.socket, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._local.file = sock.makefile("rwb")
+        self._open = [(sock, self._local.file)]
+
+    @classmethod
+    def connect(cls, path: str | None = None) -> DaemonClient | None:
+        """Connect to a running daemon; None if there is none (or a stale socket)."""
+        path = path or socket_path()
+        sock = _open_socket(path)
+        return cls(sock, path) if sock is not None else None
+
+    def _file(self):
+        file = getattr(self._local, "file", None)
+        if file is None:
+            sock = _open_socket(self.path)
+            if sock is None:
+                raise ConnectionError(f"MPStats daemon is not available on {self.path}")
+            file = self._local.file = sock.makefile("rwb")
+            with self._lock:
+                self._open.append((sock, file))
+        return file
+
+    def call(self, method: str, *args, **kwargs):
+        file = self._file()
+        file.write(json.dumps({"method": method, "args": args, "kwargs": kwargs},
+                              ensure_ascii=False).encode() + b"\n")
+        file.flush()
+        line = file.readline()
+        if not line:
+            raise ConnectionError("MPStats daemon closed the connection")
+        reply = json.loads(line)
+        if reply["ok"]:
+            return reply["result"]
+        if reply["error"] == "ValueError":
+            raise ValueError(reply["message"])
+        raise RuntimeError(f"MPStats daemon: {reply['error']}: {reply['message']}")
+
+    def __getattr__(self, name: str):
+        if name in MPStatsDaemon.PASSTHROUGH:
+            return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    def request(self, method: str, endpoint: str, *, params: dict | None = None,
+                json_body: dict | None = None, max_retries: int = 3):
+        """Raw endpoint call through the daemon (shared quota and cache), like MPStatsClient.request."""
+        return self.call("request", method, endpoint, params=params, json_body=json_body,
+                         max_retries=max_retries)
+
+    def find_categories(self, query: str, platform: str = "oz", limit: int = 20) -> list[str]:
+        return self.call("find_categories", query, platform, limit)
+
+    def stats(self) -> dict:
+        return self.call("stats")
+
+    def shutdown(self) -> None:
+        self.call("shutdown")
+
+    def close(self) -> None:
+        with self._lock:
+            for sock, file in self._open:
+                file.close()
+                sock.close()
+            self._open.clear()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CategoryIndex:
+    """Category tree flattened to paths for word search."""
+
+    def __init__(self, tree: list | dict | None):
+        self.paths = sorted(set(_tree_paths(tree)))
+        self._lower = [p.lower() for p in self.paths]
+
+    def find(self, query: str, limit: int = 20) -> list[str]:
+        """Paths containing every word of the query (case-insensitive)."""
+        words = query.lower().split()
+        found = [p for p, low in zip(self.paths, self._lower) if all(w in low for w in words)]
+        return found[:limit]
+
+
+def _tree_paths(node):
+    """Paths of a rubricator: flat list of {"path": ...} or nested children."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _tree_paths(child)
+    elif isinstance(node, dict):
+        path = node.get("path") or node.get("name")
+        if isinstance(path, str) and path:
+            yield path
+        for key in ("children", "nodes", "categories"):
+            if key in node:
+                yield from _tree_paths(node[key])
+
+
+def find_categories(client, query: str, platform: str = "oz", limit: int = 20) -> list[str]:
+    """Search the category tree: daemon's warm index or a one-off fetch."""
+    if isinstance(client, DaemonClient):
+        return client.find_categories(query, platform, limit)
+    return CategoryIndex(client.get_categories_tree(platform)).find(query, limit)
+
+
+# ── Server side ───────────────────────────────────────────────────
+
+
+class ResponseCache:
+    """TTL + LRU cache of API responses; concurrent misses of one key fetch once."""
+
+    def __init__(self, max_entries: int = CACHE_MAX):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()       # key → (expires, value)
+        self._inflight = {}              # key → Lock of the thread fetching it
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get_or_fetch(self, key: str, ttl: float, fetch) -> tuple[object, bool]:
+        """(value, cached). None results (404, exhausted retries) are not cached."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry:
+                return entry[1], True
+            fetching = self._inflight.setdefault(key, threading.Lock())
+        with fetching:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry:
+                    return entry[1], True
+                self.misses += 1
+            try:
+                value = fetch()
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+            if ttl > 0 and value is not None:
+                with self._lock:
+                    self._data[key] = (time.monotonic() + ttl, value)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.max_entries:
+                        self._data.popitem(last=False)
+        return value, False
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MPStatsDaemon:
+    """Dispatch of daemon calls to a shared MPStatsClient through the cache."""
+
+    SERVICE = ("find_categories", "stats", "shutdown", "ping")
+    PASSTHROUGH = {name for name in dir(MPStatsClient) if name.startswith("get_")} | {"request"}
+
+    def __init__(self, client, ttl: float = DEFAULT_TTL, cache_max: int = CACHE_MAX):
+        self.client = client
+        self.ttl = ttl
+        self.cache = ResponseCache(cache_max)
+        self.started = time.time()
+        self.calls = 0
+        self._indexes = {}               # platform → (tree, CategoryIndex)
+
+    def handle(self, request: dict) -> dict:
+        method = request.get("method", "")
+        args, kwargs = request.get("args", []), request.get("kwargs", {})
+        self.calls += 1
+        try:
+            if method in self.SERVICE:
+                result, cached = getattr(self, method)(*args, **kwargs), False
+            elif method in self.PASSTHROUGH and callable(getattr(self.client, method, None)):
+                result, cached = self.fetch(method, args, kwargs)
+            else:
+                raise ValueError(f"unknown method {method!r}")
+        except Exception as exc:
+            return {"ok": False, "error": type(exc).__name__, "message": str(exc)}
+        return {"ok": True, "result": result, "cached": cached}
+
+    def fetch(self, method: str, args: list, kwargs: dict):
+        key = json.dumps([method, args, kwargs], sort_keys=True, ensure_ascii=False)
+        return self.cache.get_or_fetch(key, TTL.get(method, self.ttl),
+                                       lambda: getattr(self.client, method)(*args, **kwargs))
+
+    def find_categories(self, query: str, platform: str = "oz", limit: int = 20) -> list[str]:
+        tree, _ = self.fetch("get_categories_tree", [platform], {})
+        cached = self._indexes.get(platform)
+        if cached is None or cached[0] is not tree:          # кэш дерева обновился — переиндексировать
+            cached = self._indexes[platform] = (tree, CategoryIndex(tree))
+        return cached[1].find(query, limit)
+
+    def stats(self) -> dict:
+        limiter = getattr(self.client, "limiter", None)
+        return {
+            "uptime_s": round(time.time() - self.started),
+            "calls": self.calls,
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "upstream_requests": limiter.requests if limiter else None,
+            "rate_per_s": limiter.rate if limiter else None,
+            "category_indexes": {p: len(index.paths) for p, (_, index) in self._indexes.items()},
+        }
+
+    def ping(self) -> str:
+        return "pong"
+
+    def shutdown(self) -> None:
+        """Handled by the server loop after the reply is sent."""
+
+
+def serve(daemon: MPStatsDaemon, path: str | None = None) -> None:
+    """Serve daemon calls on a Unix socket until shutdown / Ctrl+C / SIGTERM."""
+    import signal
+    import socketserver
+
+    path = path or socket_path()
+    if os.path.exists(path):
+        live = DaemonClient.connect(path)
+        if live is not None:
+            live.close()
+            raise RuntimeError(f"daemon already running on {path}")
+        os.unlink(path)                  # stale socket of a killed daemon
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                except ValueError as exc:
+                    request, reply = {}, {"ok": False, "error": "ValueError", "message": f"bad request: {exc}"}
+                else:
+                    reply = daemon.handle(request)
+                self.wfile.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                self.wfile.flush()
+                if request.get("method") == "shutdown":
+                    threading.Thread(target=server.shutdown).start()
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    umask = os.umask(0o177)              # сокет только для владельца: квота API — его
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(umask)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Локальный демон MPStats: общий клиент, кэш и лимит запросов")
+    parser.add_argument("--socket", default=None, help=f"Путь к Unix-сокету (default: ${SOCKET_ENV} или {socket_path()})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Запросов к API в секунду на всех клиентов (default: {DEFAULT_RATE:g})")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL,
+                        help=f"Время жизни ответа в кэше, с (default: {DEFAULT_TTL}; дерево категорий — сутки)")
+    parser.add_argument("--status", action="store_true", help="Показать статистику запущенного демона")
+    parser.add_argument("--stop", action="store_true", help="Остановить запущенный демон")
+    args = parser.parse_args()
+    path = args.socket or socket_path()
+
+    if args.status or args.stop:
+        remote = DaemonClient.connect(path)
+        if remote is None:
+            print(f"Демон не запущен ({path})")
+            sys.exit(1)
+        with remote:
+            if args.stop:
+                remote.shutdown()
+                print("Демон остановлен")
+            else:
+                print(json.dumps(remote.stats(), indent=2, ensure_ascii=False))
+        return
+
+    from client import RateLimiter, create_client
+
+    try:
+        client = create_client(use_daemon=False)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    client.limiter = RateLimiter(args.rate)
+
+    print(f"MPStats daemon: {path} (rate {args.rate:g}/s, ttl {args.ttl:g}s)", flush=True)
+    with client:
+        try:
+            serve(MPStatsDaemon(client, ttl=args.ttl), path)
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    print("MPStats daemon: stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,7 @@ def probe_endpoint(
     """Test a single endpoint and return result info."""
     print(f"  [{method}] /{endpoint} — {desc}...", end=" ", flush=True)
     try:
-        result = client._request(method, endpoint, params=params, max_retries=1)
+        result = client.request(method, endpoint, params=params, max_retries=1)
         if result is not None:
             rtype = type(result).__name__
             size = len(result) if isinstance(result, (list, dict)) else 0
@@ -61,7 +61,7 @@ def probe_item(client: MPStatsClient, item_id: int) -> None:
     for method, endpoint, params, desc in item_endpoints:
         result = probe_endpoint(client, method, endpoint, params, desc)
         if result["status"] == "OK":
-            data = client._request(method, endpoint, params=params, max_retries=1)
+            data = client.request(method, endpoint, params=params, max_retries=1)
             print(f"    Preview: {json.dumps(data, ensure_ascii=False)[:200]}...")
 
 
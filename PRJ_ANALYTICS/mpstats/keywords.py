@@ -0,0 +1,315 @@
+"""Keyword coverage and overlap of WB items (MPStats item keywords endpoint).
+
+Building blocks for analyze_keywords.py:
+    parse_keywords(raw)    — API response → [(keyword, position, frequency)]
+    KeywordIndex           — inverted index keyword → items as CSR numpy
+                             arrays (item, position, frequency per posting)
+    coverage_gaps()        — keywords competitors rank for and we do not
+    jaccard_to_all()       — exact Jaccard of one item to every item through
+                             the index: only items sharing a keyword are
+                             touched, no all-pairs loop
+    minhash_signatures()   — MinHash signatures, k universal hashes (numpy)
+    similar_pairs()        — all-vs-all overlap over thousands of items:
+                             LSH banding of signatures → candidates → exact
+                             Jaccard for candidates only; members of buckets
+                             over MAX_BUCKET (clusters of near-identical
+                             sets) get exact Jaccard to all items instead
+
+Position: lower is better (1 — top of search), 0 — not ranked.
+Keyword ids (and so signatures) are local to one KeywordIndex.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+WORD_KEYS = ("word", "keyword", "text", "query")
+POSITION_KEYS = ("avgPos", "avg_pos", "position", "pos")
+FREQUENCY_KEYS = ("wb_count", "count", "frequency", "freq", "total")
+
+PRIME = (1 << 31) - 1        # MinHash: (a·x + b) mod p, a·x < 2^62 fits uint64
+BLOCK_ELEMS = 1 << 22        # MinHash: elements of one (postings × hashes) block
+MAX_BUCKET = 1000            # LSH: larger buckets are not expanded to pairs — exact Jaccard per member
+LSH_RECALL = 0.95            # LSH: chance that a pair exactly at the threshold becomes a candidate
+
+
+# ── Parsing ───────────────────────────────────────────────────────
+
+
+def _first(info: dict, keys: tuple):
+    for key in keys:
+        if info.get(key) is not None:
+            return info[key]
+    return None
+
+
+def _position(value) -> float:
+    """Position or positions by day → best ranked position, 0 if not ranked."""
+    if isinstance(value, list):
+        ranked = [v for v in value if isinstance(v, (int, float)) and v > 0]
+        return float(min(ranked)) if ranked else 0.0
+    return float(value) if isinstance(value, (int, float)) and value > 0 else 0.0
+
+
+def parse_keywords(raw) -> list[tuple[str, float, float]]:
+    """MPStats keywords response → [(keyword, position, frequency)].
+
+    Accepts {"words": {kw: {...}}}, {kw: {...}} and [{"word": kw, ...}];
+    keywords are lowercased with whitespace collapsed, duplicates keep the
+    best position and the highest frequency.
+    """
+    if isinstance(raw, dict) and isinstance(raw.get("words"), (dict, list)):
+        raw = raw["words"]
+    if isinstance(raw, dict):
+        entries = raw.items()
+    elif isinstance(raw, list):
+        entries = [(_first(e, WORD_KEYS), e) for e in raw if isinstance(e, dict)]
+    else:
+        return []
+
+    best = {}
+    for keyword, info in entries:
+        if not isinstance(keyword, str) or not keyword.strip():
+            continue
+        keyword = " ".join(keyword.lower().split())
+        if isinstance(info, dict):
+            position = _position(_first(info, POSITION_KEYS))
+            frequency = _first(info, FREQUENCY_KEYS)
+        else:                                   # {keyword: frequency}
+            position, frequency = 0.0, info
+        frequency = float(frequency) if isinstance(frequency, (int, float)) else 0.0
+        if keyword in best:
+            prev_pos, prev_freq = best[keyword]
+            if not position or (prev_pos and prev_pos < position):
+                position = prev_pos
+            frequency = max(frequency, prev_freq)
+        best[keyword] = (position, frequency)
+    return [(kw, pos, freq) for kw, (pos, freq) in best.items()]
+
+
+# ── Inverted index ────────────────────────────────────────────────
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenated np.arange(s, e) for all pairs, without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return np.arange(total) + offsets
+
+
+class KeywordIndex:
+    """Inverted index keyword → items, as CSR numpy arrays.
+
+    vocab[k] is keyword k; its postings are [indptr[k]:indptr[k + 1]] of
+    item (row in items), position and frequency. item_kw[item_ptr[i]:
+    item_ptr[i + 1]] — sorted keyword ids of item i (the transposed view,
+    for set operations). demand[k] — highest frequency seen for keyword k.
+    """
+
+    def __init__(self, keywords_by_item: dict):
+        self.items = list(keywords_by_item)
+        self.row = {item: i for i, item in enumerate(self.items)}
+        kw_id = {}
+        item_col, kw_col, pos_col, freq_col = [], [], [], []
+        for row, entries in enumerate(keywords_by_item.values()):
+            for keyword, position, frequency in entries:
+                item_col.append(row)
+                kw_col.append(kw_id.setdefault(keyword, len(kw_id)))
+                pos_col.append(position)
+                freq_col.append(frequency)
+        self.vocab = list(kw_id)
+        self.kw_id = kw_id
+
+        item = np.array(item_col, dtype=np.int64)
+        kw = np.array(kw_col, dtype=np.int64)
+        position = np.array(pos_col, dtype=np.float64)
+        frequency = np.array(freq_col, dtype=np.float64)
+
+        order = np.lexsort((item, kw))
+        self.kw, self.item = kw[order], item[order]
+        self.position, self.frequency = position[order], frequency[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(kw, minlength=len(self.vocab)))])
+
+        by_item = np.lexsort((kw, item))
+        self.item_kw = kw[by_item]
+        self.item_ptr = np.concatenate([[0], np.cumsum(np.bincount(item, minlength=len(self.items)))])
+        self.set_size = np.diff(self.item_ptr)
+
+        self.demand = (np.maximum.reduceat(self.frequency, self.indptr[:-1])
+                       if len(self.vocab) else np.zeros(0))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def keywords_of(self, row: int) -> np.ndarray:
+        return self.item_kw[self.item_ptr[row]:self.item_ptr[row + 1]]
+
+    def postings(self, keyword: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(item rows, positions, frequencies) of a keyword."""
+        k = self.kw_id.get(keyword)
+        if k is None:
+            empty = np.zeros(0)
+            return empty.astype(np.int64), empty, empty
+        sl = slice(self.indptr[k], self.indptr[k + 1])
+        return self.item[sl], self.position[sl], self.frequency[sl]
+
+    def _mask(self, rows) -> np.ndarray:
+        mask = np.zeros(len(self.items), dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+
+# ── Coverage ──────────────────────────────────────────────────────
+
+
+def coverage_gaps(index: KeywordIndex, ours, competitors, min_competitors: int = 2) -> dict:
+    """Keyword coverage of our items against competitors (rows of index).
+
+    Gap — a keyword at least min_competitors competitors have and none of
+    ours does; gaps are ranked by demand × share of competitors with it.
+    coverage — share of competitor keyword demand that we also cover.
+    Returns dict: gaps (keyword ids, best first), competitors (count per
+    keyword), best_position (best competitor position, inf if unranked),
+    score, coverage, covered / total (competitor keywords we have / all).
+    """
+    n_vocab = len(index.vocab)
+    ours_post = index._mask(ours)[index.item]
+    comp_post = index._mask(competitors)[index.item]
+    kw_ours = np.bincount(index.kw[ours_post], minlength=n_vocab)
+    kw_comp = np.bincount(index.kw[comp_post], minlength=n_vocab)
+
+    ranked = np.where(comp_post & (index.position > 0), index.position, np.inf)
+    best_position = np.minimum.reduceat(ranked, index.indptr[:-1]) if n_vocab else np.zeros(0)
+
+    score = index.demand * kw_comp / max(len(competitors), 1)
+    gap = np.flatnonzero((kw_ours == 0) & (kw_comp >= min_competitors))
+    gap = gap[np.lexsort((gap, -score[gap]))]
+
+    theirs = kw_comp > 0
+    both = theirs & (kw_ours > 0)
+    demand_total = index.demand[theirs].sum()
+    return {
+        "gaps": gap,
+        "competitors": kw_comp,
+        "best_position": best_position,
+        "score": score,
+        "coverage": index.demand[both].sum() / demand_total if demand_total > 0 else 0.0,
+        "covered": int(both.sum()),
+        "total": int(theirs.sum()),
+    }
+
+
+# ── Overlap ───────────────────────────────────────────────────────
+
+
+def jaccard_to_all(index: KeywordIndex, row: int) -> np.ndarray:
+    """Exact Jaccard of item `row` to every item (including itself).
+
+    Intersections are counted over the postings of the item's own keywords,
+    so the cost is the number of those postings, not the number of items.
+    """
+    kws = index.keywords_of(row)
+    if len(kws) == 0:
+        return np.zeros(len(index.items))
+    postings = _ranges(index.indptr[kws], index.indptr[kws + 1])
+    inter = np.bincount(index.item[postings], minlength=len(index.items))
+    union = index.set_size[row] + index.set_size - inter
+    return np.divide(inter, union, out=np.zeros(len(index.items)), where=union > 0)
+
+
+def minhash_signatures(index: KeywordIndex, k: int = 128, seed: int = 0) -> np.ndarray:
+    """(items, k) MinHash signatures; items without keywords get PRIME in every slot."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, k, dtype=np.uint64)
+    b = rng.integers(0, PRIME, k, dtype=np.uint64)
+    x = index.item_kw.astype(np.uint64)
+    sig = np.full((len(index.items), k), PRIME, dtype=np.uint64)
+    nonempty = index.set_size > 0
+    if not nonempty.any():
+        return sig
+    starts = index.item_ptr[:-1][nonempty]
+    step = max(1, BLOCK_ELEMS // max(len(x), 1))
+    for j in range(0, k, step):
+        h = (x[:, None] * a[None, j:j + step] + b[None, j:j + step]) % PRIME
+        sig[nonempty, j:j + step] = np.minimum.reduceat(h, starts, axis=0)
+    return sig
+
+
+def lsh_params(k: int, threshold: float, recall: float = LSH_RECALL) -> tuple[int, int]:
+    """(bands, rows), bands · rows ≤ k: the most rows per band (fewest false
+    candidates) for which a pair with Jaccard = threshold still becomes a
+    candidate with probability ≥ recall: 1 − (1 − t^r)^b."""
+    for rows in range(k, 0, -1):
+        bands = k // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return k, 1
+
+
+def lsh_candidates(sig: np.ndarray, bands: int, rows: int, valid: np.ndarray | None = None,
+                   max_bucket: int = MAX_BUCKET) -> tuple[np.ndarray, np.ndarray]:
+    """((P, 2) candidate pairs i < j that share a bucket in at least one band,
+    rows of buckets larger than max_bucket).
+
+    A bucket of m members is m·(m − 1)/2 candidates; over max_bucket its
+    members are returned separately instead, for a per-row exact pass.
+    """
+    ids = np.flatnonzero(valid) if valid is not None else np.arange(len(sig))
+    pairs, crowded = [], []
+    for band in range(bands):
+        chunk = np.ascontiguousarray(sig[ids, band * rows:(band + 1) * rows])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+        _, bucket = np.unique(keys, return_inverse=True)
+        order = np.argsort(bucket.reshape(-1), kind="stable")
+        sorted_bucket = bucket.reshape(-1)[order]
+        starts = np.flatnonzero(np.concatenate([[True], sorted_bucket[1:] != sorted_bucket[:-1]]))
+        sizes = np.diff(np.concatenate([starts, [len(order)]]))
+        for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            members = ids[order[start:start + size]]
+            if size > max_bucket:
+                crowded.append(members)
+                continue
+            i, j = np.triu_indices(size, 1)
+            pairs.append(np.stack([members[i], members[j]], axis=1))
+    crowded = np.unique(np.concatenate(crowded)) if crowded else np.zeros(0, dtype=np.int64)
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64), crowded
+    return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0), crowded
+
+
+def similar_pairs(index: KeywordIndex, threshold: float = 0.5, k: int = 128, seed: int = 0,
+                  max_bucket: int = MAX_BUCKET) -> tuple[list[tuple[int, int, float]], int]:
+    """(pairs of items (rows) with keyword Jaccard ≥ threshold, most similar
+    first; number of items compared exactly to all items).
+
+    MinHash + LSH gives candidates in ~O(items · k); exact Jaccard is then
+    computed for candidates only. Pairs below the LSH threshold may be missed
+    with small probability — the usual MinHash trade-off. Items from buckets
+    over max_bucket (e.g. a thousand cloned listings) are not expanded to
+    candidate pairs: each gets jaccard_to_all, so their pairs are exact.
+    """
+    valid = index.set_size > 0
+    if valid.sum() < 2:
+        return [], 0
+    sig = minhash_signatures(index, k, seed)
+    bands, rows = lsh_params(k, threshold)
+    candidates, crowded = lsh_candidates(sig, bands, rows, valid, max_bucket)
+    is_crowded = index._mask(crowded)
+    found = []
+    for i, j in candidates.tolist():
+        if is_crowded[i] or is_crowded[j]:
+            continue                            # found by the exact pass below
+        inter = len(np.intersect1d(index.keywords_of(i), index.keywords_of(j), assume_unique=True))
+        jaccard = inter / (index.set_size[i] + index.set_size[j] - inter)
+        if jaccard >= threshold:
+            found.append((i, j, float(jaccard)))
+    for i in crowded.tolist():
+        jac = jaccard_to_all(index, i)
+        # a pair of two crowded items is taken once, from its smaller row
+        others = np.flatnonzero((jac >= threshold) & ~(is_crowded & (np.arange(len(jac)) <= i)))
+        found.extend((min(i, j), max(i, j), float(jac[j])) for j in others.tolist())
+    found.sort(key=lambda p: (-p[2], p[0], p[1]))
+    return found, len(crowded)
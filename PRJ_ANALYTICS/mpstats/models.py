@@ -8,8 +8,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 
-def _fmt(n: float | int) -> str:
-    """Format number with space thousands separator."""
+def _fmt(n: float | int | None) -> str:
+    """Format number with space thousands separator (None — "—")."""
+    if n is None:
+        return "—"
     if isinstance(n, float):
         if n == int(n):
             n = int(n)
@@ -18,6 +20,20 @@ def _fmt(n: float | int) -> str:
     return f"{n:,}".replace(",", " ")
 
 
+def _rating(raw: float | None) -> float | None:
+    """API rating on a 0–5 or 0–500 scale → 0–5 (None if missing)."""
+    if raw is None:
+        return None
+    return raw / 100 if raw > 10 else raw
+
+
+def _first(item: dict, *keys: str) -> int | None:
+    """First non-zero of the fields, 0 if they are all zero, None if all are missing."""
+    values = [item.get(k) for k in keys]
+    present = [v for v in values if v is not None]
+    return next((v for v in present if v), present[0] if present else None)
+
+
 PLATFORM_NAMES = {"oz": "Ozon", "wb": "Wildberries", "ym": "Яндекс Маркет"}
 
 
@@ -35,11 +51,12 @@ class ItemSummary:
     seller: str
     seller_id: int | None
     category: str
-    final_price: float
-    price: float
-    rating: float
-    reviews_count: int
-    balance: int
+    # None — the field is missing from the API response (not zero)
+    final_price: float | None
+    price: float | None
+    rating: float | None
+    reviews_count: int | None
+    balance: int | None
     # OZ-specific
     delivery_scheme: str = ""
     discount: int = 0
@@ -58,7 +75,6 @@ class ItemSummary:
     @classmethod
     def _from_oz(cls, data: dict) -> ItemSummary:
         item = data.get("item", data)
-        raw_rating = item.get("rating", 0) or 0
         return cls(
             platform="oz",
             id=item.get("id", 0),
@@ -67,11 +83,11 @@ class ItemSummary:
             seller=item.get("seller", ""),
             seller_id=item.get("seller_id") or item.get("supplier_id"),
             category=item.get("category", ""),
-            final_price=item.get("final_price", 0),
-            price=item.get("price", 0),
-            rating=raw_rating / 100 if raw_rating > 10 else raw_rating,
-            reviews_count=item.get("comments", 0),
-            balance=item.get("balance", 0),
+            final_price=item.get("final_price"),
+            price=item.get("price"),
+            rating=_rating(item.get("rating")),
+            reviews_count=item.get("comments"),
+            balance=item.get("balance"),
             delivery_scheme=item.get("delivery_scheme", "FBO"),
             discount=item.get("discount", 0),
         )
@@ -79,7 +95,6 @@ class ItemSummary:
     @classmethod
     def _from_wb(cls, data: dict) -> ItemSummary:
         item = data.get("item", data)
-        raw_rating = item.get("rating", 0) or 0
         return cls(
             platform="wb",
             id=item.get("id", 0),
@@ -88,11 +103,11 @@ class ItemSummary:
             seller=item.get("seller", "") or item.get("supplier", ""),
             seller_id=item.get("supplier_id"),
             category=item.get("category", ""),
-            final_price=item.get("final_price", 0),
-            price=item.get("price", 0),
-            rating=raw_rating / 100 if raw_rating > 10 else raw_rating,
-            reviews_count=item.get("feedbacks", 0) or item.get("comments", 0),
-            balance=item.get("balance", 0),
+            final_price=item.get("final_price"),
+            price=item.get("price"),
+            rating=_rating(item.get("rating")),
+            reviews_count=_first(item, "feedbacks", "comments"),
+            balance=item.get("balance"),
             pics_count=item.get("pics", 0),
         )
 
@@ -100,7 +115,6 @@ class ItemSummary:
     def _from_generic(cls, data: dict, platform: str) -> ItemSummary:
         """Fallback parser for unknown platforms (YM etc)."""
         item = data.get("item", data)
-        raw_rating = item.get("rating", 0) or 0
         return cls(
             platform=platform,
             id=item.get("id", 0),
@@ -109,11 +123,11 @@ class ItemSummary:
             seller=item.get("seller", ""),
             seller_id=item.get("seller_id") or item.get("supplier_id"),
             category=item.get("category", ""),
-            final_price=item.get("final_price", 0),
-            price=item.get("price", 0),
-            rating=raw_rating / 100 if raw_rating > 10 else raw_rating,
-            reviews_count=item.get("comments", 0) or item.get("feedbacks", 0),
-            balance=item.get("balance", 0),
+            final_price=item.get("final_price"),
+            price=item.get("price"),
+            rating=_rating(item.get("rating")),
+            reviews_count=_first(item, "comments", "feedbacks"),
+            balance=item.get("balance"),
         )
 
     def format(self) -> str:
@@ -139,7 +153,7 @@ class ItemSummary:
         lines.extend([
             "",
             "--- Рейтинг и отзывы ---",
-            f"Рейтинг:  {self.rating:.1f} / 5.0",
+            f"Рейтинг:  {'—' if self.rating is None else f'{self.rating:.1f}'} / 5.0",
             f"Отзывов:  {_fmt(self.reviews_count)}",
         ])
 
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Competitor price and stock monitor: a scheduled job that emits only changes.
+
+Every run polls the watchlist through the bulk path (fetch_many, one
+rate-limited client or the daemon), hashes each item's monitored fields
+and compares the hashes with the current-state file. Only rows whose hash
+changed are appended to the snapshot log, and only those rows are turned
+into events, so disk and downstream work grow with the number of changes,
+not with the size of the watchlist; the history itself is never re-read.
+A field the API did not return is stored as missing and gives no event.
+
+Store (--store, default mpstats/monitor/):
+    snapshots.<platform>.v1.bin — append-only log of 42-byte records
+                       (snapshots.py), one per marketplace: item ids of
+                       oz, wb and ym overlap, so a shared log would mix
+                       their states. The first run writes every item,
+                       later runs only changed and new ones
+    current.<platform>.v1.bin — the last record of every item, same
+                       format, rewritten atomically after each run; if it
+                       is lost, it is rebuilt once from the log
+    events.jsonl     — append-only events of all marketplaces, one JSON
+                       per line with its platform: price, stockout,
+                       restock, rating
+    .<platform>.lock — keeps overlapping cron runs of one marketplace out
+
+Usage:
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/monitor.py --ids-file competitors.txt --platform wb
+    uv run --with httpx,python-dotenv,numpy PRJ_ANALYTICS/mpstats/monitor.py --ids-file competitors.txt --price-threshold 0.05
+    uv run --with numpy PRJ_ANALYTICS/mpstats/monitor.py --history 123456789 --platform wb
+
+Cron (every 30 minutes; with the daemon running, keep the interval above its --ttl):
+    */30 * * * * cd /path/to/repo/PRJ_ANALYTICS && uv run --with httpx,python-dotenv,numpy python -m mpstats monitor --ids-file /path/to/competitors.txt --platform wb >> /var/log/mpstats-monitor.log 2>&1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from client import MPStatsClient, RateLimiter, create_client, fetch_many, read_ids
+
+DEFAULT_STORE = Path(__file__).parent / "monitor"
+EVENTS_NAME = "events.jsonl"
+
+
+def log_name(platform: str) -> str:
+    return f"snapshots.{platform}.v1.bin"
+
+
+def state_name(platform: str) -> str:
+    return f"current.{platform}.v1.bin"
+
+
+def format_event(event: dict, names: dict) -> str:
+    name = names.get(event["item"], "")[:40]
+    head = f"  {event['item']} {name}".rstrip()
+    if event["type"] == "price":
+        return f"{head}: цена {event['old']:.0f} → {event['new']:.0f} ({event['change'] * 100:+.1f}%)"
+    if event["type"] == "stockout":
+        return f"{head}: закончился (остаток был {event['old']:.0f})"
+    if event["type"] == "restock":
+        return f"{head}: снова в наличии, остаток {event['new']:.0f}"
+    return f"{head}: рейтинг {event['old']:.2f} → {event['new']:.2f}"
+
+
+def print_history(store: Path, item: int, platform: str) -> None:
+    from snapshots import MISSING, RECORD, read_log
+
+    def cell(r, field: str, width: int, spec: str = "") -> str:
+        value = r[field]
+        missing = value != value if RECORD[field].kind == "f" else value == MISSING     # NaN / MISSING
+        return f"{'—':>{width}}" if missing else f"{value:>{width}{spec}}"
+
+    log_path = store / log_name(platform)
+    log = read_log(log_path)
+    rows = log[log["item"] == item]
+    if not len(rows):
+        print(f"Товара {item} нет в журнале ({log_path})")
+        return
+    print(f"{'Время':<20}{'Цена':>10}{'До скидки':>11}{'Скидка':>8}{'Рейтинг':>9}{'Отзывы':>8}{'Остаток':>9}")
+    for r in rows:
+        when = datetime.fromtimestamp(int(r["ts"])).strftime("%Y-%m-%d %H:%M")
+        print(f"{when:<20}{cell(r, 'final_price', 10, '.0f')}{cell(r, 'price', 11, '.0f')}"
+              f"{cell(r, 'discount', 8)}{cell(r, 'rating', 9, '.2f')}{cell(r, 'reviews', 8)}"
+              f"{cell(r, 'balance', 9)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Мониторинг цен и остатков конкурентов: только изменения")
+    parser.add_argument("item_ids", type=int, nargs="*", help="ID товаров")
+    parser.add_argument("--ids-file", metavar="FILE", help="Файл со списком наблюдения (ID по одному в строке)")
+    parser.add_argument("--platform", choices=["oz", "wb", "ym"], default="oz", help="Маркетплейс (default: oz)")
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE, help=f"Каталог журнала (default: {DEFAULT_STORE})")
+    parser.add_argument("--price-threshold", type=float, default=0.03,
+                        help="Событие цены при изменении от доли (default: 0.03)")
+    parser.add_argument("--rating-drop", type=float, default=0.1,
+                        help="Событие рейтинга при падении от (default: 0.1)")
+    parser.add_argument("--workers", type=int, default=8, help="Параллельных запросов (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Запросов к API в секунду без демона (default: 5)")
+    parser.add_argument("--history", type=int, metavar="ID", help="Показать историю товара из журнала и выйти")
+    parser.add_argument("--quiet", action="store_true", help="Не печатать события (только сводка)")
+    args = parser.parse_args()
+
+    if args.history is not None:
+        print_history(args.store, args.history, args.platform)
+        return
+
+    item_ids = read_ids(args.item_ids, args.ids_file)
+    if not item_ids:
+        parser.error("нужен список наблюдения: ID аргументами или --ids-file")
+
+    import fcntl
+
+    args.store.mkdir(parents=True, exist_ok=True)
+    lock = open(args.store / f".{args.platform}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print(f"Предыдущий запуск ещё идёт ({args.store}, {args.platform})", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        client = create_client()
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if isinstance(client, MPStatsClient) and client.limiter is None:
+        client.limiter = RateLimiter(args.rate)
+
+    from models import ItemSummary
+    from snapshots import (append_log, detect_events, diff, latest, read_log, read_state,  # numpy
+                           to_records, write_state)
+
+    t0 = time.perf_counter()
+    ts = int(time.time())
+    with client:
+        raw = fetch_many(lambda i: client.get_item(i, platform=args.platform), item_ids, args.workers)
+    items = [ItemSummary.from_api(r, platform=args.platform) for r in raw.values() if r]
+    items = [s for s in items if s.id]
+    names = {s.id: s.name for s in items}
+    fetched = time.perf_counter() - t0
+
+    log_path = args.store / log_name(args.platform)
+    state_path = args.store / state_name(args.platform)
+    state = read_state(state_path)
+    if state is None:
+        state = latest(read_log(log_path))
+    cur = to_records(items, ts)
+    changed, before, existed = diff(state, cur)
+    written = append_log(log_path, changed) if len(changed) else 0
+    events = detect_events(changed, before, existed, args.price_threshold, args.rating_drop)
+    if events:
+        stamp = datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+        lines = [json.dumps({"ts": stamp, "platform": args.platform, **event,
+                             "name": names.get(event["item"], "")}, ensure_ascii=False) + "\n" for event in events]
+        # одной записью: строки параллельного запуска другой площадки не вклиниваются
+        with open(args.store / EVENTS_NAME, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+    # последним: после сбоя до этой строки изменения найдутся снова, а не потеряются
+    write_state(state_path, state, changed)
+
+    missing = len(item_ids) - len(items)
+    print(f"[{datetime.fromtimestamp(ts):%Y-%m-%d %H:%M}] Проверено {len(items)} из {len(item_ids)} "
+          f"за {fetched:.1f} с; изменилось {int(existed.sum())}, новых {int((~existed).sum())}; "
+          f"записано {written} байт; событий {len(events)}"
+          + (f"; не получено {missing}" if missing else ""))
+    if events and not args.quiet:
+        for event in events:
+            print(format_event(event, names))
+
+
+if __name__ == "__main__":
+    main()
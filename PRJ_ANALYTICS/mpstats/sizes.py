@@ -0,0 +1,290 @@
+"""Size-level demand and stock of WB items (MPStats item by_size endpoint).
+
+Building blocks for analyze_sizes.py:
+    normalize_size(name)   — "1,5 спальное" → "1.5-сп", "160x200" → "160×200"
+    parse_by_size(raw)     — API response → [(size, date, balance, sales)]
+    SizeTable              — (item, size, date) rows as numpy columns; sales
+                             missing from the response are derived from
+                             day-to-day balance drops
+    size_metrics()         — item × size matrices in one pass over the
+                             table: size curve, stockout rate, demand rate
+                             on in-stock days, recommended size mix,
+                             current stock mix and days of cover
+
+Sales only happen while a size is in stock, so the size curve of sales
+understates sizes that ran out; the recommended mix uses the demand rate
+per in-stock day instead.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+SIZE_KEYS = ("size", "name", "size_name", "techSize", "origName")
+DATE_KEYS = ("date", "day")
+BALANCE_KEYS = ("balance", "stock", "stocks", "quantity", "qty")
+SALES_KEYS = ("sales", "orders")
+ROW_LISTS = ("data", "days", "by_date", "graph")
+
+BEDDING_ORDER = ("1-сп", "1.5-сп", "2-сп", "Евро", "Евро макси", "Семейное")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_DIMS = re.compile(r"(\d{2,3})\s*[xх×*]\s*(\d{2,3})", re.IGNORECASE)
+
+
+# ── Sizes ─────────────────────────────────────────────────────────
+
+
+@lru_cache(maxsize=4096)
+def normalize_size(name) -> str:
+    """Size label → canonical form, so one size is one column across items.
+
+    Bedding: 1-сп / 1.5-сп / 2-сп / Евро / Евро макси / Семейное
+    (a dimension in the label is dropped when the set size is named);
+    dimensions: "160 x 200" → "160×200"; anything else — trimmed as is.
+
+    The set name wins over its parts: "Семейный, 2 пододеяльника 1,5-сп" is
+    Семейное, "2-спальный с простынёй Евро" is 2-сп — Евро names the set
+    only when no N-сп is given.
+    """
+    text = " ".join(str(name).split())
+    low = text.lower().replace(",", ".")
+    if "семейн" in low or "дуэт" in low:
+        return "Семейное"
+    if "полутор" in low or re.search(r"\b1\.5\s*-?\s*сп", low):
+        return "1.5-сп"
+    if "двусп" in low or "двухсп" in low or re.search(r"\b2\s*-?\s*сп", low):
+        return "2-сп"
+    if "односп" in low or re.search(r"\b1\s*-?\s*сп", low):
+        return "1-сп"
+    if "макси" in low or "maxi" in low:
+        return "Евро макси"
+    if "евро" in low or "euro" in low:
+        return "Евро"
+    dims = _DIMS.search(low)
+    if dims:
+        return f"{dims.group(1)}×{dims.group(2)}"
+    return text
+
+
+def size_order(size: str) -> tuple:
+    """Sort key: bedding sets, then W×H by numbers, then numeric, then text."""
+    if size in BEDDING_ORDER:
+        return (0, BEDDING_ORDER.index(size), 0, "")
+    dims = _DIMS.fullmatch(size)
+    if dims:
+        return (1, int(dims.group(1)), int(dims.group(2)), "")
+    try:
+        return (2, float(size.replace(",", ".")), 0, "")
+    except ValueError:
+        return (3, 0, 0, size)
+
+
+# ── Parsing ───────────────────────────────────────────────────────
+
+
+def _first(info: dict, keys: tuple):
+    for key in keys:
+        if info.get(key) is not None:
+            return info[key]
+    return None
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else float("nan")
+
+
+def _size_rows(size, entry, days) -> list:
+    """Rows of one size: a list of daily dicts, a dict with daily lists, or {date: balance}."""
+    if isinstance(entry, dict):
+        for key in ROW_LISTS:
+            if isinstance(entry.get(key), list) and entry[key] and isinstance(entry[key][0], dict):
+                return [(size, r) for r in entry[key]]
+        balance = _first(entry, BALANCE_KEYS)
+        if isinstance(balance, list) and days:              # {"balance": [...], "sales": [...]} + общие дни
+            sales = _first(entry, SALES_KEYS)
+            sales = sales if isinstance(sales, list) else [None] * len(balance)
+            return [(size, {"date": d, "balance": b, "sales": s}) for d, b, s in zip(days, balance, sales)]
+        if entry and all(_DATE.match(str(k)) for k in entry):   # {date: balance | {...}}
+            return [(size, {"date": d, **(v if isinstance(v, dict) else {"balance": v})})
+                    for d, v in entry.items()]
+        return [(size, entry)]
+    if isinstance(entry, list):
+        return [(size, r) for r in entry if isinstance(r, dict)]
+    return []
+
+
+def parse_by_size(raw) -> list[tuple[str, str, float, float]]:
+    """MPStats by_size response → [(size, date, balance, sales)].
+
+    Accepts flat daily rows ([{size, date, balance, sales}]), rows grouped
+    by size ([{size, data: [...]}] or {size: [...]}), per-size daily lists
+    with a shared {"days": [...]}, and date-keyed {date: {size: balance}}.
+    Sizes are normalized (normalize_size); rows without a date or a size
+    are dropped; missing sales are NaN (SizeTable derives them).
+    """
+    days = None
+    if isinstance(raw, dict):
+        days = raw.get("days") or raw.get("dates")
+        days = days if isinstance(days, list) and days and not isinstance(days[0], dict) else None
+        for key in ("sizes", "data", "items"):
+            if isinstance(raw.get(key), (dict, list)):
+                raw = raw[key]
+                break
+
+    pairs = []                                              # (size | None, row dict)
+    if isinstance(raw, dict):
+        if raw and all(_DATE.match(str(k)) for k in raw):   # {date: {size: balance | {...}}}
+            for date, sizes in raw.items():
+                if isinstance(sizes, dict):
+                    for size, v in sizes.items():
+                        pairs.append((size, {"date": date, **(v if isinstance(v, dict) else {"balance": v})}))
+        else:
+            for size, entry in raw.items():
+                pairs.extend(_size_rows(size, entry, days))
+    elif isinstance(raw, list):
+        for entry in raw:
+            if not isinstance(entry, dict):
+                continue
+            size = _first(entry, SIZE_KEYS)
+            if _first(entry, DATE_KEYS) is None:            # {size, data: [...]} — группа по размеру
+                pairs.extend(_size_rows(size, entry, days))
+            else:
+                pairs.append((None, entry))
+
+    out = []
+    for size, row in pairs:
+        size = size if size is not None else _first(row, SIZE_KEYS)
+        date = _first(row, DATE_KEYS)
+        if size is None or str(size).strip() == "" or date is None or not _DATE.match(str(date)):
+            continue
+        out.append((normalize_size(size), str(date)[:10],
+                    _number(_first(row, BALANCE_KEYS)), _number(_first(row, SALES_KEYS))))
+    return out
+
+
+# ── Columnar table ────────────────────────────────────────────────
+
+
+class SizeTable:
+    """(item, size, date) rows as numpy columns, sorted by item, size, date.
+
+    item / size — indices into items / sizes (sizes in size_order), date —
+    datetime64[D]. Duplicate (item, size, date) rows keep the last one.
+    Balance NaN — unknown (not counted as a stockout). Sales NaN in the
+    response are replaced by the day-to-day balance drop of the same
+    item × size (restocks count as 0, the first day of a series as 0).
+    """
+
+    def __init__(self, rows_by_item: dict):
+        self.items = list(rows_by_item)
+        self.row = {item: i for i, item in enumerate(self.items)}
+        self.sizes = sorted({r[0] for rows in rows_by_item.values() for r in rows}, key=size_order)
+        size_id = {s: i for i, s in enumerate(self.sizes)}
+
+        n = sum(len(rows) for rows in rows_by_item.values())
+        item = np.repeat(np.arange(len(self.items)), [len(rows) for rows in rows_by_item.values()])
+        flat = [r for rows in rows_by_item.values() for r in rows]
+        size = np.fromiter((size_id[r[0]] for r in flat), dtype=np.int64, count=n)
+        date = np.array([r[1] for r in flat], dtype="datetime64[D]").reshape(n)
+        balance = np.fromiter((r[2] for r in flat), dtype=np.float64, count=n)
+        sales = np.fromiter((r[3] for r in flat), dtype=np.float64, count=n)
+
+        key = item * max(len(self.sizes), 1) + size
+        order = np.lexsort((np.arange(n), date, key))
+        key, date = key[order], date[order]
+        last = np.ones(n, dtype=bool)                       # дубликаты дня — последняя строка
+        last[:-1] = (key[1:] != key[:-1]) | (date[1:] != date[:-1])
+        order, key, date = order[last], key[last], date[last]
+
+        self.item, self.size, self.date = item[order], size[order], date
+        self.balance, sales = balance[order], sales[order]
+        same = np.zeros(len(key), dtype=bool)
+        same[1:] = key[1:] == key[:-1]
+        drop = np.zeros(len(key))
+        drop[1:] = self.balance[:-1] - self.balance[1:]
+        derived = np.where(same & (drop > 0), drop, 0.0)
+        self.sales = np.where(np.isnan(sales), derived, sales)
+        self.key = key
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.items), len(self.sizes)
+
+
+# ── Metrics ───────────────────────────────────────────────────────
+
+
+def _share(matrix: np.ndarray) -> np.ndarray:
+    """Row-normalized matrix (rows summing to 0 stay 0)."""
+    total = matrix.sum(axis=-1, keepdims=True)
+    return np.divide(matrix, total, out=np.zeros_like(matrix), where=total > 0)
+
+
+def size_metrics(table: SizeTable) -> dict:
+    """Item × size matrices and pooled (all items) vectors over sizes.
+
+    offered   — the item has this size in the data
+    days / out_days — observed days / days with zero balance
+    sales, curve — units sold and share of the item's sales
+    stockout  — out_days / days
+    rate      — sales per in-stock day; a size never in stock gets the
+                pooled share of the item's known demand
+    recommended — rate mix: the size mix that follows demand
+    balance, stock_mix — last known balance and its mix
+    cover_days — balance / rate
+    pooled    — the same over all items (sums, then shares)
+    """
+    n_items, n_sizes = table.shape
+    cells = n_items * n_sizes
+
+    def per_cell(weights=None) -> np.ndarray:
+        return np.bincount(table.key, weights=weights, minlength=cells).reshape(n_items, n_sizes).astype(np.float64)
+
+    known = ~np.isnan(table.balance)
+    out = known & (table.balance <= 0)
+    days = per_cell(known.astype(np.float64))
+    out_days = per_cell(out.astype(np.float64))
+    in_days = days - out_days
+    sales = per_cell(table.sales)
+    offered = per_cell() > 0
+
+    stockout = np.divide(out_days, days, out=np.zeros_like(days), where=days > 0)
+    rate = np.divide(sales, in_days, out=np.zeros_like(sales), where=in_days > 0)
+
+    pooled_rate = _share(np.divide(sales.sum(0), in_days.sum(0), out=np.zeros(n_sizes), where=in_days.sum(0) > 0))
+    never = offered & (in_days == 0)
+    if never.any():
+        measured = offered & ~never
+        known_share = (pooled_rate * measured).sum(1, keepdims=True)
+        scale = np.divide(rate.sum(1, keepdims=True), known_share,
+                          out=np.zeros((n_items, 1)), where=known_share > 0)
+        rate = np.where(never, pooled_rate * scale, rate)
+
+    last = np.ones(len(table), dtype=bool)
+    last[:-1] = table.key[1:] != table.key[:-1]
+    last &= known
+    balance = np.zeros(cells)
+    balance[table.key[last]] = table.balance[last]
+    balance = np.maximum(balance.reshape(n_items, n_sizes), 0)
+    cover = np.divide(balance, rate, out=np.full_like(balance, np.inf), where=rate > 0)
+
+    pooled_days, pooled_out = days.sum(0), out_days.sum(0)
+    return {
+        "offered": offered, "days": days, "out_days": out_days, "sales": sales,
+        "curve": _share(sales), "stockout": stockout, "rate": rate,
+        "recommended": _share(rate), "balance": balance, "stock_mix": _share(balance),
+        "cover_days": cover,
+        "pooled": {
+            "sales": sales.sum(0), "curve": _share(sales.sum(0)),
+            "stockout": np.divide(pooled_out, pooled_days, out=np.zeros(n_sizes), where=pooled_days > 0),
+            "recommended": _share(rate.sum(0)),
+            "balance": balance.sum(0), "stock_mix": _share(balance.sum(0)),
+            "items": offered.sum(0),
+        },
+    }
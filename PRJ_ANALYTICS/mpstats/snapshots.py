@@ -0,0 +1,180 @@
+"""Compact append-only snapshots of item state and hashed-row change detection.
+
+Building blocks for monitor.py:
+    RECORD          — packed 42-byte record: time, item, prices, discount,
+                      rating, reviews, balance and a hash of those fields;
+                      a field the API did not return is stored as
+                      NaN (floats) or MISSING (ints)
+    to_records()    — ItemSummary list → record array sorted by item
+    row_hash()      — 64-bit hash of the monitored fields of every row
+    read_log() / append_log() — the snapshot log: records back to back,
+                      only ever appended to
+    latest()        — the last record of every item of a record array
+    read_state() / write_state() — current state: one record per item,
+                      rewritten atomically after every run
+    diff()          — rows whose hash changed against the current state
+    detect_events() — price moves, stock-outs, restocks, rating drops
+
+The first run writes every item; later runs append only new and changed
+rows, so the log grows with the number of changes. A run compares
+against the current-state file, not the log, so it reads and writes
+O(watchlist) whatever the length of the history. The whole comparison
+is a sorted join on item ids (searchsorted) plus a hash compare.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import os
+
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
+
+RECORD = np.dtype([
+    ("ts", "<u4"), ("item", "<i8"),
+    ("final_price", "<f4"), ("price", "<f4"), ("discount", "<i2"),
+    ("rating", "<f4"), ("reviews", "<i4"), ("balance", "<i4"),
+    ("hash", "<u8"),
+])
+FIELDS = ("final_price", "price", "discount", "rating", "reviews", "balance")
+MISSING = -1        # integer field absent from the API response (floats use NaN)
+
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+# ── Records and hashes ────────────────────────────────────────────
+
+
+def row_hash(rec: np.ndarray) -> np.ndarray:
+    """64-bit hash of the monitored fields of every row (FNV-1a over 8-byte words).
+
+    Works on the stored (float32 / int) values, so a hash recomputed from
+    the log matches the one computed at fetch time.
+    """
+    fields = repack_fields(rec[list(FIELDS)])
+    width = fields.dtype.itemsize
+    raw = np.zeros((len(rec), -(-width // 8) * 8), dtype=np.uint8)
+    raw[:, :width] = fields.view(np.uint8).reshape(len(rec), width)
+    h = np.full(len(rec), FNV_OFFSET, dtype=np.uint64)
+    for word in raw.view("<u8").T:
+        h = (h ^ word) * FNV_PRIME
+    return h ^ (h >> np.uint64(29))
+
+
+def to_records(items: list, ts: int) -> np.ndarray:
+    """ItemSummary list → records sorted by item, hashes filled in."""
+    rec = np.zeros(len(items), dtype=RECORD)
+    rec["ts"] = ts
+    rec["item"] = [s.id for s in items]
+
+    def column(attr: str, missing: float) -> list:
+        return [missing if getattr(s, attr) is None else getattr(s, attr) for s in items]
+
+    rec["final_price"] = column("final_price", np.nan)
+    rec["price"] = column("price", np.nan)
+    rec["discount"] = column("discount", MISSING)
+    rec["rating"] = column("rating", np.nan)
+    rec["reviews"] = column("reviews_count", MISSING)
+    rec["balance"] = column("balance", MISSING)
+    rec["hash"] = row_hash(rec)
+    return rec[np.argsort(rec["item"], kind="stable")]
+
+
+# ── Log ───────────────────────────────────────────────────────────
+
+
+def read_log(path: Path) -> np.ndarray:
+    """All records of the snapshot log (a torn last record is ignored)."""
+    if not path.exists():
+        return np.zeros(0, dtype=RECORD)
+    data = path.read_bytes()
+    return np.frombuffer(data[:len(data) - len(data) % RECORD.itemsize], dtype=RECORD)
+
+
+def append_log(path: Path, rec: np.ndarray) -> int:
+    """Append records, returns bytes written. A torn tail left by a crashed run is cut first."""
+    size = path.stat().st_size if path.exists() else 0
+    with open(path, "ab") as f:
+        if size % RECORD.itemsize:
+            f.truncate(size - size % RECORD.itemsize)
+        f.write(rec.astype(RECORD, copy=False).tobytes())
+    return rec.nbytes
+
+
+def latest(log: np.ndarray) -> np.ndarray:
+    """The last record of every item, sorted by item."""
+    rev = log[::-1]
+    _, first = np.unique(rev["item"], return_index=True)
+    return rev[first]
+
+
+def read_state(path: Path) -> np.ndarray | None:
+    """Current-state records sorted by item; None if the file does not exist yet."""
+    if not path.exists():
+        return None
+    return np.frombuffer(path.read_bytes(), dtype=RECORD)
+
+
+def write_state(path: Path, state: np.ndarray, changed: np.ndarray) -> np.ndarray:
+    """Fold changed rows into the state and replace the file atomically; returns the new state."""
+    state = latest(np.concatenate([state, changed])) if len(changed) else state
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(state.astype(RECORD, copy=False).tobytes())
+    os.replace(tmp, path)
+    return state
+
+
+# ── Changes ───────────────────────────────────────────────────────
+
+
+def diff(prev: np.ndarray, cur: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Rows of cur that are new or whose hash changed against prev (both sorted by item).
+
+    Returns (changed rows of cur, previous rows aligned with them — for new
+    items the row itself, mask of rows that existed before).
+    """
+    if len(prev) == 0:
+        return cur, cur, np.zeros(len(cur), dtype=bool)
+    pos = np.minimum(np.searchsorted(prev["item"], cur["item"]), len(prev) - 1)
+    before = prev[pos]
+    existed = before["item"] == cur["item"]
+    changed = ~existed | (before["hash"] != cur["hash"])
+    before = np.where(existed, before, cur)
+    return cur[changed], before[changed], existed[changed]
+
+
+def detect_events(new: np.ndarray, old: np.ndarray, existed: np.ndarray,
+                  price_threshold: float = 0.03, rating_drop: float = 0.1) -> list[dict]:
+    """Events over changed rows (new items give none).
+
+    price — final price moved by at least price_threshold (share);
+    stockout / restock — balance went to zero / back above zero;
+    rating — rating fell by at least rating_drop.
+    A field missing on either side (NaN / MISSING) gives no event, so a
+    response without the balance is not a stock-out.
+    """
+    new, old = new[existed], old[existed]
+    old_price = old["final_price"].astype(np.float64)
+    new_price = new["final_price"].astype(np.float64)
+    priced = (old_price > 0) & np.isfinite(new_price)
+    move = np.divide(new_price - old_price, old_price, out=np.zeros(len(new)), where=priced)
+    stocked = (old["balance"] != MISSING) & (new["balance"] != MISSING)
+    old_rating = old["rating"].astype(np.float64)
+    new_rating = new["rating"].astype(np.float64)
+    checks = (
+        ("price", priced & (np.abs(move) >= price_threshold - 1e-9), "final_price"),
+        ("stockout", stocked & (old["balance"] > 0) & (new["balance"] <= 0), "balance"),
+        ("restock", stocked & (old["balance"] <= 0) & (new["balance"] > 0), "balance"),
+        ("rating", np.isfinite(old_rating) & (new_rating <= old_rating - rating_drop + 1e-6), "rating"),
+    )
+    events = []
+    for kind, mask, field in checks:
+        for i in np.flatnonzero(mask):
+            event = {"type": kind, "item": int(new["item"][i]),
+                     "old": round(float(old[field][i]), 2), "new": round(float(new[field][i]), 2)}
+            if kind == "price":
+                event["change"] = round(float(move[i]), 4)
+            events.append(event)
+    return events
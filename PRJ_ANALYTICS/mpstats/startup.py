@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Measure CLI startup against a time budget and report the slowest imports.
+
+Startup is interpreter start + imports + argument parsing, measured as
+`python -m mpstats <command> --help` in a fresh process (median of N runs).
+The bare interpreter (`python -c pass`) is measured the same way and
+subtracted: the budget applies to our own per-invocation overhead.
+The import report comes from `python -X importtime` and lists the slowest
+modules each command imports, minus what the interpreter loads anyway.
+
+Usage:
+    python -m mpstats startup
+    python -m mpstats startup --runs 20 --budget-ms 100 --top 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET_MS = 100
+CLI_COMMANDS = ("sku", "category", "limit", "keywords", "sizes", "monitor")
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))   # PRJ_ANALYTICS
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (PACKAGE_ROOT, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def wall_ms(args: list[str], runs: int) -> float:
+    """Median wall time of `python <args>` in a fresh process, ms."""
+    env = _env()
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def import_times(args: list[str]) -> list[tuple[str, int, float]]:
+    """[(module, nesting level, cumulative ms)] from `python -X importtime <args>`.
+
+    Order is importtime's: a module's own imports come right before it.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True, env=_env())
+    out = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():          # строка заголовка
+            continue
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        out.append((name.strip(), level, int(cumulative) / 1000))
+    return out
+
+
+def slowest_imports(command: str, baseline: set[str], top: int) -> list[tuple[str, float]]:
+    """Slowest imports of a command: top-level modules, expanded one level down
+    (the command module itself is just the sum of its imports)."""
+    found, children = [], []
+    for name, level, ms in import_times(["-m", "mpstats", command, "--help"]):
+        if level == 1:
+            children.append((name, ms))
+        elif level == 0:
+            if name not in baseline:
+                found.extend(children or [(name, ms)])
+            children = []
+    return sorted(found, key=lambda item: -item[1])[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время запуска CLI mpstats и отчёт по импортам")
+    parser.add_argument("--runs", type=int, default=10, help="Запусков на команду (медиана, default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help=f"Бюджет на запуск сверх интерпретатора, мс (default: {BUDGET_MS})")
+    parser.add_argument("--top", type=int, default=6, help="Сколько самых медленных импортов показать")
+    args = parser.parse_args()
+
+    interpreter = wall_ms(["-c", "pass"], args.runs)
+    baseline = {name for name, _, _ in import_times(["-c", "pass"])}
+    print(f"Интерпретатор (python -c pass): {interpreter:.0f} мс — в бюджет не входит\n")
+    print(f"{'Команда':<10}{'Всего, мс':>11}{'Наше, мс':>10}{'Бюджет':>8}")
+
+    over = []
+    reports = {}
+    for command in CLI_COMMANDS:
+        total = wall_ms(["-m", "mpstats", command, "--help"], args.runs)
+        own = total - interpreter
+        status = "OK" if own <= args.budget_ms else "ПРЕВЫШЕН"
+        if own > args.budget_ms:
+            over.append(command)
+        print(f"{command:<10}{total:>11.0f}{own:>10.0f}{args.budget_ms:>8.0f}  {status}")
+        reports[command] = slowest_imports(command, baseline, args.top)
+
+    print("\nСамые медленные импорты (кумулятивно, мс):")
+    for command, modules in reports.items():
+        print(f"  {command:<10}" + ", ".join(f"{name} {ms:.1f}" for name, ms in modules))
+
+    deferred = {name: ms for name, level, ms in import_times(["-c", "import httpx, dotenv"]) if level == 0}
+    print(f"\nОтложено до первого запроса: httpx {deferred.get('httpx', 0):.0f} мс; "
+          f"python-dotenv {deferred.get('dotenv', 0):.0f} мс — только если MPSTATS_API_KEY нет в окружении")
+
+    if over:
+        print(f"\nБюджет {args.budget_ms:.0f} мс превышен: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
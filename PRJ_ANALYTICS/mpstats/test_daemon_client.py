@@ -0,0 +1,105 @@
+"""DaemonClient must cover every client attribute the CLIs use.
+
+create_client() hands out DaemonClient whenever the daemon is running, so a
+CLI calling something the daemon does not proxy breaks only in that mode.
+
+Run:
+    python -m pytest PRJ_ANALYTICS/mpstats/test_daemon_client.py -q
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE))
+
+from client import MPStatsClient  # noqa: E402
+from daemon import DaemonClient, MPStatsDaemon, serve  # noqa: E402
+
+# Used only after isinstance(client, MPStatsClient): the daemon applies its own limit
+DIRECT_ONLY = {"limiter"}
+NOT_CLIS = {"client.py", "daemon.py", "models.py", "__init__.py", "__main__.py"}
+
+
+def client_attributes() -> dict[str, set[str]]:
+    """{module: attributes accessed as client.<name>} over the CLI modules."""
+    found = {}
+    for path in sorted(HERE.glob("*.py")):
+        if path.name in NOT_CLIS or path.name.startswith("test_"):
+            continue
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        names = {node.attr for node in ast.walk(tree)
+                 if isinstance(node, ast.Attribute)
+                 and isinstance(node.value, ast.Name) and node.value.id == "client"}
+        if names:
+            found[path.name] = names
+    return found
+
+
+def test_cli_client_attributes_exist_on_daemon_client():
+    assert client_attributes(), "no CLI uses client.<attr> — the scan is broken"
+    missing = {}
+    for module, names in client_attributes().items():
+        for name in names - DIRECT_ONLY:
+            if not (hasattr(DaemonClient, name) or name in MPStatsDaemon.PASSTHROUGH):
+                missing.setdefault(module, []).append(name)
+            elif not hasattr(MPStatsClient, name):
+                missing.setdefault(module, []).append(f"{name} (нет у MPStatsClient)")
+    assert not missing, missing
+
+
+def test_passthrough_methods_exist_on_direct_client():
+    assert all(callable(getattr(MPStatsClient, name)) for name in MPStatsDaemon.PASSTHROUGH)
+
+
+def test_request_and_get_through_running_daemon():
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        if request.url.path.endswith("/ym/get/categories"):
+            return httpx.Response(200, json=[{"path": "Электроника"}])
+        if request.url.path.endswith("/oz/get/item/5"):
+            return httpx.Response(200, json={"item": {"id": 5}})
+        return httpx.Response(404)
+
+    import explore_ym
+
+    client = MPStatsClient(api_key="x", transport=httpx.MockTransport(handler))
+    results, errors = {}, []
+    with tempfile.TemporaryDirectory() as tmp:
+        sock = str(Path(tmp) / "mpstats.sock")
+
+        def client_side():
+            try:
+                import time
+
+                for _ in range(100):
+                    remote = DaemonClient.connect(sock)
+                    if remote is not None:
+                        break
+                    time.sleep(0.02)
+                with remote:
+                    results["request"] = remote.request("GET", "ym/get/categories")
+                    results["missing"] = remote.request("GET", "ym/get/nothing", max_retries=1)
+                    results["item"] = remote.get_item(5)
+                    results["probe"] = explore_ym.probe_endpoint(remote, "GET", "ym/get/categories", {}, "test")
+                    remote.shutdown()
+            except Exception as exc:            # noqa: BLE001 — поднять в основном потоке
+                errors.append(exc)
+                DaemonClient.connect(sock).shutdown()
+
+        threading.Thread(target=client_side, daemon=True).start()
+        serve(MPStatsDaemon(client), sock)      # сигналы ставятся только в главном потоке
+
+    assert not errors, errors
+    assert results["request"] == [{"path": "Электроника"}]
+    assert results["missing"] is None
+    assert results["item"] == {"item": {"id": 5}}
+    assert results["probe"]["status"] == "OK"
@@ -0,0 +1,52 @@
+"""similar_pairs: LSH candidates + exact Jaccard, including oversized buckets.
+
+Run:
+    python -m pytest PRJ_ANALYTICS/mpstats/test_keywords.py -q
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from keywords import KeywordIndex, similar_pairs  # noqa: E402
+
+
+def index_of(sets: list[set[str]]) -> KeywordIndex:
+    return KeywordIndex({i: [(kw, 1.0, 10.0) for kw in sorted(s)] for i, s in enumerate(sets)})
+
+
+def brute_force(sets: list[set[str]], threshold: float) -> set[tuple[int, int]]:
+    return {(i, j) for i in range(len(sets)) for j in range(i + 1, len(sets))
+            if sets[i] and sets[j] and len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= threshold}
+
+
+def test_identical_sets_beyond_bucket_cap_are_all_reported():
+    sets = [{f"kw{k}" for k in range(30)}] * 1200 + [{"other", "words"}] * 3
+    pairs, crowded = similar_pairs(index_of(sets), 0.5)
+    assert crowded == 1200
+    assert len(pairs) == 1200 * 1199 // 2 + 3
+    assert all(jac == 1.0 for _, _, jac in pairs)
+
+
+def test_crowded_bucket_pairs_with_items_outside_it():
+    rng = random.Random(1)
+    base = {f"kw{k}" for k in range(20)}
+    sets = [set(base) for _ in range(60)]
+    sets += [set(rng.sample(sorted(base), 15)) | {f"x{i}"} for i in range(40)]
+    sets += [{f"y{rng.randrange(50)}" for _ in range(10)} for _ in range(40)] + [set()]
+    threshold = 0.5
+    pairs, crowded = similar_pairs(index_of(sets), threshold, max_bucket=10)
+    assert crowded >= 60
+    found = {(i, j) for i, j, _ in pairs}
+    assert len(found) == len(pairs), "duplicate pairs"
+    expected = brute_force(sets, threshold)
+    assert found <= expected
+    # exact for every crowded item; LSH may miss only a small share of the rest
+    assert len(expected - found) <= 0.05 * len(expected)
@@ -0,0 +1,41 @@
+"""normalize_size: one bedding set size per label, whatever else the label names.
+
+Run:
+    python -m pytest PRJ_ANALYTICS/mpstats/test_sizes.py -q
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sizes import normalize_size  # noqa: E402
+
+
+@pytest.mark.parametrize("label, size", [
+    ("1,5 спальное", "1.5-сп"),
+    ("Полуторный", "1.5-сп"),
+    ("2-спальный", "2-сп"),
+    ("Двуспальный 175x215", "2-сп"),
+    ("1 сп", "1-сп"),
+    ("Евро", "Евро"),
+    ("Евро 200x220", "Евро"),
+    ("Евро макси", "Евро макси"),
+    ("Семейный", "Семейное"),
+    ("160 x 200", "160×200"),
+    ("  XL ", "XL"),
+    # Евро — размер простыни, а не комплекта
+    ("2-спальный с простынёй Евро", "2-сп"),
+    ("2 сп, простыня евро", "2-сп"),
+    ("1,5-спальный, простыня Евро", "1.5-сп"),
+    ("Полуторный с европростынёй", "1.5-сп"),
+    ("Двуспальный с простыней евро макси", "2-сп"),
+    # Семейный комплект состоит из полуторных пододеяльников
+    ("Семейный, 2 пододеяльника 1,5-сп, простыня Евро", "Семейное"),
+])
+def test_normalize_size(label, size):
+    assert normalize_size(label) == size
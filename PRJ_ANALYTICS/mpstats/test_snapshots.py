@@ -0,0 +1,74 @@
+"""Monitor store: current-state file and fields missing from the API response.
+
+Run:
+    python -m pytest PRJ_ANALYTICS/mpstats/test_snapshots.py -q
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models import ItemSummary  # noqa: E402
+from snapshots import (  # noqa: E402
+    MISSING, append_log, detect_events, diff, latest, read_log, read_state, to_records, write_state,
+)
+
+
+def poll(store: Path, raws: list[dict], ts: int) -> list[dict]:
+    """One monitor run against store (same steps as monitor.main)."""
+    log_path, state_path = store / "log.bin", store / "current.bin"
+    state = read_state(state_path)
+    if state is None:
+        state = latest(read_log(log_path))
+    items = [ItemSummary.from_api(raw, platform="wb") for raw in raws]
+    changed, before, existed = diff(state, to_records(items, ts))
+    if len(changed):
+        append_log(log_path, changed)
+    events = detect_events(changed, before, existed)
+    write_state(state_path, state, changed)
+    return events
+
+
+def item(id: int, **fields) -> dict:
+    return {"id": id, "final_price": 100, "price": 120, "rating": 4.8, "feedbacks": 10, "balance": 5, **fields}
+
+
+def test_missing_balance_is_neither_stockout_nor_restock(tmp_path):
+    assert poll(tmp_path, [item(1)], 1) == []
+    without_balance = item(1)
+    del without_balance["balance"]
+    assert poll(tmp_path, [without_balance], 2) == []
+    assert read_state(tmp_path / "current.bin")["balance"][0] == MISSING
+    assert poll(tmp_path, [item(1)], 3) == []
+
+
+def test_missing_price_and_rating_give_no_events(tmp_path):
+    poll(tmp_path, [item(1)], 1)
+    raw = item(1)
+    del raw["final_price"], raw["rating"]
+    assert poll(tmp_path, [raw], 2) == []
+    rec = to_records([ItemSummary.from_api(raw, platform="wb")], 2)
+    assert np.isnan(rec["final_price"][0]) and np.isnan(rec["rating"][0])
+
+
+def test_real_changes_still_fire(tmp_path):
+    poll(tmp_path, [item(1), item(2)], 1)
+    events = poll(tmp_path, [item(1, final_price=80), item(2, balance=0)], 2)
+    assert {(e["type"], e["item"]) for e in events} == {("price", 1), ("stockout", 2)}
+    assert [e["type"] for e in poll(tmp_path, [item(1, final_price=80), item(2, balance=3)], 3)] == ["restock"]
+
+
+def test_state_file_equals_last_log_record_and_is_rebuilt_from_log(tmp_path):
+    for ts, price in enumerate([100, 100, 90, 90, 95], 1):
+        poll(tmp_path, [item(1, final_price=price), item(2, final_price=price + ts)], ts)
+    state = read_state(tmp_path / "current.bin")
+    assert np.array_equal(state, latest(read_log(tmp_path / "log.bin")))
+    (tmp_path / "current.bin").unlink()
+    assert poll(tmp_path, [item(1, final_price=95), item(2, final_price=100)], 6) == []
+    assert np.array_equal(read_state(tmp_path / "current.bin"), state)
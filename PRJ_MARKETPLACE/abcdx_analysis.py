@@ -5,13 +5,44 @@ ABCDX-анализ товаров на основе данных из generate_a
 добавляет расчёт маржи и классификацию ABCDX.
 
 Результат: новый лист «ABCDX» в файле ads_data_v2.0.xlsx
+
+Режим --sidecar [FILE]: входной файл открывается только на чтение, а результаты
+(«Каталог» с юнит-экономикой, «ABCDX», «Сводка ABCDX») потоково пишутся в
+отдельный write-only workbook (по умолчанию analysis_output/abcdx_report.xlsx).
+Входной workbook не пересохраняется.
+
+Этапы (generate, aggregate, classify, prepare, export) размечены для
+scripts/stageprof.py: --stages — таблица времени, --profile export — профиль.
 """
 
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from datetime import datetime
+import argparse
+import os
 import random
+import sys
+
+from abcdx_classifier import classify_abcdx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import stageprof
+
+INPUT_FILE = "/Users/vadimbakanov/Documents/_CODE/vibecommerce_test_code/PRJ_MARKETPLACE/ads_data_v1.0.xlsx"
+OUTPUT_FILE = "/Users/vadimbakanov/Documents/_CODE/vibecommerce_test_code/PRJ_MARKETPLACE/ads_data_v2.0.xlsx"
+SIDECAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_output", "abcdx_report.xlsx")
+
+parser = argparse.ArgumentParser(description="ABCDX-анализ ассортимента")
+parser.add_argument(
+    "--sidecar", nargs="?", const=SIDECAR_FILE, metavar="FILE",
+    help="Записать результат в отдельный лёгкий файл (write-only), входной workbook "
+         f"открывается только на чтение (по умолчанию: {SIDECAR_FILE})",
+)
+stageprof.add_arguments(parser)
+args = parser.parse_args()
+stageprof.configure_from_args(args)
 
 random.seed(42)  # СОВПАДАЕТ с generate_ads_data.py
 
@@ -146,6 +177,7 @@ def gen_qty(base, overall_m, cat_m, noise=0.20):
 # ============================================================
 # 4. ВОСПРОИЗВЕДЕНИЕ ДАННЫХ (идентично generate_ads_data.py)
 # ============================================================
+stageprof.begin("generate")
 sales_rows = []
 
 for wi, week_date in enumerate(weeks):
@@ -247,9 +279,12 @@ for sr in sales_rows:
         random.uniform(0.85, 1.15)
 
 
+stageprof.end(rows=len(sales_rows))
+
 # ============================================================
 # 5. АГРЕГАЦИЯ ЗА ПОСЛЕДНИЙ МЕСЯЦ (W9-W12)
 # ============================================================
+stageprof.begin("aggregate", rows=len(sales_rows))
 sku_data = {}  # sku_id → {revenue, cogs, commission, logistics, ad_spend, margin, qty}
 sku_first_week = {}  # sku_id → первый wi, когда qty > 0
 
@@ -291,9 +326,12 @@ for row in sales_rows:
     d["qty"] += row["qty"]
 
 
+stageprof.end()
+
 # ============================================================
 # 6. КЛАССИФИКАЦИЯ ABCDX
 # ============================================================
+stageprof.begin("classify", rows=len(sku_data))
 results = []
 
 for sid, d in sorted(sku_data.items()):
@@ -321,54 +359,23 @@ for sid, d in sorted(sku_data.items()):
         "class": None,
     })
 
-# Шаг 1: X — новинки (приоритет над всем)
-for r in results:
-    if r["is_novelty"]:
-        r["class"] = "X"
+# Шаги 1–3: X (новинки) → D (маржа <= 0) → ABC по накопленной доле маржи.
+# Векторно, одним вызовом (см. abcdx_classifier.py)
+classes, _ = classify_abcdx(
+    [r["margin"] for r in results],
+    [r["marginality"] for r in results],
+    [r["is_novelty"] for r in results],
+)
+for r, cls in zip(results, classes.tolist()):
+    r["class"] = cls
 
-# Шаг 2: D — убыточные (маржа <= 0), если не X
-for r in results:
-    if r["class"] is None and r["margin"] <= 0:
-        r["class"] = "D"
-
-# Шаг 3: ABC — из оставшихся
-unclassified = [r for r in results if r["class"] is None]
-unclassified.sort(key=lambda r: r["margin"], reverse=True)
-
-total_margin = sum(r["margin"] for r in unclassified)
-cumulative = 0
-
-for r in unclassified:
-    cumulative += r["margin"]
-    cum_pct = cumulative / total_margin if total_margin > 0 else 0
-
-    if cum_pct <= 0.60 and r["marginality"] >= 20:
-        r["class"] = "A"
-    elif cum_pct <= 0.60 and r["marginality"] >= 15:
-        # Попал в top-60% по марже, но маржинальность 15-20% → B
-        r["class"] = "B"
-    elif cum_pct <= 0.60 and r["marginality"] < 15:
-        # Попал в top-60% по марже, но маржинальность < 15% → C
-        r["class"] = "C"
-    elif cum_pct <= 0.80 and r["marginality"] >= 15:
-        r["class"] = "B"
-    elif cum_pct <= 0.80 and r["marginality"] < 15:
-        r["class"] = "C"
-    else:
-        r["class"] = "C"
 
+stageprof.end()
 
 # ============================================================
-# 7. ЗАПИСЬ В EXCEL
+# 7. ПОДГОТОВКА СТРОК ОТЧЁТА
 # ============================================================
-INPUT_FILE = "/Users/vadimbakanov/Documents/_CODE/vibecommerce_test_code/PRJ_MARKETPLACE/ads_data_v1.0.xlsx"
-OUTPUT_FILE = "/Users/vadimbakanov/Documents/_CODE/vibecommerce_test_code/PRJ_MARKETPLACE/ads_data_v2.0.xlsx"
-
-wb = openpyxl.load_workbook(INPUT_FILE)
-
-# --- Обновим лист «Каталог» — добавим колонки себестоимости, комиссий, логистики ---
-ws_cat = wb["Каталог"]
-
+stageprof.begin("prepare", rows=len(results))
 new_headers = [
     ("Себестоимость, ₽", 16),
     ("Комиссия WB, %", 14),
@@ -391,16 +398,9 @@ num_fmt_pct = "0.0%"
 num_fmt_pct2 = "0.0%"
 num_fmt_int = "#,##0"
 
-for ci_offset, (hdr, width) in enumerate(new_headers):
-    col = 6 + ci_offset  # F, G, H, I, J
-    cell = ws_cat.cell(row=1, column=col, value=hdr)
-    cell.font = header_font
-    cell.fill = header_fill
-    cell.alignment = header_align
-    cell.border = thin_border
-    ws_cat.column_dimensions[get_column_letter(col)].width = width
-
-for ri, p in enumerate(products, 2):
+# --- Каталог: колонки себестоимости, комиссий, логистики (F–J) ---
+catalog_rows = []  # [(vals, fmts)] — по строке на товар
+for p in products:
     pid, name, cat, cost, price_wb, price_ozon, weight, _, _ = p
     comm_wb = commission_rates["WB"][cat]
     comm_oz = commission_rates["Ozon"][cat]
@@ -409,19 +409,9 @@ for ri, p in enumerate(products, 2):
 
     vals = [cost, comm_wb, comm_oz, logi_wb, logi_oz]
     fmts = [num_fmt_rub, num_fmt_pct, num_fmt_pct, num_fmt_rub, num_fmt_rub]
-    for ci_offset, (v, fmt) in enumerate(zip(vals, fmts)):
-        cell = ws_cat.cell(row=ri, column=6 + ci_offset, value=v)
-        cell.number_format = fmt
-        cell.border = thin_border
-
-ws_cat.auto_filter.ref = f"A1:J{len(products) + 1}"
-
-# --- Новый лист «ABCDX» ---
-if "ABCDX" in wb.sheetnames:
-    del wb["ABCDX"]
-
-ws_abcdx = wb.create_sheet("ABCDX")
+    catalog_rows.append((vals, fmts))
 
+# --- ABCDX ---
 abcdx_headers = [
     ("SKU", 6),
     ("Название", 35),
@@ -455,15 +445,6 @@ class_fonts = {
     "X": Font(bold=True, size=11, color="FFFFFF"),
 }
 
-# Заголовки
-for ci, (hdr, width) in enumerate(abcdx_headers, 1):
-    cell = ws_abcdx.cell(row=1, column=ci, value=hdr)
-    cell.font = header_font
-    cell.fill = header_fill
-    cell.alignment = header_align
-    cell.border = thin_border
-    ws_abcdx.column_dimensions[get_column_letter(ci)].width = width
-
 # Сортировка: A → B → C → D → X, внутри — по марже desc
 class_order = {"A": 0, "B": 1, "C": 2, "D": 3, "X": 4}
 results.sort(key=lambda r: (class_order.get(r["class"], 9), -r["margin"]))
@@ -476,7 +457,8 @@ abc_results = [r for r in results if r["class"] in ("A", "B", "C")]
 abc_margin_total = sum(r["margin"] for r in abc_results)
 abc_cumulative = 0
 
-for ri, r in enumerate(results, 2):
+abcdx_rows = []  # [(vals, fmts, cls)]
+for r in results:
     cls = r["class"]
 
     # Доля и накопительная доля
@@ -501,30 +483,9 @@ for ri, r in enumerate(results, 2):
         num_fmt_pct, num_fmt_pct,
         num_fmt_pct if cum_share is not None else None,
     ]
+    abcdx_rows.append((vals, fmts, cls))
 
-    for ci, (v, fmt) in enumerate(zip(vals, fmts), 1):
-        cell = ws_abcdx.cell(row=ri, column=ci, value=v)
-        cell.border = thin_border
-        if fmt:
-            cell.number_format = fmt
-
-    # Подсветка класса
-    class_cell = ws_abcdx.cell(row=ri, column=4)
-    if cls in class_colors:
-        class_cell.fill = class_colors[cls]
-        class_cell.font = class_fonts[cls]
-        class_cell.alignment = Alignment(horizontal="center")
-
-ws_abcdx.auto_filter.ref = f"A1:N{len(results) + 1}"
-ws_abcdx.freeze_panes = "A2"
-
-
-# --- Лист «Сводка ABCDX» ---
-if "Сводка ABCDX" in wb.sheetnames:
-    del wb["Сводка ABCDX"]
-
-ws_summary = wb.create_sheet("Сводка ABCDX")
-
+# --- Сводка ABCDX ---
 sum_headers = [
     ("Класс", 10),
     ("Кол-во SKU", 12),
@@ -536,18 +497,11 @@ sum_headers = [
     ("Доля маржи, %", 13),
 ]
 
-for ci, (hdr, width) in enumerate(sum_headers, 1):
-    cell = ws_summary.cell(row=1, column=ci, value=hdr)
-    cell.font = header_font
-    cell.fill = header_fill
-    cell.alignment = header_align
-    cell.border = thin_border
-    ws_summary.column_dimensions[get_column_letter(ci)].width = width
-
 total_revenue_all = sum(r["revenue"] for r in results)
 total_margin_all = sum(r["margin"] for r in results if r["margin"] > 0)
 
-for ri, cls in enumerate(["A", "B", "C", "D", "X"], 2):
+summary_rows = []  # [(vals, fmts, cls)]
+for cls in ["A", "B", "C", "D", "X"]:
     cls_items = [r for r in results if r["class"] == cls]
     if not cls_items:
         vals = [cls, 0, 0, 0, 0, 0, 0, 0]
@@ -562,37 +516,199 @@ for ri, cls in enumerate(["A", "B", "C", "D", "X"], 2):
         vals = [cls, n, qty, rev, mar, avg_marginality / 100, rev_share, mar_share]
 
     fmts = [None, num_fmt_int, num_fmt_int, num_fmt_rub, num_fmt_rub, num_fmt_pct, num_fmt_pct, num_fmt_pct]
-    for ci, (v, fmt) in enumerate(zip(vals, fmts), 1):
-        cell = ws_summary.cell(row=ri, column=ci, value=v)
-        cell.border = thin_border
-        if fmt:
-            cell.number_format = fmt
-
-    # Подсветка класса
-    class_cell = ws_summary.cell(row=ri, column=1)
-    if cls in class_colors:
-        class_cell.fill = class_colors[cls]
-        class_cell.font = class_fonts[cls]
-        class_cell.alignment = Alignment(horizontal="center")
+    summary_rows.append((vals, fmts, cls))
 
 # Строка «Итого»
-total_row = ri + 1
-ws_summary.cell(row=total_row, column=1, value="ИТОГО").font = Font(bold=True, size=11)
-ws_summary.cell(row=total_row, column=2, value=len(results)).number_format = num_fmt_int
-ws_summary.cell(row=total_row, column=3, value=sum(r["qty"] for r in results)).number_format = num_fmt_int
-ws_summary.cell(row=total_row, column=4, value=total_revenue_all).number_format = num_fmt_rub
-ws_summary.cell(row=total_row, column=5, value=sum(r["margin"] for r in results)).number_format = num_fmt_rub
-for ci in range(1, 9):
-    ws_summary.cell(row=total_row, column=ci).border = thin_border
-    ws_summary.cell(row=total_row, column=ci).font = Font(bold=True, size=11)
+total_vals = [
+    "ИТОГО", len(results), sum(r["qty"] for r in results),
+    total_revenue_all, sum(r["margin"] for r in results), None, None, None,
+]
+total_fmts = [None, num_fmt_int, num_fmt_int, num_fmt_rub, num_fmt_rub, None, None, None]
 
-ws_summary.freeze_panes = "A2"
 
+stageprof.end()
 
 # ============================================================
-# 8. СОХРАНЕНИЕ
+# 8. ЗАПИСЬ В EXCEL
 # ============================================================
-wb.save(OUTPUT_FILE)
+def write_in_place():
+    """Дописать листы в копию входного workbook (полная загрузка и пересохранение)."""
+    wb = openpyxl.load_workbook(INPUT_FILE)
+
+    # --- Обновим лист «Каталог» — добавим колонки себестоимости, комиссий, логистики ---
+    ws_cat = wb["Каталог"]
+
+    for ci_offset, (hdr, width) in enumerate(new_headers):
+        col = 6 + ci_offset  # F, G, H, I, J
+        cell = ws_cat.cell(row=1, column=col, value=hdr)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_align
+        cell.border = thin_border
+        ws_cat.column_dimensions[get_column_letter(col)].width = width
+
+    for ri, (vals, fmts) in enumerate(catalog_rows, 2):
+        for ci_offset, (v, fmt) in enumerate(zip(vals, fmts)):
+            cell = ws_cat.cell(row=ri, column=6 + ci_offset, value=v)
+            cell.number_format = fmt
+            cell.border = thin_border
+
+    ws_cat.auto_filter.ref = f"A1:J{len(products) + 1}"
+
+    # --- Новый лист «ABCDX» ---
+    if "ABCDX" in wb.sheetnames:
+        del wb["ABCDX"]
+
+    ws_abcdx = wb.create_sheet("ABCDX")
+
+    # Заголовки
+    for ci, (hdr, width) in enumerate(abcdx_headers, 1):
+        cell = ws_abcdx.cell(row=1, column=ci, value=hdr)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_align
+        cell.border = thin_border
+        ws_abcdx.column_dimensions[get_column_letter(ci)].width = width
+
+    for ri, (vals, fmts, cls) in enumerate(abcdx_rows, 2):
+        for ci, (v, fmt) in enumerate(zip(vals, fmts), 1):
+            cell = ws_abcdx.cell(row=ri, column=ci, value=v)
+            cell.border = thin_border
+            if fmt:
+                cell.number_format = fmt
+
+        # Подсветка класса
+        class_cell = ws_abcdx.cell(row=ri, column=4)
+        if cls in class_colors:
+            class_cell.fill = class_colors[cls]
+            class_cell.font = class_fonts[cls]
+            class_cell.alignment = Alignment(horizontal="center")
+
+    ws_abcdx.auto_filter.ref = f"A1:N{len(results) + 1}"
+    ws_abcdx.freeze_panes = "A2"
+
+    # --- Лист «Сводка ABCDX» ---
+    if "Сводка ABCDX" in wb.sheetnames:
+        del wb["Сводка ABCDX"]
+
+    ws_summary = wb.create_sheet("Сводка ABCDX")
+
+    for ci, (hdr, width) in enumerate(sum_headers, 1):
+        cell = ws_summary.cell(row=1, column=ci, value=hdr)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_align
+        cell.border = thin_border
+        ws_summary.column_dimensions[get_column_letter(ci)].width = width
+
+    for ri, (vals, fmts, cls) in enumerate(summary_rows, 2):
+        for ci, (v, fmt) in enumerate(zip(vals, fmts), 1):
+            cell = ws_summary.cell(row=ri, column=ci, value=v)
+            cell.border = thin_border
+            if fmt:
+                cell.number_format = fmt
+
+        # Подсветка класса
+        class_cell = ws_summary.cell(row=ri, column=1)
+        if cls in class_colors:
+            class_cell.fill = class_colors[cls]
+            class_cell.font = class_fonts[cls]
+            class_cell.alignment = Alignment(horizontal="center")
+
+    total_row = len(summary_rows) + 2
+    for ci, (v, fmt) in enumerate(zip(total_vals, total_fmts), 1):
+        cell = ws_summary.cell(row=total_row, column=ci, value=v)
+        cell.border = thin_border
+        cell.font = Font(bold=True, size=11)
+        if fmt:
+            cell.number_format = fmt
+
+    ws_summary.freeze_panes = "A2"
+
+    wb.save(OUTPUT_FILE)
+    return OUTPUT_FILE
+
+
+def write_sidecar(path):
+    """Записать ABCDX в отдельный write-only workbook.
+
+    Входной файл открывается только на чтение (read_only) — из него берутся
+    исходные колонки «Каталога». Сам он не пересохраняется, поэтому его можно
+    держать открытым в Excel/LibreOffice.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    wb_in = openpyxl.load_workbook(INPUT_FILE, read_only=True, data_only=True)
+    ws_in = wb_in["Каталог"]
+    rows_in = ws_in.iter_rows(values_only=True)
+    catalog_header = list(next(rows_in, ()))[:5]
+
+    wb = openpyxl.Workbook(write_only=True)
+
+    def header_cells(ws, headers):
+        cells = []
+        for ci, (hdr, width) in enumerate(headers, 1):
+            cell = WriteOnlyCell(ws, value=hdr)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_align
+            cell.border = thin_border
+            ws.column_dimensions[get_column_letter(ci)].width = width
+            cells.append(cell)
+        return cells
+
+    def data_cells(ws, vals, fmts, class_col=None, cls=None, font=None):
+        cells = []
+        for ci, (v, fmt) in enumerate(zip(vals, fmts), 1):
+            cell = WriteOnlyCell(ws, value=v)
+            cell.border = thin_border
+            if fmt:
+                cell.number_format = fmt
+            if font is not None:
+                cell.font = font
+            if ci == class_col and cls in class_colors:
+                cell.fill = class_colors[cls]
+                cell.font = class_fonts[cls]
+                cell.alignment = Alignment(horizontal="center")
+            cells.append(cell)
+        return cells
+
+    # --- «Каталог»: исходные A–E из входного файла + юнит-экономика F–J ---
+    ws_cat = wb.create_sheet("Каталог")
+    ws_cat.freeze_panes = "A2"
+    ws_cat.auto_filter.ref = f"A1:J{len(products) + 1}"
+    ws_cat.append(header_cells(ws_cat, [(h, 14) for h in catalog_header] + new_headers))
+    base_fmts = [num_fmt_rub if str(h).endswith("₽") else None for h in catalog_header]
+    for src, (vals, fmts) in zip(rows_in, catalog_rows):
+        base = list(src)[:5]
+        ws_cat.append(data_cells(ws_cat, base + vals, base_fmts[:len(base)] + fmts))
+    wb_in.close()
+
+    # --- «ABCDX» ---
+    ws_abcdx = wb.create_sheet("ABCDX")
+    ws_abcdx.freeze_panes = "A2"
+    ws_abcdx.auto_filter.ref = f"A1:N{len(results) + 1}"
+    ws_abcdx.append(header_cells(ws_abcdx, abcdx_headers))
+    for vals, fmts, cls in abcdx_rows:
+        ws_abcdx.append(data_cells(ws_abcdx, vals, fmts, class_col=4, cls=cls))
+
+    # --- «Сводка ABCDX» ---
+    ws_summary = wb.create_sheet("Сводка ABCDX")
+    ws_summary.freeze_panes = "A2"
+    ws_summary.append(header_cells(ws_summary, sum_headers))
+    for vals, fmts, cls in summary_rows:
+        ws_summary.append(data_cells(ws_summary, vals, fmts, class_col=1, cls=cls))
+    ws_summary.append(data_cells(ws_summary, total_vals, total_fmts, font=Font(bold=True, size=11)))
+
+    wb.save(path)
+    return path
+
+
+with stageprof.stage("export", rows=len(results)):
+    if args.sidecar:
+        saved_file = write_sidecar(args.sidecar)
+    else:
+        saved_file = write_in_place()
 
 # ============================================================
 # 9. ВЫВОД РЕЗУЛЬТАТОВ
@@ -633,4 +749,4 @@ for cls, label in [("A", "ЛИДЕРЫ"), ("B", "СЕРЕДНЯКИ"), ("C", "А
         print(f"  SKU {r['sku_id']:>2}: {r['name']:<35} маржа={r['margin']:>8,}₽  маржин.={r['marginality']:>5.1f}%")
     print()
 
-print(f"Файл сохранён: {OUTPUT_FILE}")
+print(f"Файл сохранён: {saved_file}")
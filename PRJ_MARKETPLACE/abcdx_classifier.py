@@ -0,0 +1,135 @@
+"""
+Векторная классификация ABCDX по накопленной доле маржи.
+
+Правила (совпадают с abcdx_analysis.py):
+  X — новинки (приоритет над всем)
+  D — убыточные (маржа <= 0), если не X
+  ABC — из оставшихся, по накопленной доле маржи (сортировка по марже desc):
+    доля <= 60%: A при маржинальности >= 20%, B при >= 15%, иначе C
+    доля <= 80%: B при маржинальности >= 15%, иначе C
+    остальные: C
+
+Один вызов классифицирует весь каталог, в том числе сгруппированный
+(по категории, площадке и т.д.) — без Python-цикла по SKU и по всем группам:
+одна сортировка (argsort), cumsum по сегментам групп и сравнение доли
+каждой строки с порогами 60% / 80% своей группы.
+
+Доля на границе (ровно 60% или 80%) — как в цикле по группе. Накопленная
+сумма сегмента — разность общего cumsum, и её округление зависит от маржи
+предыдущих групп. Поэтому группы, где доля какой-то строки ближе к порогу,
+чем оценка этой ошибки (плюс SHARE_TOL), пересчитываются так же, как цикл:
+последовательный cumsum своего сегмента и итог sum() по убыванию маржи.
+Таких групп — единицы, классы совпадают с циклом и на границе.
+
+Использование:
+    from abcdx_classifier import classify_abcdx
+    classes, cum_share = classify_abcdx(margin, marginality, is_novelty,
+                                        groups=categories)
+"""
+
+import numpy as np
+
+A_SHARE = 0.60
+B_SHARE = 0.80
+A_MIN_MARGINALITY = 20
+B_MIN_MARGINALITY = 15
+SHARE_TOL = 1e-9    # окрестность порога, в которой доля пересчитывается как в цикле
+
+
+def _group_codes(groups, n):
+    """Группы → целочисленные коды 0..G-1 (None — одна группа на весь каталог)."""
+    if groups is None:
+        return np.zeros(n, dtype=np.int64), 1
+    uniq, codes = np.unique(np.asarray(groups), return_inverse=True)
+    return codes.reshape(-1), len(uniq)
+
+
+def classify_abc(margin, marginality, groups=None,
+                 a_share=A_SHARE, b_share=B_SHARE,
+                 a_min_marginality=A_MIN_MARGINALITY,
+                 b_min_marginality=B_MIN_MARGINALITY):
+    """Классы A/B/C по накопленной доле маржи внутри каждой группы.
+
+    margin, marginality — массивы одинаковой длины (маржинальность в %).
+    groups — необязательный массив ключей групп (категория, площадка, ...).
+
+    Возвращает (classes, cum_share): массив 'A'/'B'/'C' и накопленную долю
+    маржи (0..1) в исходном порядке строк.
+    """
+    margin = np.asarray(margin, dtype=np.float64)
+    marginality = np.asarray(marginality, dtype=np.float64)
+    n = len(margin)
+    if n == 0:
+        return np.empty(0, dtype='<U1'), np.empty(0, dtype=np.float64)
+    codes, _ = _group_codes(groups, n)
+
+    # Одна сортировка: группа asc, маржа desc (lexsort стабилен — при равной
+    # марже порядок как у list.sort(reverse=True) в исходном скрипте)
+    order = np.lexsort((-margin, codes))
+    m = margin[order]
+    g = codes[order]
+
+    # Накопленная сумма внутри сегментов групп
+    is_start = np.empty(n, dtype=bool)
+    is_start[0] = True
+    np.not_equal(g[1:], g[:-1], out=is_start[1:])
+    starts = np.flatnonzero(is_start)
+    seg = np.cumsum(is_start) - 1
+    cum = np.cumsum(m)
+    cum_in_group = cum - (cum[starts] - m[starts])[seg]
+    ends = np.append(starts[1:], n)
+    totals = cum_in_group[ends - 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(totals[seg] > 0, cum_in_group / totals[seg], 0.0)
+        # Оценка ошибки доли: округление каждого шага общего cumsum внутри группы
+        err = np.where(totals > 0, (ends - starts) * np.finfo(np.float64).eps * np.abs(cum[ends - 1]) / totals, 0.0)
+
+    # Строки у порога: их группы пересчитываем арифметикой цикла
+    tol = (SHARE_TOL + err)[seg]
+    near = (np.abs(share - a_share) <= tol) | (np.abs(share - b_share) <= tol)
+    for k in np.unique(seg[near]):
+        s, e = starts[k], ends[k]
+        total = sum(m[s:e].tolist())
+        share[s:e] = np.cumsum(m[s:e]) / total if total > 0 else 0.0
+
+    # Пороги — по доле внутри своей группы; маржа в группе убывает, поэтому
+    # доля не убывает и «<=» отрезает префикс, как break в цикле
+    in_a = share <= a_share
+    in_b = share <= b_share
+
+    mty = marginality[order]
+    sorted_classes = np.where(
+        in_a & (mty >= a_min_marginality), 'A',
+        np.where(in_b & (mty >= b_min_marginality), 'B', 'C'),
+    )
+
+    classes = np.empty(n, dtype='<U1')
+    classes[order] = sorted_classes
+    cum_share = np.empty(n, dtype=np.float64)
+    cum_share[order] = share
+    return classes, cum_share
+
+
+def classify_abcdx(margin, marginality, is_novelty, groups=None, **thresholds):
+    """Полная классификация ABCDX одним вызовом.
+
+    Возвращает (classes, cum_share): классы 'A'/'B'/'C'/'D'/'X' и накопленную
+    долю маржи для ABC-товаров (NaN для D и X).
+    """
+    margin = np.asarray(margin, dtype=np.float64)
+    marginality = np.asarray(marginality, dtype=np.float64)
+    is_novelty = np.asarray(is_novelty, dtype=bool)
+    n = len(margin)
+
+    is_d = ~is_novelty & (margin <= 0)
+    is_abc = ~is_novelty & ~is_d
+
+    classes = np.where(is_novelty, 'X', 'D').astype('<U1')
+    cum_share = np.full(n, np.nan)
+
+    idx = np.flatnonzero(is_abc)
+    sub_groups = None if groups is None else np.asarray(groups)[idx]
+    abc, share = classify_abc(margin[idx], marginality[idx], sub_groups, **thresholds)
+    classes[idx] = abc
+    cum_share[idx] = share
+    return classes, cum_share
@@ -5,6 +5,12 @@
 
 Цель: найти узкие места (bottlenecks) воронки по SKU, категориям, площадкам.
 Результат: Excel-отчёт (8 листов) + 8 PNG-графиков.
+
+Пути к данным и каталог результатов можно переопределить (--ads, --sales,
+--output-dir) — например, для прогона на синтетических данных
+scripts/bench.py. Этапы (load, aggregate, bottlenecks, recommendations,
+export, render) размечены для scripts/stageprof.py: --stages — таблица
+времени, --profile render — профиль этапа.
 """
 
 import openpyxl
@@ -16,7 +22,9 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 from matplotlib.lines import Line2D
 from collections import defaultdict
+import argparse
 import os
+import sys
 
 # ── Настройки ──
 plt.rcParams['font.family'] = 'DejaVu Sans'
@@ -25,9 +33,23 @@ plt.rcParams['axes.titlesize'] = 12
 plt.rcParams['figure.dpi'] = 150
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-ADS_FILE = os.path.join(SCRIPT_DIR, 'ads_data_v2.0.xlsx')
-SALES_FILE = os.path.join(SCRIPT_DIR, 'sales_data_v1.0.xlsx')
-OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'analysis_output')
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), 'scripts'))
+import stageprof
+
+parser = argparse.ArgumentParser(description="Анализ воронки продаж")
+parser.add_argument('--ads', default=os.path.join(SCRIPT_DIR, 'ads_data_v2.0.xlsx'),
+                    help="Файл с листом «Трафик и реклама» (по умолчанию — ads_data_v2.0.xlsx)")
+parser.add_argument('--sales', default=os.path.join(SCRIPT_DIR, 'sales_data_v1.0.xlsx'),
+                    help="Файл с листом «Продажи» (по умолчанию — sales_data_v1.0.xlsx)")
+parser.add_argument('--output-dir', default=os.path.join(SCRIPT_DIR, 'analysis_output'),
+                    help="Каталог для отчёта и графиков (по умолчанию — analysis_output/)")
+stageprof.add_arguments(parser)
+args = parser.parse_args()
+stageprof.configure_from_args(args)
+
+ADS_FILE = args.ads
+SALES_FILE = args.sales
+OUTPUT_DIR = args.output_dir
 OUTPUT_XLSX = os.path.join(OUTPUT_DIR, 'funnel_report.xlsx')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -63,6 +85,7 @@ COLORS_CAT = ['#1565c0', '#d32f2f', '#388e3c', '#f57c00', '#7b1fa2', '#00838f',
 # 1. ЗАГРУЗКА ДАННЫХ
 # ============================================================
 print("Загрузка данных...")
+stageprof.begin("load")
 
 # --- ads_data_v2.0.xlsx: лист "Трафик и реклама" ---
 # Читаем только RAW-колонки, формулы пересчитываем сами
@@ -158,6 +181,7 @@ for ad in ads_data:
     merged.append(combined)
 
 print(f"  Объединено: {len(merged)} строк, из них с P&L: {matched}")
+stageprof.end(rows=len(ads_data) + len(sales_data))
 
 
 # ============================================================
@@ -202,6 +226,7 @@ def aggregate_funnel(rows):
 
 # --- Агрегация по SKU ---
 print("\nАгрегация по SKU...")
+stageprof.begin("aggregate", rows=len(merged))
 sku_groups = defaultdict(list)
 for r in merged:
     sku_groups[r['sku']].append(r)
@@ -255,7 +280,10 @@ for r in merged:
 # ============================================================
 # 3. ВЫЯВЛЕНИЕ УЗКИХ МЕСТ
 # ============================================================
+stageprof.end()
+
 print("Выявление узких мест...")
+stageprof.begin("bottlenecks", rows=len(sku_funnel))
 
 # Бенчмарки: перцентили по категории
 cat_benchmarks = defaultdict(lambda: defaultdict(list))
@@ -340,7 +368,10 @@ for sku, agg in sku_funnel.items():
 # ============================================================
 # 4. РЕКОМЕНДАЦИИ
 # ============================================================
+stageprof.end()
+
 print("Генерация рекомендаций...")
+stageprof.begin("recommendations", rows=len(sku_funnel))
 
 recommendations = []
 for sku in sorted(sku_funnel.keys(), key=lambda s: -sku_funnel[s]['lost_revenue']):
@@ -376,7 +407,10 @@ for sku in sorted(sku_funnel.keys(), key=lambda s: -sku_funnel[s]['lost_revenue'
 # ============================================================
 # 5. ЗАПИСЬ EXCEL-ОТЧЁТА
 # ============================================================
+stageprof.end()
+
 print("\nЗапись Excel-отчёта...")
+stageprof.begin("export", rows=len(sku_funnel))
 
 
 def write_header_row(ws, headers_widths):
@@ -760,12 +794,14 @@ ws8.freeze_panes = "D2"
 # Сохранение
 wb_out.save(OUTPUT_XLSX)
 print(f"  Excel: {OUTPUT_XLSX}")
+stageprof.end()
 
 
 # ============================================================
 # 6. ГРАФИКИ
 # ============================================================
 print("\nГенерация графиков...")
+stageprof.begin("render", rows=8)
 
 # ── ГРАФИК 06: Общая воронка WB vs Ozon ──
 fig, ax = plt.subplots(figsize=(14, 8))
@@ -1120,6 +1156,7 @@ plt.tight_layout()
 plt.savefig(os.path.join(OUTPUT_DIR, '13_top_bottlenecks.png'), bbox_inches='tight')
 plt.close()
 print("  13_top_bottlenecks.png")
+stageprof.end()
 
 
 # ============================================================
@@ -1128,7 +1165,7 @@ print("  13_top_bottlenecks.png")
 print(f"\n{'='*70}")
 print(f"  АНАЛИЗ ВОРОНКИ ПРОДАЖ")
 print(f"  Период: ноя 2025 \u2014 фев 2026 (12 недель)")
-print(f"  SKU: 50 | Площадки: WB + Ozon")
+print(f"  SKU: {len(sku_funnel)} | Площадки: WB + Ozon")
 print(f"{'='*70}")
 
 # Общая воронка
@@ -1142,8 +1179,8 @@ print(f"  Заказы:  {total['orders']:>12,}  (CR корз\u2192заказ: {
 print(f"\n  WB vs OZON:")
 print(f"  {'':>20} {'WB':>10} {'Ozon':>10}")
 print(f"  {'CTR':>20} {wb_total['ctr']*100:>9.2f}% {oz_total['ctr']*100:>9.2f}%")
-print(f"  {'CR клик\u2192корзина':>20} {wb_total['cr_click_cart']*100:>9.1f}% {oz_total['cr_click_cart']*100:>9.1f}%")
-print(f"  {'CR корз\u2192заказ':>20} {wb_total['cr_cart_order']*100:>9.1f}% {oz_total['cr_cart_order']*100:>9.1f}%")
+print(f"  {'CR клик→корзина':>20} {wb_total['cr_click_cart']*100:>9.1f}% {oz_total['cr_click_cart']*100:>9.1f}%")
+print(f"  {'CR корз→заказ':>20} {wb_total['cr_cart_order']*100:>9.1f}% {oz_total['cr_cart_order']*100:>9.1f}%")
 print(f"  {'ДРР':>20} {wb_total['drr']*100:>9.1f}% {oz_total['drr']*100:>9.1f}%")
 print(f"  {'ROAS':>20} {wb_total['roas']:>9.1f}x {oz_total['roas']:>9.1f}x")
 
@@ -0,0 +1,92 @@
+"""
+Векторный classify_abc против прежнего цикла по группе из abcdx_analysis.py:
+классы должны совпадать, в том числе у товаров ровно на 60% / 80% маржи
+группы и при большой марже предыдущих групп (сегментный cumsum).
+
+Запуск (из корня репозитория):
+    python -m pytest PRJ_MARKETPLACE/test_abcdx_classifier.py -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from abcdx_classifier import classify_abc, classify_abcdx  # noqa: E402
+
+
+def loop_classes(margin, marginality, groups):
+    """Прежний алгоритм: отдельный проход по каждой группе."""
+    classes = [None] * len(margin)
+    by_group = {}
+    for i, g in enumerate(groups):
+        by_group.setdefault(g, []).append(i)
+    for rows in by_group.values():
+        rows.sort(key=lambda i: margin[i], reverse=True)
+        total_margin = sum(margin[i] for i in rows)
+        cumulative = 0
+        for i in rows:
+            cumulative += margin[i]
+            cum_pct = cumulative / total_margin if total_margin > 0 else 0
+            if cum_pct <= 0.60 and marginality[i] >= 20:
+                classes[i] = "A"
+            elif cum_pct <= 0.80 and marginality[i] >= 15:
+                classes[i] = "B"
+            else:
+                classes[i] = "C"
+    return classes
+
+
+def check(margin, marginality, groups):
+    classes, _ = classify_abc(margin, marginality, groups)
+    assert list(classes) == loop_classes(margin, marginality, groups)
+
+
+@pytest.mark.parametrize("margins", [
+    [60, 20, 20],
+    [30, 30, 20, 20],
+    [0.6, 0.2, 0.2],
+    [0.3, 0.3, 0.1, 0.1, 0.1, 0.1],
+    [3, 1, 1],
+])
+def test_exact_60_and_80_percent_after_large_groups(margins):
+    # перед проверяемой группой — группы с крупной дробной маржой: общий
+    # cumsum велик, и доля группы считается как разность больших чисел
+    big = [1234567.891, 987654.321, 555555.555]
+    n_before = 3000
+    margin = big * n_before + margins
+    groups = [i // 3 for i in range(3 * n_before)] + [n_before] * len(margins)
+    marginality = [25.0] * len(margin)
+    check(margin, marginality, groups)
+    classes, share = classify_abc(margin, marginality, groups)
+    tail = list(classes[-len(margins):])
+    assert tail[0] == "A" and share[-1] == 1.0
+
+
+def test_boundary_marginality_thresholds():
+    margin = [60, 20, 20] * 3
+    marginality = [20, 15, 15, 15, 15, 30, 14.9, 20, 10]
+    groups = ["a"] * 3 + ["b"] * 3 + ["c"] * 3
+    check(margin, marginality, groups)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_grouped_catalog_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    n = 5000
+    # целая маржа в малых группах — много товаров ровно на пороге
+    margin = rng.integers(1, 6, n).astype(float).tolist()
+    marginality = rng.choice([10.0, 15.0, 17.0, 20.0, 25.0], n).tolist()
+    groups = rng.integers(0, 1500, n).tolist()
+    check(margin, marginality, groups)
+    check((np.asarray(margin) * rng.uniform(0.5, 2.0, n)).tolist(), marginality, groups)
+
+
+def test_abcdx_novelty_and_loss_rows_are_not_ranked():
+    classes, share = classify_abcdx([60, 20, 20, -5, 100], [25, 25, 25, 25, 25],
+                                    [False, False, False, False, True])
+    assert list(classes) == ["A", "B", "C", "D", "X"]
+    assert np.isnan(share[3]) and np.isnan(share[4])
@@ -0,0 +1,61 @@
+"""
+Библиотека ценового анализа: загрузка продаж, эластичность, целевые цены, графики.
+
+Модули:
+  loader      — чтение листа «Продажи» (словари для arc-метода, numpy-панель)
+  estimator   — arc-эластичность, тип спроса, привязка OLS/бутстреп-оценок
+  optimizer   — целевые цены: 2× объёма и максимум прибыли (юнит-экономика)
+  ols         — батч log-log регрессия по всем SKU (numpy)
+  bootstrap   — бутстреп-ДИ эластичности и P_2x
+  crossprice  — перекрёстная эластичность (scipy.sparse), симулятор цен
+  incremental — достаточные статистики в файле состояния, дозагрузка недель
+  backtest    — бэктест стратегий репрайсера MP Manager на истории продаж
+  report      — консольные таблицы
+  plotting    — графики PNG (matplotlib; импортируется отдельно)
+
+Импорт пакета не имеет побочных эффектов (не читает файлы, не трогает
+настройки matplotlib). Точки входа: PRJ_PRICING/price_elasticity.py и
+PRJ_MARKETPLACE/price_elasticity_analysis.py.
+
+Использование:
+    from pricing import load_data, calc_elasticity
+    from pricing.plotting import plot_all
+    sku_price_qty, sku_platform_data, costs = load_data(path)
+    results = calc_elasticity(sku_price_qty, costs)
+    plot_all(results, sku_price_qty, sku_platform_data, 'reports')
+"""
+
+from .loader import load_data, load_panel, read_sales
+from .estimator import (
+    calc_elasticity,
+    calc_elasticity_levels,
+    price_levels,
+    elasticity_type,
+    elasticity_color,
+    attach_ols,
+    attach_bootstrap,
+    is_unreliable,
+    elasticity_array,
+    reliable_array,
+)
+from .optimizer import log_linear_target, unit_economics, profit_max_price, optimize_prices
+
+__all__ = [
+    'load_data',
+    'load_panel',
+    'read_sales',
+    'calc_elasticity',
+    'calc_elasticity_levels',
+    'price_levels',
+    'elasticity_type',
+    'elasticity_color',
+    'attach_ols',
+    'attach_bootstrap',
+    'is_unreliable',
+    'elasticity_array',
+    'reliable_array',
+    'log_linear_target',
+    'unit_economics',
+    'profit_max_price',
+    'optimize_prices',
+]
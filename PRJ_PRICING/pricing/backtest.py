@@ -0,0 +1,223 @@
+"""
+Бэктест стратегий репрайсера MP Manager (см. mpmgr/README.md) на истории продаж.
+
+Каждая неделя истории проигрывается заново: стратегия назначает цену,
+модель спроса пересчитывает продажи, склад списывает проданное.
+
+Цена недели (порядок как у правил репрайсера):
+  1. По конкурентам: P = P_конк · (1 + comp_offset); выключено (None) —
+     цена прошлой недели. Нужен ряд цен конкурента (competitor_price в
+     build_market): подставлять свою историю нельзя — стратегия свелась бы
+     к повтору истории
+  2. По остаткам: запас < stock_low недель → +stock_step,
+     запас > stock_high недель → −stock_step (stock_step = 0 — выключено)
+  3. Удержание маржинальности: P ≥ (себестоимость + логистика) / (k − margin_floor),
+     k = 1 − комиссия − ДРР (None — выключено)
+  4. Мин/макс цена: коридор [min_change, max_change] от средней исторической цены
+  5. Защита от скачков: изменение > max_jump за неделю не применяется
+follow_history=True — базовый сценарий: исторические цены без правил.
+
+Модель спроса — постоянная эластичность относительно истории:
+  Q_w = Q_ист,w · (P / P_ист,w)^E
+поэтому сезонность и акции недели остаются в прогоне. E вне [e_min, e_max]
+обрезается (оценки по двум ценам бывают экстремальными); границы задаются
+в repricer_backtest.py ключами --e-min / --e-max (по умолчанию [−5; −0.3]).
+
+Склад (остатков в данных нет — модель): старт initial_cover недель среднего
+спроса, поставка restock_cover недель каждые restock_every недель.
+Продажи = min(спрос, остаток); неделя со спросом больше остатка — OOS.
+
+Векторизация: все конфигурации и все SKU × площадки считаются массивами
+(C, S, P), цикл только по неделям. Пачки конфигураций можно раздать
+по процессам (workers > 1).
+
+Использование:
+    from pricing.backtest import build_market, param_grid, run_backtest
+    market = build_market(panel, elasticity)          # competitor_price=(S, P, W) — для comp_offset
+    configs = param_grid(stock_step=[0.0, 0.05], margin_floor=[None, 0.2])
+    metrics = run_backtest(market, configs, workers=4)      # ValueError — недопустимая конфигурация
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .optimizer import unit_economics
+
+DEFAULTS = {
+    'follow_history': False,
+    'comp_offset': None,      # None — стратегия «по конкурентам» выключена
+    'stock_low': 2.0,         # недель запаса
+    'stock_high': 8.0,
+    'stock_step': 0.0,        # доля изменения цены; 0 — выключено
+    'margin_floor': None,     # целевая маржинальность (доля цены); None — выключено
+    'min_change': -0.30,
+    'max_change': 0.30,
+    'max_jump': 0.20,
+    'initial_cover': 4.0,
+    'restock_every': 4,
+    'restock_cover': 4.0,
+}
+
+METRICS = ('revenue', 'profit', 'margin', 'qty', 'lost_qty', 'oos_share')
+
+
+def param_grid(**values):
+    """Декартово произведение параметров → список конфигураций (DEFAULTS + значения)."""
+    keys = list(values)
+    return [{**DEFAULTS, **dict(zip(keys, combo))}
+            for combo in itertools.product(*(values[k] for k in keys))]
+
+
+def build_market(panel, elasticity, competitor_price=None, e_min=-5.0, e_max=-0.3):
+    """История на сетке (SKU, площадка, неделя) + юнит-экономика + эластичность.
+
+    elasticity — (S,) в порядке panel['skus']; NaN заменяется медианой.
+    competitor_price — (S, P, W) цены конкурента; None — данных нет, и
+    конфигурации с comp_offset отклоняются (check_configs).
+    """
+    n_skus = len(panel['skus'])
+    n_plat = len(panel['platforms'])
+    n_weeks = len(panel['weeks'])
+    shape = (n_skus, n_plat, n_weeks)
+
+    price = np.full(shape, np.nan)
+    qty = np.zeros(shape)
+    idx = (panel['sku_idx'], panel['platform_idx'], panel['week_idx'])
+    price[idx] = panel['price']
+    qty[idx] = panel['qty']
+
+    ue = unit_economics(panel)
+    active = np.isfinite(ue['price'])
+    # Недели без продаж: цена — средняя по SKU × площадке
+    price = np.where(np.isfinite(price), price, ue['price'][..., None])
+
+    e = np.asarray(elasticity, dtype=np.float64)
+    fill = np.nanmedian(e) if np.isfinite(e).any() else -1.5
+    e = np.clip(np.where(np.isfinite(e), e, fill), e_min, e_max)
+
+    return {
+        'price': price,
+        'qty': qty,
+        'competitor': None if competitor_price is None else np.asarray(competitor_price, dtype=np.float64),
+        'base_price': ue['price'],
+        'avg_qty': np.nan_to_num(qty.sum(axis=2) / n_weeks),
+        'unit_cost': np.nan_to_num(ue['unit_cost'] + ue['logistics']),
+        'net_share': np.nan_to_num(1 - ue['commission'] - ue['drr']),
+        'elasticity': e,
+        'active': active,
+    }
+
+
+def check_configs(market, configs):
+    """ValueError, если конфигурацию нельзя честно прогнать на этом рынке.
+
+    comp_offset без ряда цен конкурента — нечего догонять; margin_floor не
+    меньше доли цены после комиссии и рекламы (k) хотя бы у одного SKU —
+    такую маржу не даёт никакая цена, и пол молча пропал бы.
+    """
+    active = market['active']
+    k_min = market['net_share'][active].min() if active.any() else 1.0
+    for config in configs:
+        if config['comp_offset'] is not None and market['competitor'] is None:
+            raise ValueError('comp_offset задан, а цен конкурента нет (competitor_price в build_market)')
+        floor = config['margin_floor']
+        if floor is not None and not 0 <= floor < k_min:
+            raise ValueError(f'margin_floor = {floor:g} вне [0; {k_min:.3f}): k = 1 − комиссия − ДРР '
+                             f'у части SKU не выше, маржа недостижима')
+
+
+def _param(configs, key):
+    """Параметр всех конфигураций как массив (C, 1, 1); None → NaN."""
+    vals = [c[key] for c in configs]
+    return np.array([np.nan if v is None else float(v) for v in vals])[:, None, None]
+
+
+def simulate(market, configs):
+    """Прогнать пачку конфигураций; возвращает dict метрик, массивы длины C."""
+    C = len(configs)
+    hp, hq = market['price'], market['qty']
+    S, P, W = hp.shape
+    active = market['active']
+    E = market['elasticity'][:, None]                               # (S, 1)
+    u, k = market['unit_cost'], market['net_share']
+    base, avg_q = np.nan_to_num(market['base_price']), market['avg_qty']
+
+    history = _param(configs, 'follow_history') > 0
+    offset = _param(configs, 'comp_offset')
+    has_comp = np.isfinite(offset)
+    low, high = _param(configs, 'stock_low'), _param(configs, 'stock_high')
+    step = _param(configs, 'stock_step')
+    floor_m = _param(configs, 'margin_floor')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # k − floor_m > 0 у активных SKU гарантирует check_configs
+        floor = np.where(np.isfinite(floor_m) & (k - floor_m > 0), u / (k - floor_m), 0.0)
+    p_lo = base * (1 + _param(configs, 'min_change'))
+    p_hi = base * (1 + _param(configs, 'max_change'))
+    max_jump = _param(configs, 'max_jump')
+    every = _param(configs, 'restock_every')
+    restock = _param(configs, 'restock_cover') * avg_q
+
+    stock = _param(configs, 'initial_cover') * avg_q + np.zeros((C, S, P))
+    prev = np.broadcast_to(hp[:, :, 0], (C, S, P)).copy()
+    totals = {key: np.zeros((C, S, P)) for key in ('revenue', 'profit', 'qty', 'lost_qty', 'oos')}
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for w in range(W):
+            if w > 0:
+                stock = stock + np.where(w % every == 0, restock, 0.0)
+            hp_w, hq_w = hp[:, :, w], hq[:, :, w]
+
+            def demand(p):
+                return hq_w * (p / hp_w) ** E
+
+            p = prev
+            if market['competitor'] is not None:
+                p = np.where(has_comp, market['competitor'][:, :, w] * (1 + np.nan_to_num(offset)), prev)
+            cover = stock / demand(p)
+            p = np.where(cover < low, p * (1 + step), np.where(cover > high, p * (1 - step), p))
+            p = np.maximum(p, floor)
+            p = np.clip(p, p_lo, p_hi)
+            p = np.where(np.abs(p / prev - 1) > max_jump, prev, p)
+            p = np.where(history, hp_w, p)
+
+            q = np.nan_to_num(demand(p))
+            sold = np.minimum(q, stock)
+            stock = stock - sold
+            totals['revenue'] += sold * p
+            totals['profit'] += sold * (p * k - u)
+            totals['qty'] += sold
+            totals['lost_qty'] += q - sold
+            totals['oos'] += q > sold + 1e-9
+            prev = p
+
+    act = active[None]
+    out = {key: np.where(act, val, 0.0).sum(axis=(1, 2)) for key, val in totals.items()}
+    out['margin'] = np.divide(out['profit'], out['revenue'], out=np.zeros(C), where=out['revenue'] > 0)
+    out['oos_share'] = out.pop('oos') / max(1, active.sum() * W)
+    return out
+
+
+def _run_chunk(args):
+    market, configs = args
+    return simulate(market, configs)
+
+
+def run_backtest(market, configs, workers=1, chunk=None):
+    """Прогнать все конфигурации; пачки — по процессам при workers > 1.
+
+    Возвращает dict метрик (массивы длины len(configs), порядок configs):
+    revenue, profit, margin, qty, lost_qty, oos_share. Недопустимая
+    конфигурация — ValueError до прогона (check_configs).
+    """
+    check_configs(market, configs)
+    if chunk is None:
+        chunk = max(1, -(-len(configs) // max(1, workers * 2)))
+    parts = [configs[i:i + chunk] for i in range(0, len(configs), chunk)]
+    if workers > 1 and len(parts) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chunk, [(market, part) for part in parts]))
+    else:
+        results = [simulate(market, part) for part in parts]
+    return {key: np.concatenate([r[key] for r in results]) for key in METRICS}
@@ -0,0 +1,197 @@
+"""
+Бутстреп-доверительные интервалы для эластичности и целевой цены 2× объёма.
+
+Ресэмплинг по неделям (кластерный бутстреп): в каждой реплике недели
+выбираются с возвращением, и все наблюдения недели (все SKU и площадки)
+получают вес = числу попаданий недели в выборку.
+
+Векторизация:
+  1. Статистики X'X, X'y, n, Σq агрегируются один раз по блокам (SKU, неделя).
+  2. Для пачки реплик веса недель — матрица counts (B, W), и суммы по всем
+     SKU получаются одним матричным умножением counts @ блоки (GEMM).
+  3. Нормальные уравнения (B, S, K, K) решаются батчем np.linalg.solve
+     (для базовой модели K = 2 — явной формулой без LAPACK).
+  4. Перцентили — одна сортировка реплик по оси B.
+Пачки реплик можно раздать по процессам (workers > 1).
+
+Целевая цена 2× объёма в реплике:
+  a_eff = (Σw·lnQ − E·Σw·lnP) / Σw       — средний «уровень» спроса
+  P_2x  = exp((ln(2·Q̄) − a_eff) / E)     — Q̄ = Σw·Q / Σw
+
+Использование:
+    from pricing import load_panel
+    from pricing.bootstrap import bootstrap_elasticity
+    boot = bootstrap_elasticity(load_panel(path), n_resamples=1000, workers=4)
+    boot['elasticity_lo'], boot['elasticity_hi'], boot['p_target_lo'], boot['p_target_hi']
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .ols import design_features, fit_loglog
+
+# Ограничение на промежуточный массив (B_chunk, S, K, K) одной пачки, байт
+CHUNK_BYTES = 256 * 1024 * 1024
+
+
+def week_blocks(panel, platform_fe=False, week_fe=False, seasonality=False):
+    """Агрегировать статистики по блокам (SKU, неделя).
+
+    Возвращает dict с массивами, у которых первая ось — неделя (W), чтобы
+    реплики получались умножением counts (B, W) @ блок (W, ...):
+      xx (W, S, K, K), xy (W, S, K), n (W, S), sum_y, sum_x, sum_q (W, S)
+    """
+    feats, columns = design_features(panel, platform_fe, week_fe, seasonality)
+    n_skus = len(panel['skus'])
+    n_weeks = len(panel['weeks'])
+    K = len(columns)
+    log_q = np.log(panel['qty'])
+    key = panel['week_idx'] * n_skus + panel['sku_idx']
+    size = n_weeks * n_skus
+
+    def agg(values):
+        return np.bincount(key, weights=values, minlength=size).reshape(n_weeks, n_skus)
+
+    xx = np.empty((n_weeks, n_skus, K, K))
+    for k in range(K):
+        for m in range(k, K):
+            xx[:, :, k, m] = xx[:, :, m, k] = agg(feats[:, k] * feats[:, m])
+    xy = np.stack([agg(feats[:, k] * log_q) for k in range(K)], axis=-1)
+
+    return {
+        'xx': xx,
+        'xy': xy,
+        'n': agg(np.ones_like(log_q)),
+        'sum_y': agg(log_q),
+        'sum_x': agg(feats[:, 1]),
+        'sum_q': agg(panel['qty']),
+        'columns': columns,
+    }
+
+
+def _solve_replicates(counts, blocks):
+    """Эластичность и P_2x для пачки реплик: counts (B, W) → (B, S), (B, S)."""
+    B, W = counts.shape
+    _, S, K, _ = blocks['xx'].shape
+    c = counts.astype(np.float64)
+
+    XtX = (c @ blocks['xx'].reshape(W, -1)).reshape(B, S, K, K)
+    Xty = (c @ blocks['xy'].reshape(W, -1)).reshape(B, S, K)
+    n = c @ blocks['n']
+    sum_y = c @ blocks['sum_y']
+    sum_x = c @ blocks['sum_x']
+    sum_q = c @ blocks['sum_q']
+
+    # Вырожденные системы (мало наблюдений в реплике) → NaN
+    if K == 2:
+        # Базовая модель lnQ ~ a + E·lnP: решение 2×2 в явном виде
+        a, b, d = XtX[..., 0, 0], XtX[..., 0, 1], XtX[..., 1, 1]
+        det = a * d - b * b
+        ok = (det > 1e-10 * a * d) & (n > K)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (a * Xty[..., 1] - b * Xty[..., 0]) / det
+        coef = np.stack([np.zeros_like(slope), slope], axis=-1)
+    else:
+        sign, logdet = np.linalg.slogdet(XtX)
+        scale = np.sum(np.log(np.clip(np.diagonal(XtX, axis1=-2, axis2=-1), 1e-300, None)), axis=-1)
+        ok = (sign > 0) & (logdet - scale > np.log(1e-10)) & (n > K)
+        XtX[~ok] = np.eye(K)
+        Xty[~ok] = 0.0
+        coef = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+    e = np.where(ok, coef[..., 1], np.nan)
+    with np.errstate(all='ignore'):
+        a_eff = (sum_y - e * sum_x) / n
+        q_mean = sum_q / n
+        p_target = np.exp((np.log(2 * q_mean) - a_eff) / e)
+    p_target[~np.isfinite(p_target) | (e >= 0)] = np.nan
+    return e, p_target
+
+
+def _nan_quantiles(values, qs):
+    """Квантили по оси 0 без NaN (линейная интерполяция, как np.nanquantile).
+
+    Одна сортировка столбцов вместо медленного np.nanquantile: NaN уходят
+    в конец, позиция квантиля считается от числа валидных значений.
+    """
+    ordered = np.sort(values, axis=0)
+    n_valid = np.isfinite(values).sum(axis=0)
+    out = []
+    for q in qs:
+        pos = q * np.clip(n_valid - 1, 0, None)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, np.clip(n_valid - 1, 0, None))
+        frac = pos - lo
+        v_lo = np.take_along_axis(ordered, lo[None], axis=0)[0]
+        v_hi = np.take_along_axis(ordered, hi[None], axis=0)[0]
+        out.append(np.where(n_valid > 0, v_lo + (v_hi - v_lo) * frac, np.nan))
+    return out
+
+
+def _run_chunk(args):
+    """Задача для пула процессов: одна пачка реплик со своим seed."""
+    seed_seq, n_rep, blocks = args
+    rng = np.random.default_rng(seed_seq)
+    W = blocks['n'].shape[0]
+    counts = rng.multinomial(W, np.full(W, 1.0 / W), size=n_rep)
+    return _solve_replicates(counts, blocks)
+
+
+def bootstrap_elasticity(panel, n_resamples=1000, ci=0.95, platform_fe=False,
+                         week_fe=False, seasonality=False, seed=42, workers=1):
+    """Бутстреп-ДИ для эластичности и P_2x по всем SKU.
+
+    Возвращает dict с массивами длины S (порядок panel['skus']):
+      elasticity, p_target_2x         — точечные оценки (все недели, вес 1)
+      elasticity_lo/_hi, p_target_lo/_hi — границы ДИ уровня ci (перцентили)
+      n_valid                          — число невырожденных реплик
+      n_price_levels                   — число различных цен у SKU
+    """
+    blocks = week_blocks(panel, platform_fe, week_fe, seasonality)
+    W, S, K, _ = blocks['xx'].shape
+
+    # Точечная оценка: все недели с весом 1 (совпадает с fit_loglog)
+    e_point, p_point = _solve_replicates(np.ones((1, W)), blocks)
+    identified = fit_loglog(panel, platform_fe, week_fe, seasonality)['elasticity_identified']
+    e_point = np.where(identified, e_point[0], np.nan)
+    p_point = np.where(identified, p_point[0], np.nan)
+
+    chunk = max(1, min(n_resamples, CHUNK_BYTES // max(1, S * K * K * 8 * 2)))
+    if workers > 1:
+        chunk = max(1, min(chunk, -(-n_resamples // (workers * 2))))
+    sizes = [min(chunk, n_resamples - i) for i in range(0, n_resamples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(sq, n, blocks) for sq, n in zip(seeds, sizes)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, tasks))
+    else:
+        parts = [_run_chunk(t) for t in tasks]
+
+    e_boot = np.concatenate([p[0] for p in parts], axis=0)
+    p_boot = np.concatenate([p[1] for p in parts], axis=0)
+    e_boot[:, ~identified] = np.nan
+    p_boot[:, ~identified] = np.nan
+
+    alpha = (1 - ci) / 2
+    e_lo, e_hi = _nan_quantiles(e_boot, (alpha, 1 - alpha))
+    p_lo, p_hi = _nan_quantiles(p_boot, (alpha, 1 - alpha))
+
+    pairs = np.unique(np.stack([panel['sku_idx'], panel['price']], axis=1), axis=0)
+    n_levels = np.bincount(pairs[:, 0].astype(np.int64), minlength=S)
+
+    return {
+        'skus': panel['skus'],
+        'elasticity': e_point,
+        'elasticity_lo': e_lo,
+        'elasticity_hi': e_hi,
+        'p_target_2x': p_point,
+        'p_target_lo': p_lo,
+        'p_target_hi': p_hi,
+        'n_valid': np.sum(np.isfinite(e_boot), axis=0),
+        'n_price_levels': n_levels,
+        'n_resamples': n_resamples,
+        'ci': ci,
+    }
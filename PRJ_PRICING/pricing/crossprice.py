@@ -0,0 +1,267 @@
+"""
+Перекрёстная эластичность внутри категории (каннибализация).
+
+Модель спроса SKU i:
+  ln Q_i = a_i + E_ii·ln P_i + Σ_{j ∈ N(i)} E_ij·ln P_j
+N(i) — k ближайших по цене SKU той же категории (конкуренты за ту же полку).
+E_ij > 0 — товары-заменители: рост цены j переводит спрос на i.
+
+Матрица E (S × S) хранится как scipy.sparse CSR: в строке ≤ k + 1 ненулевых,
+поэтому категория на 2 000 SKU — 2 000·(k + 1) чисел, а не 4 млн.
+
+Оценка — батчем по всем SKU, как в ols.py: наблюдения (площадка × неделя)
+укладываются в массив (S, T, k + 1), признаки центрируются по SKU,
+и нормальные уравнения с ridge-штрафом на все коэффициенты (в долях
+дисперсии признака) решаются одним np.linalg.solve.
+
+Соседи по цене часто меняют цену синхронно со своей (акции по всей
+категории), и тогда E_ii и E_ij не разделяются: штраф только на перекрёстные
+члены переносил весь эффект в E_ii (−16 против −0.03 у OLS). Поэтому у
+каждого SKU считается индекс обусловленности матрицы признаков (√cond
+корреляционной матрицы); выше max_cond (по умолчанию 30) перекрёстные члены
+отбрасываются, а E_ii — обычный МНК по своей цене, как в ols.py.
+
+Использование:
+    from pricing import load_panel
+    from pricing.crossprice import fit_cross_elasticity, simulate_prices
+    panel = load_panel(path)
+    cross = fit_cross_elasticity(panel, k=5)
+    sim = simulate_prices(panel, cross, {1: -0.10, 3: +0.05})
+    sim['category_qty'], sim['category_qty_new']
+"""
+
+import numpy as np
+from scipy import sparse
+
+from .optimizer import unit_economics
+
+MAX_COND = 30.0     # индекс обусловленности: выше — соседи не отделимы от своей цены
+
+
+def _mean_log_price(panel):
+    """Средняя ln-цена SKU по всем наблюдениям (S,)."""
+    n_skus = len(panel['skus'])
+    sums = np.bincount(panel['sku_idx'], weights=np.log(panel['price']), minlength=n_skus)
+    counts = np.bincount(panel['sku_idx'], minlength=n_skus)
+    return np.divide(sums, counts, out=np.full(n_skus, np.nan), where=counts > 0)
+
+
+def price_neighbours(panel, k=5):
+    """k ближайших по средней цене SKU из той же категории.
+
+    Возвращает массив (S, k) индексов соседей; −1 — соседа нет (в категории
+    меньше k + 1 SKU). Без цикла по SKU: внутри категорий SKU сортируются
+    по цене, кандидаты — k позиций слева и справа, из них argpartition
+    выбирает k ближайших.
+    """
+    n_skus = len(panel['skus'])
+    if n_skus == 0 or k <= 0:
+        return np.full((n_skus, max(k, 0)), -1, dtype=np.int64)
+    _, cat_codes = np.unique(np.asarray(panel['categories']), return_inverse=True)
+    log_p = _mean_log_price(panel)
+
+    order = np.lexsort((log_p, cat_codes))
+    cat_sorted = cat_codes[order]
+    p_sorted = log_p[order]
+    pos = np.arange(n_skus)
+
+    offsets = np.concatenate([np.arange(-k, 0), np.arange(1, k + 1)])
+    cand = pos[:, None] + offsets[None, :]
+    inside = (cand >= 0) & (cand < n_skus)
+    cand_c = np.clip(cand, 0, n_skus - 1)
+    valid = inside & (cat_sorted[cand_c] == cat_sorted[:, None])
+    dist = np.where(valid, np.abs(p_sorted[cand_c] - p_sorted[:, None]), np.inf)
+
+    pick = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    nb_sorted = np.take_along_axis(cand_c, pick, axis=1)
+    nb_ok = np.isfinite(np.take_along_axis(dist, pick, axis=1))
+
+    neighbours = np.full((n_skus, k), -1, dtype=np.int64)
+    neighbours[order] = np.where(nb_ok, order[nb_sorted], -1)
+    return neighbours
+
+
+def _condition_index(XtX, var):
+    """√cond корреляционной матрицы признаков SKU (S,); столбцы без дисперсии не учитываются."""
+    K = XtX.shape[1]
+    scale = np.sqrt(var)
+    live = scale > 1e-12
+    both = live[:, :, None] & live[:, None, :]
+    corr = np.where(both, XtX / np.where(both, scale[:, :, None] * scale[:, None, :], 1.0), 0.0)
+    corr[:, np.arange(K), np.arange(K)] = 1.0
+    return np.sqrt(np.linalg.cond(corr))
+
+
+def _own_price_fit(log_p, log_q):
+    """МНК ln Q = a + E·ln P по своей цене для всех SKU: (E, a, n), NaN — не оценить."""
+    m = np.isfinite(log_p) & np.isfinite(log_q)
+    n = m.sum(axis=1).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(m, log_p, 0.0).sum(axis=1) / n
+        y_mean = np.where(m, log_q, 0.0).sum(axis=1) / n
+        xc = np.where(m, log_p - x_mean[:, None], 0.0)
+        yc = np.where(m, log_q - y_mean[:, None], 0.0)
+        sxx = (xc * xc).sum(axis=1)
+        e = np.where((n >= 3) & (sxx > 1e-12), (xc * yc).sum(axis=1) / sxx, np.nan)
+    return e, y_mean - e * x_mean, n
+
+
+def _log_price_grid(panel):
+    """ln-цена на сетке (SKU, площадка × неделя); NaN — нет продаж."""
+    n_skus = len(panel['skus'])
+    n_plat = len(panel['platforms'])
+    n_weeks = len(panel['weeks'])
+    grid = np.full((n_skus, n_plat * n_weeks), np.nan)
+    grid[panel['sku_idx'], panel['platform_idx'] * n_weeks + panel['week_idx']] = np.log(panel['price'])
+    return grid
+
+
+def fit_cross_elasticity(panel, k=5, ridge=0.1, max_cond=MAX_COND):
+    """Оценить собственные и перекрёстные эластичности по категориям.
+
+    k — число соседей по цене (ближайшие по средней цене в категории, а не
+    вся категория); ridge — штраф на все коэффициенты в долях дисперсии
+    признака (0 — обычный МНК); max_cond — предел индекса обусловленности,
+    выше него у SKU остаётся только E_ii по своей цене.
+
+    Возвращает dict:
+      matrix      — scipy.sparse.csr_matrix (S, S): E_ii на диагонали, E_ij вне
+      own         — E_ii (S,)
+      neighbours  — (S, k) индексы соседей (−1 — нет)
+      intercept   — a_i (S,)
+      n_obs       — число наблюдений в регрессии SKU
+      cond        — индекс обусловленности признаков SKU (S,)
+      own_only    — (S,) True — соседи коллинеарны со своей ценой, E_ij отброшены
+      max_cond    — использованный предел индекса обусловленности
+    """
+    n_skus = len(panel['skus'])
+    neighbours = price_neighbours(panel, k)
+    log_p = _log_price_grid(panel)
+    log_q = np.full_like(log_p, np.nan)
+    n_weeks = len(panel['weeks'])
+    log_q[panel['sku_idx'], panel['platform_idx'] * n_weeks + panel['week_idx']] = np.log(panel['qty'])
+
+    # Признаки: своя цена + цены соседей в те же (площадка, неделя)
+    has_nb = neighbours >= 0
+    cols = np.concatenate([np.arange(n_skus)[:, None], np.where(has_nb, neighbours, 0)], axis=1)
+    X = log_p[cols]                                    # (S, k + 1, T)
+    X[:, 1:][~has_nb] = 0.0
+    X = np.moveaxis(X, 1, 2)                           # (S, T, k + 1)
+    y = log_q
+
+    # Наблюдение используется, если известны спрос и все цены строки
+    mask = np.isfinite(y) & np.all(np.isfinite(X), axis=2)
+    w = mask.astype(np.float64)
+    n = w.sum(axis=1)
+    X = np.where(mask[..., None], X, 0.0)
+    y = np.where(mask, y, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.einsum('st,stk->sk', w, X) / n[:, None]
+        y_mean = (w * y).sum(axis=1) / n
+    x_mean = np.nan_to_num(x_mean)
+    y_mean = np.nan_to_num(y_mean)
+    Xc = (X - x_mean[:, None, :]) * w[..., None]
+    yc = (y - y_mean[:, None]) * w
+
+    K = X.shape[2]
+    XtX = np.einsum('stk,stl->skl', Xc, Xc)
+    Xty = np.einsum('stk,st->sk', Xc, yc)
+    var = np.diagonal(XtX, axis1=1, axis2=2).copy()
+    cond = _condition_index(XtX, var)
+    # Штраф в долях дисперсии признака (не зависит от масштаба цен);
+    # 1e-10 — чтобы система не была вырожденной
+    XtX += (ridge * var + 1e-10)[:, :, None] * np.eye(K)
+    coef = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+    # Меньше 3 наблюдений — оценок нет; своя цена не менялась — нет E_ii
+    coef[n < 3] = np.nan
+    coef[var[:, 0] <= 1e-12, 0] = np.nan
+    intercept = y_mean - np.einsum('sk,sk->s', coef, x_mean)
+
+    # Коллинеарные соседи — только своя цена по всем её наблюдениям, без штрафа (как OLS)
+    own_only = has_nb.any(axis=1) & ~(cond <= max_cond)
+    e_own, a_own, n_own = _own_price_fit(log_p, log_q)
+    coef[own_only, 1:] = 0.0
+    coef[own_only, 0] = e_own[own_only]
+    intercept[own_only] = a_own[own_only]
+    n[own_only] = n_own[own_only]
+
+    # CSR: строка i — [i, соседи i]; соседей −1 выкидываем
+    rows = np.repeat(np.arange(n_skus), K)
+    keep = np.concatenate([np.ones((n_skus, 1), dtype=bool), has_nb & ~own_only[:, None]], axis=1).ravel()
+    keep &= np.isfinite(coef).ravel()
+    matrix = sparse.csr_matrix(
+        (coef.ravel()[keep], (rows[keep], cols.ravel()[keep])), shape=(n_skus, n_skus),
+    )
+
+    return {
+        'matrix': matrix,
+        'own': coef[:, 0],
+        'neighbours': neighbours,
+        'intercept': intercept,
+        'n_obs': n,
+        'cond': cond,
+        'own_only': own_only,
+        'max_cond': max_cond,
+        'skus': panel['skus'],
+    }
+
+
+def simulate_prices(panel, cross, price_change):
+    """Прогноз объёма и прибыли категорий при одновременном изменении цен.
+
+    price_change — {sku: доля} (−0.10 = −10%) или массив (S,) долей.
+    Цена меняется одинаково на всех площадках; отклик спроса:
+      ln Q'_i = ln Q_i + Σ_j E_ij · ln(1 + Δ_j)   — одно sparse-умножение.
+    Базовая точка и юнит-экономика — unit_economics (SKU × площадка, за неделю).
+
+    Возвращает dict:
+      qty, qty_new, profit, profit_new          — (S, P) за неделю
+      categories                                — имена категорий
+      category_qty, category_qty_new,
+      category_profit, category_profit_new      — суммы по категориям
+      own_only                                  — SKU, затронутые изменением
+                                                  (сами или как соседи), у которых
+                                                  перекрёстные члены отброшены
+    """
+    n_skus = len(panel['skus'])
+    if isinstance(price_change, dict):
+        sku_pos = {sku: i for i, sku in enumerate(panel['skus'].tolist())}
+        delta = np.zeros(n_skus)
+        for sku, d in price_change.items():
+            delta[sku_pos[sku]] = d
+    else:
+        delta = np.asarray(price_change, dtype=np.float64)
+
+    ue = unit_economics(panel)
+    log_ratio = np.log1p(delta)
+    matrix = cross['matrix']
+    dlog_q = matrix @ log_ratio                                   # (S,)
+
+    price_new = ue['price'] * (1 + delta)[:, None]
+    qty_new = ue['qty_week'] * np.exp(dlog_q)[:, None]
+    k = 1 - ue['commission'] - ue['drr']
+    u = ue['unit_cost'] + ue['logistics']
+    profit = ue['qty_week'] * (ue['price'] * k - u)
+    profit_new = qty_new * (price_new * k - u)
+
+    categories, cat_codes = np.unique(np.asarray(panel['categories']), return_inverse=True)
+    changed = np.flatnonzero(delta != 0)
+    touched = (delta != 0) | np.isin(cross['neighbours'], changed).any(axis=1)
+
+    def by_cat(values):
+        return np.bincount(cat_codes, weights=np.nansum(values, axis=1), minlength=len(categories))
+
+    return {
+        'qty': ue['qty_week'],
+        'qty_new': qty_new,
+        'profit': profit,
+        'profit_new': profit_new,
+        'categories': categories.tolist(),
+        'category_qty': by_cat(ue['qty_week']),
+        'category_qty_new': by_cat(qty_new),
+        'category_profit': by_cat(profit),
+        'category_profit_new': by_cat(profit_new),
+        'own_only': panel['skus'][touched & cross['own_only']].tolist(),
+    }
@@ -0,0 +1,186 @@
+"""
+Оценка эластичности спроса по цене.
+
+Arc-эластичность (метод средней точки) между минимальной и максимальной ценой:
+  E = ((Q2 − Q1) / Q̄) / ((P2 − P1) / P̄)
+  E < -1  → эластичный спрос (цена вниз → выручка вверх)
+  E > -1  → неэластичный спрос (цена вниз → выручка вниз)
+  E = -1  → единичная эластичность
+
+Здесь же — привязка к результатам оценок log-log OLS (ols.py)
+и бутстреп-ДИ (bootstrap.py).
+"""
+
+import math
+
+import numpy as np
+
+from .optimizer import log_linear_target
+
+ELASTIC = -1.0
+INELASTIC = -0.5
+
+
+def elasticity_type(e):
+    """Тип спроса для таблицы: ЭЛАСТИЧН. / ~ЕДИНИЧН. / НЕЭЛАСТИЧН."""
+    if e < ELASTIC:
+        return "ЭЛАСТИЧН."
+    if e > INELASTIC:
+        return "НЕЭЛАСТИЧН."
+    return "~ЕДИНИЧН."
+
+
+def elasticity_color(e):
+    """Цвет на графиках: красный — эластичный, зелёный — неэластичный."""
+    return '#d32f2f' if e < ELASTIC else '#388e3c' if e > INELASTIC else '#f57c00'
+
+
+def price_levels(sku_price_qty):
+    """{key: {price: [qty, ...]}} → {key: {price: (число недель, Σ qty)}}."""
+    return {key: {p: (len(qs), sum(qs)) for p, qs in price_data.items()}
+            for key, price_data in sku_price_qty.items()}
+
+
+def calc_elasticity(sku_price_qty, costs):
+    """Рассчитать эластичность для каждого SKU."""
+    return calc_elasticity_levels(price_levels(sku_price_qty), costs)
+
+
+def calc_elasticity_levels(levels, costs):
+    """Эластичность по агрегатам уровней цены {key: {price: (n, Σ qty)}}.
+
+    Для arc-метода достаточно числа недель и суммы продаж на каждом уровне
+    цены — поэтому те же расчёты работают и по накопленному состоянию
+    (incremental.py), без исходных строк.
+    """
+    results = []
+
+    for (sku, name, cat), price_data in sorted(levels.items()):
+        prices = sorted(price_data.keys())
+        if len(prices) < 2:
+            continue
+
+        avg_qty_by_price = {p: q_sum / n for p, (n, q_sum) in price_data.items()}
+        p_low, p_high = prices[0], prices[-1]
+        q_low, q_high = avg_qty_by_price[p_low], avg_qty_by_price[p_high]
+
+        p_avg = (p_low + p_high) / 2
+        q_avg = (q_low + q_high) / 2
+
+        if p_avg == 0 or q_avg == 0:
+            continue
+
+        elasticity = ((q_high - q_low) / q_avg) / ((p_high - p_low) / p_avg)
+
+        total_qty = sum(q_sum for _, q_sum in price_data.values())
+        total_rev = sum(p * q_sum for p, (_, q_sum) in price_data.items())
+        avg_price = total_rev / total_qty if total_qty > 0 else 0
+
+        # Log-linear эластичность и целевая цена для 2× объёма
+        # (n_weeks — число пар «неделя × площадка» с продажами)
+        n_weeks = sum(n for n, _ in price_data.values())
+        e_log, p_target_2x = log_linear_target(p_low, q_low, p_high, q_high, total_qty / n_weeks)
+
+        results.append({
+            'sku': sku,
+            'name': name,
+            'category': cat,
+            'p_low': p_low,
+            'p_high': p_high,
+            'q_at_low': q_low,
+            'q_at_high': q_high,
+            'elasticity': elasticity,
+            'e_log': e_log,
+            'total_qty': total_qty,
+            'n_weeks': n_weeks,
+            'total_rev': total_rev,
+            'avg_price': avg_price,
+            'price_delta_pct': (p_high - p_low) / p_low * 100,
+            'cost': costs.get(sku),
+            'p_target_2x': p_target_2x,
+        })
+
+    results.sort(key=lambda x: x['elasticity'])
+    return results
+
+
+def attach_ols(results, fit):
+    """Добавить к результатам arc-метода оценки log-log регрессии."""
+    sku_pos = {sku: i for i, sku in enumerate(fit['skus'].tolist())}
+    for r in results:
+        i = sku_pos.get(r['sku'])
+        if i is None or math.isnan(fit['elasticity'][i]):
+            r['e_ols'] = r['e_ols_se'] = r['r2'] = None
+            r['n_obs'] = int(fit['n_obs'][i]) if i is not None else 0
+            continue
+        r['e_ols'] = float(fit['elasticity'][i])
+        r['e_ols_se'] = float(fit['elasticity_se'][i])
+        r['r2'] = float(fit['r2'][i])
+        r['n_obs'] = int(fit['n_obs'][i])
+
+
+def attach_bootstrap(results, boot):
+    """Добавить к результатам бутстреп-ДИ эластичности и P_2x."""
+    sku_pos = {sku: i for i, sku in enumerate(boot['skus'].tolist())}
+
+    def val(key, i):
+        v = float(boot[key][i])
+        return None if math.isnan(v) else v
+
+    for r in results:
+        i = sku_pos.get(r['sku'])
+        if i is None:
+            r['boot'] = None
+            continue
+        r['boot'] = {
+            'e': val('elasticity', i),
+            'e_lo': val('elasticity_lo', i),
+            'e_hi': val('elasticity_hi', i),
+            'p_2x': val('p_target_2x', i),
+            'p_lo': val('p_target_lo', i),
+            'p_hi': val('p_target_hi', i),
+            'n_levels': int(boot['n_price_levels'][i]),
+        }
+
+
+def is_unreliable(b):
+    """Оценка ненадёжна: ≤ 2 уровней цены, ДИ не построен или пересекает 0 / −1."""
+    if b is None or b['e_lo'] is None or b['e_hi'] is None:
+        return True
+    return b['n_levels'] <= 2 or b['e_hi'] >= 0 or b['e_lo'] <= -1 <= b['e_hi']
+
+
+def elasticity_array(results, skus):
+    """Эластичность по SKU в порядке skus для оптимизатора (NaN — нет оценки).
+
+    Берётся log-log OLS (если посчитана через attach_ols), иначе
+    log-linear оценка по двум ценам (e_log).
+    """
+    by_sku = {}
+    for r in results:
+        e = r.get('e_ols')
+        if e is None:
+            e = r['e_log']
+        by_sku[r['sku']] = math.nan if e is None else e
+    return np.array([by_sku.get(sku, math.nan) for sku in skus.tolist()], dtype=np.float64)
+
+
+def reliable_array(results, skus, z=1.96):
+    """Маска по SKU в порядке skus: спрос значимо падает с ценой (верх ДИ E < 0).
+
+    С attach_bootstrap — бутстреп-ДИ (и > 2 уровней цены), иначе ДИ
+    E_ols ± z·SE из attach_ols. Оценка по двум ценам (e_log) погрешности не
+    имеет — такие SKU ненадёжны. Пересечение −1 здесь не отсекается: от него
+    зависит тип спроса в таблицах (is_unreliable), а оптимум и так ограничен
+    коридором цены.
+    """
+    def reliable(r):
+        if 'boot' in r:
+            b = r['boot']
+            return (b is not None and b['e_hi'] is not None and b['n_levels'] > 2
+                    and b['e_hi'] < 0)
+        e, se = r.get('e_ols'), r.get('e_ols_se')
+        return e is not None and se is not None and e + z * se < 0
+
+    by_sku = {r['sku']: reliable(r) for r in results}
+    return np.array([by_sku.get(sku, False) for sku in skus.tolist()], dtype=bool)
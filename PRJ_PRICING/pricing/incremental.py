@@ -0,0 +1,162 @@
+"""
+Инкрементальное обновление эластичности по мере поступления новых недель.
+
+Вместо перечитывания всей истории храним достаточные статистики по SKU
+в JSON-файле состояния:
+  n, Σx, Σy, Σxy, Σx², Σy²  — в log-пространстве (x = ln P, y = ln Q),
+                              хватает для log-log МНК: E, SE, R²
+  levels                    — гистограмма уровней цены {цена: [недель, Σ шт]},
+                              хватает для arc-эластичности и P_2x
+  weeks                     — последняя учтённая неделя по каждой площадке
+                              {площадка: 'YYYY-MM-DD'}
+
+Добавление недели — O(новых строк): строка SKU и площадки учитывается, если
+её неделя позже отметки, иначе пропускается. Отметка своя у каждой пары
+(SKU, площадка), поэтому новый SKU в уже учтённой неделе (дозагруженный
+отчёт площадки) не теряется, а размер состояния не растёт с историей.
+Недели старше отметки (досылка прошлого) пропускаются — такую историю
+нужно пересобрать с нуля. Результаты доступны сразу, без исходного файла.
+
+Использование:
+    from pricing.incremental import load_state, update_state, save_state
+    state = load_state('elasticity_state.json')        # новое, если файла нет
+    added, skipped = update_state(state, rows, costs)  # rows из loader.read_sales
+    save_state(state, 'elasticity_state.json')
+    results = calc_elasticity_levels(state_levels(state), state_costs(state))
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+STATE_VERSION = 1
+
+
+def new_state():
+    """Пустое состояние."""
+    return {'version': STATE_VERSION, 'costs': {}, 'skus': {}}
+
+
+def load_state(path):
+    """Прочитать состояние из JSON (новое, если файла нет)."""
+    if not os.path.exists(path):
+        return new_state()
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f'{path}: неподдерживаемая версия состояния {state.get("version")!r}')
+    return state
+
+
+def save_state(state, path):
+    """Записать состояние атомарно (через временный файл)."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _week_key(week):
+    return week.date().isoformat() if hasattr(week, 'date') else str(week)
+
+
+def update_state(state, rows, costs=None):
+    """Прибавить к состоянию строки недель позже отметки своей пары (SKU, площадка).
+
+    rows — (week, sku, name, category, platform, qty, price) с qty > 0.
+    Отметки сравниваются с состоянием до вызова, поэтому несколько строк
+    одной недели в пакете учитываются все.
+    Возвращает (added, skipped): число учтённых и пропущенных строк.
+    """
+    skus = state['skus']
+    marks = {}                                  # (SKU, площадка) → отметка до пакета
+    added = skipped = 0
+
+    for week, sku, name, cat, platform, qty, price in rows:
+        st = skus.get(str(sku))
+        if st is None:
+            st = skus[str(sku)] = {
+                'sku': sku, 'name': name, 'category': cat,
+                'n': 0, 'sx': 0.0, 'sy': 0.0, 'sxy': 0.0, 'sxx': 0.0, 'syy': 0.0,
+                'levels': {}, 'weeks': {},
+            }
+        week, platform = _week_key(week), str(platform)
+        key = (str(sku), platform)
+        if key not in marks:
+            marks[key] = st['weeks'].get(platform)
+        mark = marks[key]
+        if mark is not None and week <= mark:
+            skipped += 1
+            continue
+        added += 1
+        if week > st['weeks'].get(platform, ''):
+            st['weeks'][platform] = week
+        level = st['levels'].setdefault(repr(float(price)), [0, 0])
+        level[0] += 1
+        level[1] += qty
+
+        if price > 0:
+            x, y = math.log(price), math.log(qty)
+            st['n'] += 1
+            st['sx'] += x
+            st['sy'] += y
+            st['sxy'] += x * y
+            st['sxx'] += x * x
+            st['syy'] += y * y
+
+    if costs:
+        state['costs'].update({str(sku): cost for sku, cost in costs.items()})
+    return added, skipped
+
+
+def latest_week(state):
+    """Последняя учтённая неделя по всем SKU и площадкам (None — состояние пустое)."""
+    return max((w for st in state['skus'].values() for w in st['weeks'].values()), default=None)
+
+
+def state_levels(state):
+    """Уровни цены для calc_elasticity_levels: {(sku, name, cat): {price: (n, Σ qty)}}."""
+    return {
+        (st['sku'], st['name'], st['category']): {float(p): (n, q) for p, (n, q) in st['levels'].items()}
+        for st in state['skus'].values()
+    }
+
+
+def state_costs(state):
+    """Себестоимость {sku: ₽} в типах SKU из состояния."""
+    by_key = {str(st['sku']): st['sku'] for st in state['skus'].values()}
+    return {by_key.get(k, k): v for k, v in state['costs'].items()}
+
+
+def state_loglog(state):
+    """Log-log МНК ln Q = a + E·ln P по достаточным статистикам, все SKU сразу.
+
+    Возвращает dict в формате fit_loglog (без FE): skus, elasticity,
+    elasticity_se, r2, n_obs, columns.
+    """
+    sts = list(state['skus'].values())
+    cols = {k: np.array([st[k] for st in sts], dtype=np.float64)
+            for k in ('n', 'sx', 'sy', 'sxy', 'sxx', 'syy')}
+    n, sx, sy, sxy, sxx, syy = (cols[k] for k in ('n', 'sx', 'sy', 'sxy', 'sxx', 'syy'))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx_c = sxx - sx * sx / n           # Σ(x − x̄)²
+        sxy_c = sxy - sx * sy / n
+        syy_c = syy - sy * sy / n
+        e = sxy_c / sxx_c
+        ssr = np.clip(syy_c - e * sxy_c, 0, None)
+        se = np.sqrt(ssr / (n - 2) / sxx_c)
+        r2 = 1 - ssr / syy_c
+
+    # Цена почти не менялась — эластичность не идентифицирована
+    ok = (n > 2) & (sxx_c > 1e-12 * np.maximum(sxx, 1e-300))
+    return {
+        'skus': np.array([st['sku'] for st in sts]),
+        'elasticity': np.where(ok, e, np.nan),
+        'elasticity_se': np.where(ok, se, np.nan),
+        'r2': np.where(ok & (syy_c > 0), r2, np.nan),
+        'n_obs': n,
+        'columns': ['const', 'log_price'],
+    }
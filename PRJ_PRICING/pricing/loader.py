@@ -0,0 +1,136 @@
+"""
+Загрузка данных продаж из Excel (лист «Продажи», опционально «Каталог»).
+
+Представления одного листа:
+  load_data  — вложенные словари по SKU и цене (arc-эластичность, графики)
+  load_panel — колоночная панель numpy-массивов (log-log OLS, бутстреп)
+  read_sales — плоский список строк (инкрементальное состояние)
+Строки всех трёх разбирает один генератор _sales_rows.
+"""
+
+import math
+from collections import defaultdict
+
+import numpy as np
+import openpyxl
+
+
+def _sales_rows(wb):
+    """Строки листа «Продажи» с продажами > 0 и ценой: (week, sku, name, cat, platform, qty, price, row)."""
+    for row in wb['Продажи'].iter_rows(min_row=2, values_only=True):
+        week, sku, name, cat, platform, qty, price = row[:7]
+        if qty is not None and price is not None and qty > 0:
+            yield week, sku, name, cat, platform, qty, price, row
+
+
+def _read_costs(wb):
+    """Себестоимость {sku: ₽} из листа «Каталог» (пусто, если листа нет)."""
+    costs = {}
+    if 'Каталог' in wb.sheetnames:
+        for row in wb['Каталог'].iter_rows(min_row=2, values_only=True):
+            if row[0] is not None and row[3] is not None:
+                costs[row[0]] = row[3]
+    return costs
+
+
+def load_data(data_file):
+    """Загрузить лист «Продажи» в словари для arc-метода и графиков.
+
+    Возвращает (sku_price_qty, sku_platform_data, costs):
+      sku_price_qty     — {(sku, name, category): {price: [qty, ...]}}
+      sku_platform_data — {(sku, name, category): {platform: {price: [qty, ...]}}}
+      costs             — {sku: себестоимость} из листа «Каталог» (если есть)
+    """
+    wb = openpyxl.load_workbook(data_file, read_only=True, data_only=True)
+
+    sku_price_qty = defaultdict(lambda: defaultdict(list))
+    sku_platform_data = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+
+    for week, sku, name, cat, platform, qty, price, _ in _sales_rows(wb):
+        sku_price_qty[(sku, name, cat)][price].append(qty)
+        sku_platform_data[(sku, name, cat)][platform][price].append(qty)
+
+    costs = _read_costs(wb)
+    wb.close()
+    return sku_price_qty, sku_platform_data, costs
+
+
+def read_sales(data_file):
+    """Строки листа «Продажи» с продажами > 0 и себестоимость из «Каталога».
+
+    Возвращает (rows, costs): rows — список
+    (week, sku, name, category, platform, qty, price), costs — {sku: ₽}.
+    """
+    wb = openpyxl.load_workbook(data_file, read_only=True, data_only=True)
+    rows = [fields[:7] for fields in _sales_rows(wb)]
+    costs = _read_costs(wb)
+    wb.close()
+    return rows, costs
+
+
+def _number(row, i):
+    """Числовое значение столбца i строки или NaN (нет столбца / пусто / формула)."""
+    value = row[i] if i < len(row) else None
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+def load_panel(data_file):
+    """Загрузить лист «Продажи» в колоночную панель (numpy-массивы).
+
+    В панель попадают строки с продажами > 0 и ценой > 0 (как в calc_elasticity).
+    Возвращает dict:
+      skus, names, categories — по одному значению на SKU (длина S)
+      platforms, weeks        — справочники площадок и недель
+      sku_idx, platform_idx, week_idx, price, qty — по строке на наблюдение
+      unit_cost, commission, logistics, ad_spend — юнит-экономика строки
+        (столбцы I, K, M, O: себестоимость ед., комиссия МП доля, логистика ₽,
+        реклама ₽); NaN, если в файле этих столбцов нет
+    """
+    wb = openpyxl.load_workbook(data_file, read_only=True, data_only=True)
+
+    sku_ids, names, cats = {}, [], []
+    platform_ids, week_ids = {}, {}
+    sku_col, plat_col, week_col, price_col, qty_col = [], [], [], [], []
+    cost_col, comm_col, logi_col, ad_col = [], [], [], []
+
+    for week, sku, name, cat, platform, qty, price, row in _sales_rows(wb):
+        if price <= 0:
+            continue
+        if sku not in sku_ids:
+            sku_ids[sku] = len(sku_ids)
+            names.append(name)
+            cats.append(cat)
+        sku_col.append(sku_ids[sku])
+        plat_col.append(platform_ids.setdefault(platform, len(platform_ids)))
+        week_col.append(week_ids.setdefault(week, len(week_ids)))
+        price_col.append(price)
+        qty_col.append(qty)
+        cost_col.append(_number(row, 8))
+        comm_col.append(_number(row, 10))
+        logi_col.append(_number(row, 12))
+        ad_col.append(_number(row, 14))
+
+    wb.close()
+
+    # Недели — в хронологическом порядке
+    weeks = sorted(week_ids)
+    week_remap = np.empty(len(weeks), dtype=np.int64)
+    for new_i, w in enumerate(weeks):
+        week_remap[week_ids[w]] = new_i
+
+    return {
+        'skus': np.array(list(sku_ids)),
+        'names': names,
+        'categories': cats,
+        'platforms': list(platform_ids),
+        'weeks': weeks,
+        'sku_idx': np.array(sku_col, dtype=np.int64),
+        'platform_idx': np.array(plat_col, dtype=np.int64),
+        'week_idx': week_remap[np.array(week_col, dtype=np.int64)] if week_col else np.empty(0, dtype=np.int64),
+        'price': np.array(price_col, dtype=np.float64),
+        'qty': np.array(qty_col, dtype=np.float64),
+        'unit_cost': np.array(cost_col, dtype=np.float64),
+        'commission': np.array(comm_col, dtype=np.float64),
+        'logistics': np.array(logi_col, dtype=np.float64),
+        'ad_spend': np.array(ad_col, dtype=np.float64),
+    }
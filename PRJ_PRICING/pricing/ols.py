@@ -0,0 +1,166 @@
+"""
+Log-log регрессия эластичности: log(Q) ~ a + E·log(P) [+ фиксированные эффекты].
+
+В отличие от arc-эластичности (две точки: минимальная и максимальная цена),
+использует все недельные наблюдения SKU по всем площадкам. Опционально:
+  - фиксированный эффект площадки (WB / Ozon) — уровень спроса на площадке
+  - фиксированные эффекты недели — полная сезонность (по дамми на неделю)
+  - индекс сезонности — один регрессор: средний log-спрос каталога за неделю
+
+Все SKU решаются одним батчем: панель укладывается в массив (SKU × наблюдение × признак)
+с нулевыми строками-заглушками, нормальные уравнения X'X·β = X'y собираются
+через einsum и решаются batched-псевдообращением. Цикла по SKU нет.
+
+Использование:
+    from pricing import load_panel
+    from pricing.ols import fit_loglog
+    panel = load_panel('PRJ_MARKETPLACE/sales_data_v1.0.xlsx')
+    fit = fit_loglog(panel, platform_fe=True, seasonality=True)
+    fit['elasticity'], fit['elasticity_se'], fit['r2']
+"""
+
+import numpy as np
+
+
+def seasonality_index(panel):
+    """Индекс сезонности: средний log-спрос каталога за неделю (центрированный)."""
+    log_q = np.log(panel['qty'])
+    n_weeks = len(panel['weeks'])
+    sums = np.bincount(panel['week_idx'], weights=log_q, minlength=n_weeks)
+    counts = np.bincount(panel['week_idx'], minlength=n_weeks)
+    index = np.divide(sums, counts, out=np.zeros(n_weeks), where=counts > 0)
+    return index - index[counts > 0].mean()
+
+
+def design_columns(panel, platform_fe=False, week_fe=False, seasonality=False):
+    """Имена столбцов матрицы X (порядок совпадает с coef/se)."""
+    columns = ['const', 'log_price']
+    if platform_fe:
+        columns += [f'platform[{p}]' for p in panel['platforms'][1:]]
+    if week_fe:
+        columns += [f'week[{w:%Y-%m-%d}]' if hasattr(w, 'strftime') else f'week[{w}]'
+                    for w in panel['weeks'][1:]]
+    if seasonality:
+        columns.append('season')
+    return columns
+
+
+def design_features(panel, platform_fe=False, week_fe=False, seasonality=False):
+    """Признаки по наблюдениям: feats (N, K) и имена столбцов."""
+    columns = design_columns(panel, platform_fe, week_fe, seasonality)
+    n_obs = len(panel['sku_idx'])
+
+    feats = np.zeros((n_obs, len(columns)))
+    feats[:, 0] = 1.0
+    feats[:, 1] = np.log(panel['price'])
+    k = 2
+    if platform_fe:
+        n_plat = len(panel['platforms'])
+        for p in range(1, n_plat):
+            feats[:, k] = panel['platform_idx'] == p
+            k += 1
+    if week_fe:
+        n_weeks = len(panel['weeks'])
+        for w in range(1, n_weeks):
+            feats[:, k] = panel['week_idx'] == w
+            k += 1
+    if seasonality:
+        feats[:, k] = seasonality_index(panel)[panel['week_idx']]
+    return feats, columns
+
+
+def build_design(panel, platform_fe=False, week_fe=False, seasonality=False):
+    """Уложить панель в батч: X (S, T, K), y (S, T), mask (S, T).
+
+    T — максимальное число наблюдений у одного SKU; у SKU с меньшим числом
+    наблюдений хвост заполнен нулями (mask=False) и не влияет на X'X и X'y.
+    """
+    sku_idx = panel['sku_idx']
+    n_skus = len(panel['skus'])
+    n_obs = len(sku_idx)
+
+    # Позиция наблюдения внутри своего SKU (ранг в стабильной сортировке)
+    order = np.argsort(sku_idx, kind='stable')
+    counts = np.bincount(sku_idx, minlength=n_skus)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    pos = np.empty(n_obs, dtype=np.int64)
+    pos[order] = np.arange(n_obs) - np.repeat(starts, counts)
+    T = int(counts.max()) if n_obs else 0
+
+    feats, columns = design_features(panel, platform_fe, week_fe, seasonality)
+    K = len(columns)
+
+    X = np.zeros((n_skus, T, K))
+    y = np.zeros((n_skus, T))
+    mask = np.zeros((n_skus, T), dtype=bool)
+    X[sku_idx, pos] = feats
+    y[sku_idx, pos] = np.log(panel['qty'])
+    mask[sku_idx, pos] = True
+    return X, y, mask, columns
+
+
+def solve_batched(X, y, mask, weights=None):
+    """Батч-МНК: β = pinv(X'WX)·X'Wy для каждого SKU.
+
+    X (..., T, K), y (..., T), mask (..., T); weights (..., T) — необязательные
+    веса наблюдений (кратности для бутстрепа). Ведущие оси произвольные.
+    Возвращает dict: coef, se, r2, n_obs, df, rank, elasticity_identified.
+    """
+    w = mask.astype(np.float64)
+    if weights is not None:
+        w = w * weights
+    Xw = X * w[..., None]
+    XtX = np.einsum('...tk,...tl->...kl', Xw, X)
+    Xty = np.einsum('...tk,...t->...k', Xw, y)
+    XtX_inv = np.linalg.pinv(XtX, hermitian=True)
+    coef = np.einsum('...kl,...l->...k', XtX_inv, Xty)
+
+    resid = (y - np.einsum('...tk,...k->...t', X, coef)) * (w > 0)
+    ssr = np.sum(w * resid ** 2, axis=-1)
+    n = w.sum(axis=-1)
+    y_mean = np.divide((w * y).sum(axis=-1), n, out=np.zeros_like(n), where=n > 0)
+    sst = np.sum(w * (y - y_mean[..., None]) ** 2, axis=-1)
+
+    rank = np.linalg.matrix_rank(XtX, hermitian=True)
+    # Цена идентифицирована, если столбец log_price добавляет ранг
+    # (например, при FE площадки и цене, постоянной внутри площадки, — нет)
+    others = np.delete(XtX, 1, axis=-1)
+    others = np.delete(others, 1, axis=-2)
+    identified = rank > np.linalg.matrix_rank(others, hermitian=True)
+
+    df = n - rank
+    sigma2 = np.divide(ssr, df, out=np.full_like(ssr, np.nan), where=df > 0)
+    diag = np.diagonal(XtX_inv, axis1=-2, axis2=-1)
+    se = np.sqrt(np.clip(diag, 0, None) * sigma2[..., None])
+    r2 = np.divide(sst - ssr, sst, out=np.full_like(sst, np.nan), where=sst > 0)
+
+    return {
+        'coef': coef,
+        'se': se,
+        'r2': r2,
+        'n_obs': n,
+        'df': df,
+        'rank': rank,
+        'elasticity_identified': identified,
+    }
+
+
+def fit_loglog(panel, platform_fe=False, week_fe=False, seasonality=False):
+    """Оценить log-log модель спроса для всех SKU одним батчем.
+
+    Возвращает dict с массивами длины S (по SKU из panel['skus']):
+      coef, se        — (S, K) коэффициенты и стандартные ошибки
+      columns         — имена K столбцов
+      elasticity      — коэффициент при log(price) (NaN, если не идентифицирован)
+      elasticity_se   — его стандартная ошибка
+      r2, n_obs, df   — R², число наблюдений, степени свободы
+    """
+    X, y, mask, columns = build_design(panel, platform_fe, week_fe, seasonality)
+    fit = solve_batched(X, y, mask)
+
+    ok = fit['elasticity_identified'] & (fit['df'] > 0)
+    fit['elasticity'] = np.where(ok, fit['coef'][:, 1], np.nan)
+    fit['elasticity_se'] = np.where(ok, fit['se'][:, 1], np.nan)
+    fit['columns'] = columns
+    fit['skus'] = panel['skus']
+    return fit
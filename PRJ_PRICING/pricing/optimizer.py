@@ -0,0 +1,151 @@
+"""
+Целевые цены по модели спроса.
+
+Log-linear модель по двум точкам (минимальная и максимальная цена):
+  ln Q = a + E·ln P,  E = ln(Q2/Q1) / ln(P2/P1)
+Цена, при которой ожидаемый объём = multiple × текущий средний:
+  P* = exp((ln(multiple · Q̄) − a) / E)
+
+Цена максимальной прибыли (SKU × площадка) при спросе Q = A·P^E:
+  прибыль/нед = Q · (P·k − u),  k = 1 − комиссия − ДРР,  u = себестоимость + логистика ед.
+  dπ/dP = 0  →  P* = E·u / ((1 + E)·k)     — только при E < −1
+При E ≥ −1 прибыль растёт с ценой — оптимум на верхней границе.
+Прибыль унимодальна по P, поэтому оптимум с ограничениями [P_min, P_max] —
+просто clip безусловного. Всё считается массивами по каталогу, без цикла по SKU.
+Хранение не учитывается (почти не зависит от цены).
+
+Оптимум считается только для оценок, у которых ДИ целиком ниже 0 (reliable —
+по SE OLS или бутстреп-ДИ, см. estimator.reliable_array): положительная E
+по нескольким неделям — шум, а оптимум по ней обещает прибыль, кратную
+текущей. Дополнительно E можно ограничить диапазоном [e_min, e_max] (CLI
+--e-min / --e-max). Остальные SKU остаются по текущей цене.
+"""
+
+import math
+
+import numpy as np
+
+def log_linear_target(p_low, q_low, p_high, q_high, avg_qty, multiple=2):
+    """Log-linear эластичность и цена для multiple × avg_qty.
+
+    Возвращает (e_log, p_target); None, если модель не строится
+    (нулевой спрос, одна цена) или цель недостижима (E = 0).
+    """
+    if q_low <= 0 or q_high <= 0 or p_low == p_high:
+        return None, None
+    e_log = math.log(q_high / q_low) / math.log(p_high / p_low)
+    a = math.log(q_low) - e_log * math.log(p_low)
+    try:
+        p_target = math.exp((math.log(multiple * avg_qty) - a) / e_log)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        p_target = None
+    return e_log, p_target
+
+
+def unit_economics(panel):
+    """Юнит-экономика по (SKU, площадка) из панели load_panel.
+
+    Возвращает dict с массивами (S, P):
+      price      — средняя цена (взвешенная по продажам)
+      qty_week   — средние продажи за неделю с продажами
+      unit_cost  — себестоимость ед. (взвешенная по продажам)
+      commission — комиссия МП, доля выручки
+      logistics  — логистика на единицу, ₽
+      drr        — реклама / выручка
+    NaN там, где у SKU нет продаж на площадке.
+    """
+    n_skus = len(panel['skus'])
+    n_plat = len(panel['platforms'])
+    key = panel['sku_idx'] * n_plat + panel['platform_idx']
+    size = n_skus * n_plat
+    qty = panel['qty']
+    revenue = qty * panel['price']
+
+    def agg(values):
+        return np.bincount(key, weights=values, minlength=size).reshape(n_skus, n_plat)
+
+    q_sum = agg(qty)
+    rev_sum = agg(revenue)
+    n_weeks = agg(np.ones_like(qty))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'price': rev_sum / q_sum,
+            'qty_week': q_sum / n_weeks,
+            'unit_cost': agg(qty * panel['unit_cost']) / q_sum,
+            'commission': agg(revenue * panel['commission']) / rev_sum,
+            'logistics': agg(panel['logistics']) / q_sum,
+            'drr': agg(panel['ad_spend']) / rev_sum,
+        }
+
+
+def profit_max_price(elasticity, unit_cost, net_share, p_min, p_max):
+    """Цена максимальной прибыли для спроса A·P^E, ограниченная [p_min, p_max].
+
+    elasticity, unit_cost (себестоимость + логистика ед.), net_share (доля цены,
+    остающаяся после комиссии и рекламы) — массивы одной формы (или broadcast).
+    Возвращает массив цен; NaN, где E не задана или продажа убыточна при любой
+    цене (net_share ≤ 0).
+    """
+    e = np.asarray(elasticity, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_star = e * unit_cost / ((1 + e) * net_share)
+    # E ≥ −1: прибыль монотонно растёт с ценой → верхняя граница
+    p_star = np.where(e < -1, p_star, np.inf)
+    p_opt = np.clip(p_star, p_min, p_max)
+    return np.where(np.isfinite(e) & (net_share > 0), p_opt, np.nan)
+
+
+def optimize_prices(panel, elasticity, min_change=-0.30, max_change=0.30, e_min=None, e_max=None,
+                    reliable=None):
+    """Оптимальные цены по всему каталогу (SKU × площадка).
+
+    elasticity — массив длины S (порядок panel['skus']), NaN — нет оценки.
+    SKU без оценки, с reliable = False (маска длины S, например
+    reliable_array по SE или бутстрепу) или с E вне [e_min, e_max] (None —
+    без границы) не оптимизируются (NaN в price_opt). Кривая спроса на площадке Q = A·P^E проходит через текущую
+    точку (средняя цена, средние продажи/нед). Границы цены — доля от
+    текущей: [price·(1 + min_change), price·(1 + max_change)].
+
+    Возвращает dict с массивами (S, P): юнит-экономика (unit_economics),
+    price_opt, qty_opt, profit, profit_opt (₽/нед), bound ('min' / 'max' / '');
+    и по SKU (S,): estimate — исходная E, reliable, usable — E оптимизируется;
+    e_range — (e_min, e_max).
+    """
+    ue = unit_economics(panel)
+    estimate = np.asarray(elasticity, dtype=np.float64)
+    reliable = np.ones(len(estimate), dtype=bool) if reliable is None else np.asarray(reliable, dtype=bool)
+    usable = np.isfinite(estimate) & reliable
+    if e_min is not None:
+        usable &= estimate >= e_min
+    if e_max is not None:
+        usable &= estimate <= e_max
+    e = np.where(usable, estimate, np.nan)[:, None]
+    price = ue['price']
+    u = ue['unit_cost'] + ue['logistics']
+    k = 1 - ue['commission'] - ue['drr']
+    p_min = price * (1 + min_change)
+    p_max = price * (1 + max_change)
+
+    p_opt = profit_max_price(e, u, k, p_min, p_max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        qty_opt = ue['qty_week'] * (p_opt / price) ** e
+    profit = ue['qty_week'] * (price * k - u)
+    profit_opt = qty_opt * (p_opt * k - u)
+
+    bound = np.full(price.shape, '', dtype='<U3')
+    bound[np.isclose(p_opt, p_min)] = 'min'
+    bound[np.isclose(p_opt, p_max)] = 'max'
+
+    return {
+        **ue,
+        'elasticity': np.broadcast_to(e, price.shape),
+        'price_opt': p_opt,
+        'qty_opt': qty_opt,
+        'profit': profit,
+        'profit_opt': profit_opt,
+        'bound': bound,
+        'estimate': estimate,
+        'reliable': reliable,
+        'usable': usable,
+        'e_range': (e_min, e_max),
+    }
@@ -0,0 +1,181 @@
+"""
+Графики анализа эластичности (PNG).
+
+  01_elasticity_all_skus.png       — эластичность по всем SKU
+  02_elasticity_by_category.png    — эластичность по категориям
+  03_price_vs_qty_top12.png        — scatter цена vs продажи (ТОП-12)
+  04_demand_curves_multi_price.png — кривые спроса (3+ ценовых уровня)
+  05_price_vs_demand_change.png    — матрица ΔЦена% vs ΔСпрос%
+
+Настройки шрифтов применяются только внутри plot_all (rc_context),
+импорт модуля не меняет глобальное состояние matplotlib.
+"""
+
+import os
+from collections import defaultdict
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+
+from .estimator import elasticity_color
+
+RC_PARAMS = {
+    'font.family': 'DejaVu Sans',
+    'font.size': 10,
+    'axes.titlesize': 12,
+    'figure.dpi': 150,
+}
+
+
+def plot_all(results, sku_price_qty, sku_platform_data, output_dir):
+    """Построить все графики (01–05) в output_dir."""
+    with plt.rc_context(RC_PARAMS):
+        _plot_all(results, sku_price_qty, sku_platform_data, output_dir)
+
+
+def _plot_all(results, sku_price_qty, sku_platform_data, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # ── ГРАФИК 1: Барчарт эластичности ──
+    fig, ax = plt.subplots(figsize=(16, max(8, len(results) * 0.3)))
+    names_short = [f"SKU{r['sku']} {r['name'][:25]}" for r in results]
+    elasticities = [r['elasticity'] for r in results]
+    colors = [elasticity_color(e) for e in elasticities]
+
+    ax.barh(range(len(results)), elasticities, color=colors, height=0.7, edgecolor='white', linewidth=0.5)
+    ax.set_yticks(range(len(results)))
+    ax.set_yticklabels(names_short, fontsize=8)
+    ax.axvline(x=-1, color='red', linestyle='--', alpha=0.5, label='E = -1 (граница эластичности)')
+    ax.axvline(x=0, color='gray', linestyle='-', alpha=0.3)
+    ax.set_xlabel('Эластичность спроса по цене (E)')
+    ax.set_title('Ценовая эластичность спроса по всем товарам', fontsize=14, fontweight='bold')
+    ax.legend(loc='lower right')
+    ax.invert_yaxis()
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, '01_elasticity_all_skus.png'), bbox_inches='tight')
+    plt.close()
+    print(f"  01_elasticity_all_skus.png")
+
+    # ── ГРАФИК 2: По категориям ──
+    cat_elast = defaultdict(list)
+    for r in results:
+        cat_elast[r['category']].append(r['elasticity'])
+
+    categories = sorted(cat_elast.keys(), key=lambda c: sum(cat_elast[c]) / len(cat_elast[c]))
+    cat_means = [sum(cat_elast[c]) / len(cat_elast[c]) for c in categories]
+    cat_mins = [min(cat_elast[c]) for c in categories]
+    cat_maxs = [max(cat_elast[c]) for c in categories]
+
+    fig, ax = plt.subplots(figsize=(12, max(4, len(categories) * 0.8)))
+    colors_cat = [elasticity_color(m) for m in cat_means]
+    bars = ax.barh(categories, cat_means, color=colors_cat, height=0.6, edgecolor='white')
+    for i, (cat, mn, mx) in enumerate(zip(categories, cat_mins, cat_maxs)):
+        ax.plot([mn, mx], [i, i], color='gray', linewidth=2, alpha=0.5)
+        ax.plot(mn, i, 'o', color='gray', markersize=4, alpha=0.5)
+        ax.plot(mx, i, 'o', color='gray', markersize=4, alpha=0.5)
+    ax.axvline(x=-1, color='red', linestyle='--', alpha=0.5, label='E = -1')
+    ax.set_xlabel('Средняя эластичность (E)')
+    ax.set_title('Эластичность спроса по категориям', fontsize=14, fontweight='bold')
+    ax.legend()
+    for bar, val in zip(bars, cat_means):
+        ax.text(val - 0.1, bar.get_y() + bar.get_height() / 2, f'{val:.2f}',
+                va='center', ha='right', fontsize=10, fontweight='bold', color='white')
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, '02_elasticity_by_category.png'), bbox_inches='tight')
+    plt.close()
+    print(f"  02_elasticity_by_category.png")
+
+    # ── ГРАФИК 3: Scatter ТОП-12 ──
+    top12 = sorted(results, key=lambda x: x['total_qty'], reverse=True)[:12]
+    fig, axes = plt.subplots(3, 4, figsize=(18, 12))
+    axes = axes.flatten()
+    for idx, r in enumerate(top12):
+        ax = axes[idx]
+        sku_key = (r['sku'], r['name'], r['category'])
+        for platform, marker, color in [('WB', 'o', '#7b1fa2'), ('Ozon', 's', '#1565c0')]:
+            if platform in sku_platform_data[sku_key]:
+                pdata = sku_platform_data[sku_key][platform]
+                xs, ys = [], []
+                for price, qtys in pdata.items():
+                    for q in qtys:
+                        xs.append(price)
+                        ys.append(q)
+                ax.scatter(xs, ys, marker=marker, color=color, alpha=0.6, s=40, label=platform)
+        e = r['elasticity']
+        ecolor = elasticity_color(e)
+        ax.set_title(f"SKU{r['sku']}: {r['name'][:22]}\nE = {e:.2f}", fontsize=9, color=ecolor, fontweight='bold')
+        ax.set_xlabel('Цена, ₽', fontsize=8)
+        ax.set_ylabel('Продажи, шт', fontsize=8)
+        ax.tick_params(labelsize=7)
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(True, alpha=0.2)
+    fig.suptitle('Цена vs Объём продаж — ТОП-12 товаров', fontsize=14, fontweight='bold', y=1.02)
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, '03_price_vs_qty_top12.png'), bbox_inches='tight')
+    plt.close()
+    print(f"  03_price_vs_qty_top12.png")
+
+    # ── ГРАФИК 4: Кривые спроса ──
+    multi_price_skus = [r for r in results if len(sku_price_qty[(r['sku'], r['name'], r['category'])]) >= 3]
+    if multi_price_skus:
+        n = min(8, len(multi_price_skus))
+        rows = (n + 3) // 4
+        fig, axes = plt.subplots(rows, 4, figsize=(18, rows * 4))
+        if rows == 1:
+            axes = [axes] if n == 1 else axes
+        axes_flat = axes.flatten() if hasattr(axes, 'flatten') else [axes]
+        for idx, r in enumerate(multi_price_skus[:n]):
+            ax = axes_flat[idx]
+            sku_key = (r['sku'], r['name'], r['category'])
+            price_data = sku_price_qty[sku_key]
+            prices_sorted = sorted(price_data.keys())
+            avg_qtys = [sum(price_data[p]) / len(price_data[p]) for p in prices_sorted]
+            revenues = [p * q for p, q in zip(prices_sorted, avg_qtys)]
+            ax.plot(prices_sorted, avg_qtys, 'o-', color='#1565c0', linewidth=2, markersize=8)
+            ax2 = ax.twinx()
+            ax2.bar(prices_sorted, revenues, width=(prices_sorted[-1] - prices_sorted[0]) * 0.15,
+                    alpha=0.3, color='#388e3c')
+            ax2.set_ylabel('Выручка, ₽', fontsize=8, color='#388e3c')
+            e = r['elasticity']
+            ecolor = elasticity_color(e)
+            ax.set_title(f"SKU{r['sku']}: {r['name'][:22]}\nE = {e:.2f}", fontsize=9, color=ecolor, fontweight='bold')
+            ax.set_xlabel('Цена, ₽', fontsize=8)
+            ax.set_ylabel('Ср. продажи, шт/нед', fontsize=8, color='#1565c0')
+            ax.grid(True, alpha=0.2)
+        for idx in range(n, len(axes_flat)):
+            axes_flat[idx].set_visible(False)
+        fig.suptitle('Кривые спроса — товары с 3+ ценовыми уровнями', fontsize=14, fontweight='bold', y=1.02)
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, '04_demand_curves_multi_price.png'), bbox_inches='tight')
+        plt.close()
+        print(f"  04_demand_curves_multi_price.png")
+
+    # ── ГРАФИК 5: Матрица ──
+    fig, ax = plt.subplots(figsize=(12, 8))
+    for r in results:
+        dp = r['price_delta_pct']
+        dq = ((r['q_at_high'] - r['q_at_low']) / r['q_at_low']) * 100 if r['q_at_low'] > 0 else 0
+        size = max(20, min(200, r['total_qty'] / 5))
+        e = r['elasticity']
+        color = elasticity_color(e)
+        ax.scatter(dp, dq, s=size, c=color, alpha=0.6, edgecolors='white', linewidth=0.5)
+        if abs(e) > 3 or abs(dq) > 50:
+            ax.annotate(f"SKU{r['sku']}", (dp, dq), fontsize=7, alpha=0.7,
+                       xytext=(5, 5), textcoords='offset points')
+    ax.axhline(y=0, color='gray', linestyle='-', alpha=0.3)
+    ax.set_xlabel('Δ Цена, %', fontsize=11)
+    ax.set_ylabel('Δ Объём продаж, %', fontsize=11)
+    ax.set_title('Чувствительность спроса: изменение цены vs изменение объёма', fontsize=14, fontweight='bold')
+    legend_elements = [
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='#d32f2f', markersize=10, label='Эластичный (E < -1)'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='#f57c00', markersize=10, label='Ед. эластичность'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='#388e3c', markersize=10, label='Неэластичный (E > -0.5)'),
+    ]
+    ax.legend(handles=legend_elements, loc='upper right')
+    ax.grid(True, alpha=0.2)
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, '05_price_vs_demand_change.png'), bbox_inches='tight')
+    plt.close()
+    print(f"  05_price_vs_demand_change.png")
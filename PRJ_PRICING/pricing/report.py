@@ -0,0 +1,246 @@
+"""
+Консольные отчёты: таблица эластичности, OLS, бутстреп-ДИ, целевые цены.
+"""
+
+import math
+
+import numpy as np
+
+from .estimator import elasticity_type, is_unreliable
+
+
+def print_table(results):
+    """Вывести таблицу эластичности в консоль."""
+    print("=" * 110)
+    print(f"{'SKU':>4} {'Название':<38} {'Категория':<18} {'Цена ↓':>7} {'Цена ↑':>7} {'ΔP%':>5} {'Q↓':>5} {'Q↑':>5} {'E':>7} {'Тип':<12}")
+    print("=" * 110)
+
+    for r in results:
+        e = r['elasticity']
+        etype = elasticity_type(e)
+
+        print(f"{r['sku']:>4} {r['name']:<38} {r['category']:<18} {r['p_low']:>7.0f} {r['p_high']:>7.0f} "
+              f"{r['price_delta_pct']:>4.1f}% {r['q_at_low']:>5.1f} {r['q_at_high']:>5.1f} {e:>7.2f} {etype:<12}")
+
+    elastic = [r for r in results if r['elasticity'] < -1]
+    inelastic = [r for r in results if r['elasticity'] > -0.5]
+    unit_elastic = [r for r in results if -1 <= r['elasticity'] <= -0.5]
+
+    print(f"\n{'=' * 60}")
+    print(f"ИТОГИ")
+    print(f"{'=' * 60}")
+    print(f"Всего SKU: {len(results)}")
+    print(f"  Эластичный (E < -1):     {len(elastic):>3} ({len(elastic)/len(results)*100:.0f}%)")
+    print(f"  Единичная эластичность:   {len(unit_elastic):>3} ({len(unit_elastic)/len(results)*100:.0f}%)")
+    print(f"  Неэластичный (E > -0.5): {len(inelastic):>3} ({len(inelastic)/len(results)*100:.0f}%)")
+
+
+def print_extremes(results, n=5):
+    """Самые эластичные и самые неэластичные SKU (results отсортированы по E)."""
+    print(f"\nСамые эластичные (чувствительны к цене):")
+    for r in results[:n]:
+        print(f"  SKU{r['sku']:>2} {r['name']:<35} E = {r['elasticity']:.2f}")
+    print(f"\nСамые неэластичные (можно повышать цену):")
+    for r in results[-n:]:
+        print(f"  SKU{r['sku']:>2} {r['name']:<35} E = {r['elasticity']:.2f}")
+
+
+def print_ols_table(results, columns):
+    """Вывести сравнение arc-эластичности и log-log OLS."""
+    print(f"\n{'=' * 100}")
+    print(f"LOG-LOG РЕГРЕССИЯ: log(Q) ~ {' + '.join(columns[1:])}")
+    print(f"{'=' * 100}")
+    print(f"{'SKU':>4} {'Название':<38} {'N':>3} {'E arc':>7} {'E OLS':>7} {'SE':>6} {'95% ДИ':>15} {'R²':>5}")
+    print("-" * 100)
+    for r in sorted(results, key=lambda x: x['e_ols'] if x['e_ols'] is not None else math.inf):
+        if r['e_ols'] is None:
+            print(f"{r['sku']:>4} {r['name']:<38} {r['n_obs']:>3} {r['elasticity']:>7.2f} {'н/и':>7}")
+            continue
+        lo = r['e_ols'] - 1.96 * r['e_ols_se']
+        hi = r['e_ols'] + 1.96 * r['e_ols_se']
+        print(f"{r['sku']:>4} {r['name']:<38} {r['n_obs']:>3} {r['elasticity']:>7.2f} {r['e_ols']:>7.2f} "
+              f"{r['e_ols_se']:>6.2f} [{lo:>6.2f}; {hi:>5.2f}] {r['r2']:>5.2f}")
+    n_na = sum(1 for r in results if r['e_ols'] is None)
+    if n_na:
+        print(f"\nн/и — эластичность не идентифицирована ({n_na} SKU): цена не меняется "
+              f"внутри выбранных фиксированных эффектов или мало наблюдений.")
+
+
+def print_bootstrap_table(results, boot):
+    """Вывести бутстреп-ДИ эластичности и целевой цены 2× объёма."""
+    pct = round(boot['ci'] * 100)
+    print(f"\n{'=' * 100}")
+    print(f"БУТСТРЕП-ДИ ({boot['n_resamples']} реплик по неделям, {pct}%): log-log E и P_2x")
+    print(f"{'=' * 100}")
+    print(f"{'SKU':>4} {'Название':<34} {'Цен':>3} {'E':>6} {'ДИ E':>16} {'P_2x':>7} {'ДИ P_2x':>17}")
+    print("-" * 100)
+
+    def fmt(v, width, digits):
+        return f"{v:>{width}.{digits}f}" if v is not None else f"{'—':>{width}}"
+
+    def sort_key(r):
+        b = r['boot']
+        return b['e'] if b and b['e'] is not None else math.inf
+
+    for r in sorted(results, key=sort_key):
+        b = r['boot']
+        if b is None or b['e'] is None:
+            print(f"{r['sku']:>4} {r['name']:<34} {'':>3} {'н/и':>6}")
+            continue
+        flag = '⚠' if is_unreliable(b) else ''
+        print(f"{r['sku']:>4} {r['name']:<34} {b['n_levels']:>3} {b['e']:>6.2f} "
+              f"[{fmt(b['e_lo'], 6, 2)}; {fmt(b['e_hi'], 6, 2)}] {fmt(b['p_2x'], 7, 0)} "
+              f"[{fmt(b['p_lo'], 7, 0)}; {fmt(b['p_hi'], 7, 0)}] {flag}")
+
+    n_flag = sum(1 for r in results if r['boot'] and r['boot']['e'] is not None and is_unreliable(r['boot']))
+    if n_flag:
+        print(f"\n⚠ — ненадёжная оценка ({n_flag} SKU): ≤ 2 уровней цены, ДИ E включает 0 "
+              f"или пересекает −1 (неясно, эластичный ли спрос). Решения по цене не принимать.")
+
+
+def print_target_prices(results, category=None):
+    """Вывести целевые цены для удвоения объёма."""
+    filtered = results
+    if category:
+        filtered = [r for r in results if r['category'] == category]
+
+    print(f"\n{'=' * 100}")
+    title = f"ЦЕЛЕВЫЕ ЦЕНЫ ДЛЯ 2× ОБЪЁМА"
+    if category:
+        title += f" — {category}"
+    print(title)
+    print(f"{'=' * 100}\n")
+
+    not_applicable = []
+    for r in filtered:
+        if r['p_target_2x'] is None:
+            continue
+        # E ≥ 0: объём не растёт при снижении цены — «цель» получается выше текущей
+        if r['e_log'] >= 0:
+            not_applicable.append(r)
+            continue
+
+        # Средние продажи за неделю на площадке — та же база, что у p_target_2x
+        avg_qty_w = r['total_qty'] / r['n_weeks']
+        p_target = r['p_target_2x']
+        drop_pct = (1 - p_target / r['avg_price']) * 100
+        cost = r['cost'] or 0
+
+        profit_current = (r['avg_price'] - cost) * avg_qty_w
+        profit_target = (p_target - cost) * (2 * avg_qty_w)
+
+        margin_current = (r['avg_price'] - cost) / r['avg_price'] * 100 if r['avg_price'] > 0 else 0
+        margin_target = (p_target - cost) / p_target * 100 if p_target > 0 else 0
+
+        print(f"SKU{r['sku']}: {r['name']}")
+        print(f"  Сейчас: {r['avg_price']:.0f} ₽  →  Цель: {p_target:.0f} ₽  (снижение {drop_pct:.1f}%)")
+        if cost > 0:
+            profit_change = (profit_target / profit_current - 1) * 100 if profit_current > 0 else 0
+            status = "ПРИБЫЛЬ РАСТЁТ" if profit_target > profit_current else "ПРИБЫЛЬ ПАДАЕТ"
+            print(f"  Маржа: {margin_current:.0f}% → {margin_target:.0f}%  |  Прибыль: {profit_change:+.0f}%  |  {status}")
+        print()
+
+    if not_applicable:
+        listed = ", ".join(f"SKU{r['sku']} (E {r['e_log']:+.2f})" for r in not_applicable)
+        print(f"Цель не применима — спрос не растёт при снижении цены (E ≥ 0): {listed}")
+
+
+def print_optimal_prices(opt, panel, top=None):
+    """Вывести цены максимальной прибыли по SKU × площадка (по убыванию прироста)."""
+    names = panel['names']
+    gain = opt['profit_opt'] - opt['profit']
+    rows = np.argwhere(np.isfinite(gain))
+    rows = rows[np.argsort(-gain[rows[:, 0], rows[:, 1]], kind='stable')]
+    if top:
+        rows = rows[:top]
+
+    print(f"\n{'=' * 120}")
+    print("ЦЕНЫ МАКСИМАЛЬНОЙ ПРИБЫЛИ (себестоимость + комиссия + логистика + ДРР)")
+    print(f"{'=' * 120}")
+    print(f"{'SKU':>4} {'Название':<30} {'МП':<5} {'E':>6} {'Цена':>7} {'Опт.':>7} {'ΔP%':>6} "
+          f"{'шт/нед':>7} {'→':>6} {'Приб./нед':>10} {'→':>10} {'Δ₽/нед':>9} {'Гр.':>4}")
+    print("-" * 120)
+    for i, p in rows:
+        price, p_opt = opt['price'][i, p], opt['price_opt'][i, p]
+        print(f"{panel['skus'][i]:>4} {names[i][:30]:<30} {panel['platforms'][p]:<5} "
+              f"{opt['elasticity'][i, p]:>6.2f} {price:>7.0f} {p_opt:>7.0f} {(p_opt / price - 1) * 100:>+5.1f}% "
+              f"{opt['qty_week'][i, p]:>7.1f} {opt['qty_opt'][i, p]:>6.1f} "
+              f"{opt['profit'][i, p]:>10,.0f} {opt['profit_opt'][i, p]:>10,.0f} {gain[i, p]:>+9,.0f} "
+              f"{opt['bound'][i, p]:>4}")
+
+    # SKU без оптимума остаются по текущей цене — в итоге их текущая прибыль
+    total = np.nansum(opt['profit'])
+    total_opt = np.nansum(np.where(np.isfinite(gain), opt['profit_opt'], opt['profit']))
+    print(f"\nПрибыль каталога/нед (без хранения): {total:,.0f} ₽ → {total_opt:,.0f} ₽ "
+          f"({total_opt - total:+,.0f} ₽)")
+    print("Гр. — цена упёрлась в границу (min/max): модель просит выйти за допустимый коридор.")
+
+    excluded = np.flatnonzero(~opt['usable'] & np.isfinite(opt['price']).any(axis=1))
+    if len(excluded):
+        e_min, e_max = opt['e_range']
+        estimate, reliable = opt['estimate'], opt['reliable']
+
+        def why(i):
+            if np.isnan(estimate[i]):
+                return "E —"
+            return f"E {estimate[i]:.2f}" + ("" if reliable[i] else ", ненадёжна")
+
+        bounds = ""
+        if e_min is not None or e_max is not None:
+            lo = "−∞" if e_min is None else f"{e_min:g}"
+            hi = "+∞" if e_max is None else f"{e_max:g}"
+            bounds = f"E вне [{lo}; {hi}], "
+        listed = ", ".join(f"{panel['skus'][i]} ({why(i)})" for i in excluded)
+        print(f"Не оптимизированы, цена текущая ({len(excluded)} SKU: {bounds}"
+              f"не оценена или верх ДИ ≥ 0): {listed}")
+
+
+def print_cross_elasticity(cross, panel, top=5):
+    """Вывести сильнейшие пары-заменители (E_ij > 0) по категориям."""
+    m = cross['matrix'].tocoo()
+    off = (m.row != m.col) & (m.data > 0)
+    rows, cols, vals = m.row[off], m.col[off], m.data[off]
+    cats = np.asarray(panel['categories'])
+    names = panel['names']
+    skus = panel['skus']
+
+    print(f"\n{'=' * 100}")
+    print(f"ПЕРЕКРЁСТНАЯ ЭЛАСТИЧНОСТЬ (k = {cross['neighbours'].shape[1]} ближайших по цене SKU категории): "
+          f"ТОП-{top} заменителей")
+    print(f"{'=' * 100}")
+    for cat in sorted(set(cats.tolist())):
+        sel = np.flatnonzero(cats[rows] == cat)
+        if len(sel) == 0:
+            continue
+        sel = sel[np.argsort(-vals[sel], kind='stable')[:top]]
+        print(f"\n{cat}:")
+        for i in sel:
+            r, c = rows[i], cols[i]
+            print(f"  SKU{skus[r]:>3} {names[r][:30]:<30} ← цена SKU{skus[c]:>3} {names[c][:30]:<30} "
+                  f"E = {vals[i]:+.2f}  (своя {cross['own'][r]:+.2f})")
+    print("\nE_ij > 0: рост цены j на 1% увеличивает спрос на i на E_ij% (каннибализация).")
+    n_own = int(cross['own_only'].sum())
+    if n_own:
+        print(f"У {n_own} SKU цены соседей почти повторяют свою (индекс обусловленности > "
+              f"{cross['max_cond']:g}): E_ij отброшены, E_ii — по своей цене, как в OLS.")
+
+
+def print_simulation(sim, price_change):
+    """Вывести прогноз объёма и прибыли категорий при изменении цен."""
+    changes = ', '.join(f"SKU{sku} {d * 100:+.0f}%" for sku, d in price_change.items())
+    print(f"\n{'=' * 100}")
+    print(f"СИМУЛЯЦИЯ ЦЕН: {changes}")
+    print(f"{'=' * 100}")
+    print(f"{'Категория':<20} {'шт/нед':>8} {'→':>8} {'Δ%':>6} {'Приб./нед':>11} {'→':>11} {'Δ₽/нед':>9}")
+    print("-" * 100)
+    for i, cat in enumerate(sim['categories']):
+        q, q_new = sim['category_qty'][i], sim['category_qty_new'][i]
+        pr, pr_new = sim['category_profit'][i], sim['category_profit_new'][i]
+        if np.isclose(q, q_new) and np.isclose(pr, pr_new):
+            continue
+        dq = (q_new / q - 1) * 100 if q > 0 else 0
+        print(f"{cat:<20} {q:>8.0f} {q_new:>8.0f} {dq:>+5.1f}% {pr:>11,.0f} {pr_new:>11,.0f} {pr_new - pr:>+9,.0f}")
+    if sim['own_only']:
+        listed = ', '.join(f"SKU{sku}" for sku in sim['own_only'])
+        print(f"\nБез перекрёстных эффектов (цены соседей коллинеарны со своей): {listed} — "
+              f"в прогнозе только собственная E, перенос спроса между ними не оценён.")
@@ -0,0 +1,141 @@
+"""
+Бэктест стратегий репрайсера MP Manager на истории продаж.
+
+Использование:
+  uv run --with openpyxl --with numpy PRJ_PRICING/repricer_backtest.py [путь_к_xlsx]
+
+  Своя сетка параметров (каждый --set — ось сетки):
+  uv run ... PRJ_PRICING/repricer_backtest.py --set stock_step=0,0.05 --set margin_floor=none,0.2 --workers 4
+
+Параметры стратегий (см. pricing/backtest.py и mpmgr/README.md):
+  comp_offset   — по конкурентам: цена = цена конкурента × (1 + offset); none — выкл.
+                  Цен конкурентов в файле продаж нет, поэтому здесь стратегия
+                  не прогоняется (нужен competitor_price в build_market)
+  stock_low / stock_high / stock_step — по остаткам: запас в неделях и шаг цены
+  margin_floor  — удержание маржинальности (доля цены, меньше 1 − комиссия − ДРР
+                  у каждого SKU); none — выкл.
+  min_change / max_change — коридор мин/макс цены от средней исторической
+  max_jump      — защита от скачков (по умолчанию 0.20)
+  initial_cover / restock_every / restock_cover — модель склада
+
+Без --set прогоняется сетка по умолчанию: 4 × 5 = 20 конфигураций
+(остатки × маржинальность). Базовый сценарий — исторические цены.
+
+Замер этапов (load, load_panel, ols, market, backtest; см. scripts/stageprof.py):
+  uv run ... PRJ_PRICING/repricer_backtest.py --stages --profile backtest
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from pricing import load_data, load_panel, calc_elasticity, attach_ols, elasticity_array
+from pricing.backtest import DEFAULTS, build_market, param_grid, run_backtest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPT_DIR)
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+import stageprof
+
+DEFAULT_DATA = os.path.join(REPO_ROOT, 'PRJ_MARKETPLACE', 'sales_data_v1.0.xlsx')
+
+DEFAULT_GRID = {
+    'stock_step': [0.0, 0.03, 0.05, 0.10],
+    'margin_floor': [None, 0.10, 0.20, 0.30, 0.40],
+}
+
+
+def parse_axis(text):
+    """'margin_floor=none,0.2' → ('margin_floor', [None, 0.2])."""
+    key, _, values = text.partition('=')
+    if key not in DEFAULTS or not values:
+        raise argparse.ArgumentTypeError(
+            f'ожидается ПАРАМЕТР=v1,v2,... (параметры: {", ".join(DEFAULTS)}), получено: {text!r}')
+    try:
+        return key, [None if v.strip().lower() == 'none' else float(v) for v in values.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'не число в {text!r}')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Бэктест стратегий репрайсера на истории продаж')
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA,
+                        help='Путь к .xlsx с листом «Продажи» (по умолчанию — sales_data_v1.0.xlsx)')
+    parser.add_argument('--set', dest='axes', type=parse_axis, action='append', default=[],
+                        metavar='ПАРАМЕТР=v1,v2', help='Ось сетки параметров (можно несколько раз)')
+    parser.add_argument('--ols', action='store_true',
+                        help='Эластичность из log-log OLS (по умолчанию — log-linear по двум ценам)')
+    parser.add_argument('--e-min', type=float, default=-5.0,
+                        help='Нижняя граница эластичности модели спроса (по умолчанию -5)')
+    parser.add_argument('--e-max', type=float, default=-0.3,
+                        help='Верхняя граница эластичности модели спроса (по умолчанию -0.3)')
+    parser.add_argument('--workers', type=int, default=1, help='Число процессов')
+    parser.add_argument('--top', type=int, default=15, help='Сколько лучших конфигураций показать')
+    stageprof.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def describe(config):
+    """Только параметры, отличные от DEFAULTS."""
+    parts = [f"{k}={'none' if v is None else f'{v:g}'}" for k, v in config.items()
+             if k != 'follow_history' and v != DEFAULTS[k]]
+    return ', '.join(parts) or 'по умолчанию'
+
+
+def main():
+    args = parse_args()
+    stageprof.configure_from_args(args)
+    if not os.path.exists(args.data_file):
+        print(f"Файл не найден: {args.data_file}")
+        sys.exit(1)
+
+    print(f"Источник данных: {args.data_file}")
+    with stageprof.stage('load'):
+        sku_price_qty, _, costs = load_data(args.data_file)
+        results = calc_elasticity(sku_price_qty, costs)
+    with stageprof.stage('load_panel') as st:
+        panel = load_panel(args.data_file)
+        st.rows = len(panel['qty'])
+    if args.ols:
+        from pricing.ols import fit_loglog
+        with stageprof.stage('ols', rows=len(panel['qty'])):
+            attach_ols(results, fit_loglog(panel))
+    with stageprof.stage('market', rows=len(panel['qty'])):
+        market = build_market(panel, elasticity_array(results, panel['skus']),
+                              e_min=args.e_min, e_max=args.e_max)
+
+    grid = dict(args.axes) if args.axes else DEFAULT_GRID
+    configs = [{**DEFAULTS, 'follow_history': True}] + param_grid(**grid)
+    S, P, W = market['price'].shape
+    print(f"Конфигураций: {len(configs) - 1} (+ история), SKU × площадка: {int(market['active'].sum())}, недель: {W}")
+
+    print("Цен конкурентов нет: стратегия «по конкурентам» не прогоняется")
+    t0 = time.perf_counter()
+    try:
+        with stageprof.stage('backtest', rows=len(configs)):
+            m = run_backtest(market, configs, workers=args.workers)
+    except ValueError as e:
+        print(f"Ошибка конфигурации: {e}")
+        sys.exit(1)
+    print(f"Прогон: {time.perf_counter() - t0:.2f} с\n")
+
+    base_profit = m['profit'][0]
+    order = sorted(range(1, len(configs)), key=lambda i: -m['profit'][i])[:args.top]
+
+    print("=" * 130)
+    print(f"{'#':>3} {'Выручка':>13} {'Прибыль':>12} {'Δ к ист.':>8} {'Маржа':>6} {'Продано':>9} "
+          f"{'Упущено':>8} {'OOS':>5}  Стратегия")
+    print("=" * 130)
+    for rank, i in enumerate([0] + order):
+        label = 'история (фактические цены)' if i == 0 else describe(configs[i])
+        delta = (m['profit'][i] / base_profit - 1) * 100 if base_profit else 0
+        print(f"{'—' if i == 0 else rank:>3} {m['revenue'][i]:>13,.0f} {m['profit'][i]:>12,.0f} {delta:>+7.1f}% "
+              f"{m['margin'][i] * 100:>5.1f}% {m['qty'][i]:>9,.0f} {m['lost_qty'][i]:>8,.0f} "
+              f"{m['oos_share'][i] * 100:>4.1f}%  {label}")
+    print("\nПрибыль — без хранения; OOS — доля SKU × недель, где спрос превысил остаток.")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,36 @@
 Источники:
 - GuruSeller: статистика возвратов по категориям 2025
 - GuruSeller: процент выкупа на WB и Озон — ключевые ориентиры
+
+Использование (из корня репозитория):
+  python PRJ_ВЫБОР_НИШИ/add_buyback_rate.py
+  python PRJ_ВЫБОР_НИШИ/add_buyback_rate.py --flat               # автомат по всему пути вместо дерева
+  python PRJ_ВЫБОР_НИШИ/add_buyback_rate.py --benchmark 1000000   # дерево и автомат против цикла
+
+По умолчанию ставка ищется по дереву категорий (category_trie.py): правило
+самого глубокого сегмента пути, у которого оно есть, иначе — ближайшего
+предка. --flat — прежняя семантика цикла по BUYBACK_RULES (первое по списку
+правило, слово которого входит в путь) автоматом по всему пути.
+
+Замер этапов (rules, enrich; см. scripts/stageprof.py):
+  python PRJ_ВЫБОР_НИШИ/add_buyback_rate.py --stages --profile enrich
 """
 
-import csv
+import argparse
+import math
+import os
 import random
+import sys
+import time
+from functools import lru_cache
+
+from buyback_matcher import KeywordMatcher
+from category_trie import CategoryTrie
+from niche_pipeline import TopK, enrich, enriched_header, read_column, read_rows, watch, write_rows
+from niche_table import parse_number
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import stageprof
 
 # --- Маппинг: ключевые слова в пути категории → процент выкупа ---
 # Порядок важен: более специфичные правила идут первыми
@@ -260,12 +286,26 @@ BUYBACK_RULES = [
 ]
 
 
+DEFAULT_RATE = 80  # дефолт для неизвестных категорий
+
+# Все ключевые слова — в одном автомате Aho–Corasick (см. buyback_matcher.py)
+_MATCHER = KeywordMatcher(keyword for keyword, _ in BUYBACK_RULES)
+_RATES = [rate for _, rate in BUYBACK_RULES]
+
+
+@lru_cache(maxsize=65536)
 def get_buyback_rate(category_path: str) -> int:
-    """Определяет процент выкупа по пути категории."""
+    """Процент выкупа по пути категории (первое сработавшее правило) — режим --flat."""
+    idx = _MATCHER.first_match(category_path)
+    return _RATES[idx] if idx >= 0 else DEFAULT_RATE
+
+
+def get_buyback_rate_linear(category_path: str) -> int:
+    """Прежний линейный проход по BUYBACK_RULES — эталон для --benchmark."""
     for keyword, rate in BUYBACK_RULES:
         if keyword in category_path:
             return rate
-    return 80  # дефолт для неизвестных категорий
+    return DEFAULT_RATE
 
 
 def add_jitter(rate: int, jitter: int = 3) -> float:
@@ -274,75 +314,125 @@ def add_jitter(rate: int, jitter: int = 3) -> float:
     return round(max(1, min(99, result)), 1)
 
 
-def main():
-    input_file = "PRJ_ВЫБОР_НИШИ/OZON - выбор ниши - 12.02.2026.csv"
-    output_file = "PRJ_ВЫБОР_НИШИ/OZON - выбор ниши - с выкупом.csv"
-
-    random.seed(42)  # для воспроизводимости
+class BuybackEnricher:
+    """Обогатитель: колонка «Процент выкупа, %» (ставка категории + разброс)."""
 
-    rows = []
-    with open(input_file, "r", encoding="utf-8") as f:
-        reader = csv.reader(f, delimiter=";")
-        header = next(reader)
-        for row in reader:
-            rows.append(row)
+    columns = ["Процент выкупа, %"]
 
-    # Добавляем колонку
-    header.append("Процент выкупа, %")
+    def __init__(self, resolve):
+        self.resolve = resolve
 
-    for row in rows:
+    def __call__(self, row: list[str]) -> list[str]:
         category = row[0] if row else ""
-        base_rate = get_buyback_rate(category)
-        rate = add_jitter(base_rate)
-        row.append(str(rate).replace(".", ","))  # русская локаль
+        rate = add_jitter(self.resolve(category))
+        return [str(rate).replace(".", ",")]  # русская локаль
 
-    # Сохраняем
-    with open(output_file, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f, delimiter=";")
-        writer.writerow(header)
-        writer.writerows(rows)
 
-    print(f"Сохранено: {output_file}")
-    print(f"Всего ниш: {len(rows)}")
+def _rate_key(row: list[str]) -> float | None:
+    """Процент выкупа из последней колонки (None — не число)."""
+    rate = parse_number(row[-1])
+    return None if math.isnan(rate) else rate
 
-    # --- Сводная таблица: TOP 20 лучших и 20 худших ---
-    parsed = []
-    for row in rows:
-        category = row[0]
-        rate_str = row[-1].replace(",", ".")
-        try:
-            rate = float(rate_str)
-        except ValueError:
-            continue
-        # Берём выручку для доп. контекста
-        revenue_str = row[17].replace(",", ".").replace("\xa0", "") if len(row) > 17 else "0"
-        try:
-            revenue = float(revenue_str)
-        except ValueError:
-            revenue = 0
-        parsed.append((category, rate, revenue))
-
-    # Сортировка
-    parsed.sort(key=lambda x: x[1], reverse=True)
 
-    print("\n" + "=" * 100)
-    print("TOP 20 НИШИ С САМЫМ ВЫСОКИМ ПРОЦЕНТОМ ВЫКУПА")
-    print("=" * 100)
-    print(f"{'№':>3} | {'Процент':>8} | {'Выручка, ₽':>18} | {'Ниша'}")
-    print("-" * 100)
-    for i, (cat, rate, rev) in enumerate(parsed[:20], 1):
-        # Укороченное название
-        short = cat if len(cat) <= 60 else cat[:57] + "..."
-        print(f"{i:3d} | {rate:7.1f}% | {rev:>18,.0f} | {short}")
+def _revenue(row: list[str]) -> float:
+    """Выручка ниши (колонка 17) для доп. контекста."""
+    revenue = parse_number(row[17]) if len(row) > 17 else 0
+    return 0 if math.isnan(revenue) else revenue
 
+
+def print_rates(title: str, rows: list[list[str]]) -> None:
+    """Таблица ниш: процент выкупа, выручка, укороченное название."""
     print("\n" + "=" * 100)
-    print("BOTTOM 20 НИШИ С САМЫМ НИЗКИМ ПРОЦЕНТОМ ВЫКУПА")
+    print(title)
     print("=" * 100)
     print(f"{'№':>3} | {'Процент':>8} | {'Выручка, ₽':>18} | {'Ниша'}")
     print("-" * 100)
-    for i, (cat, rate, rev) in enumerate(parsed[-20:], 1):
+    for i, row in enumerate(rows, 1):
+        cat = row[0]
         short = cat if len(cat) <= 60 else cat[:57] + "..."
-        print(f"{i:3d} | {rate:7.1f}% | {rev:>18,.0f} | {short}")
+        print(f"{i:3d} | {_rate_key(row):7.1f}% | {_revenue(row):>18,.0f} | {short}")
+
+
+def benchmark(paths: list[str], n: int) -> None:
+    """Сравнить цикл, автомат (с кэшем и без) и дерево категорий на n путях.
+
+    Пути берутся из выгрузки с повторами (как у SKU одной ниши). Автомат
+    сверяется с циклом (расхождений быть не должно); дерево считает ставку
+    по глубочайшему сегменту и отличается там, где цикл брал правило чужого
+    раздела, — число таких путей печатается отдельно.
+    """
+    rng = random.Random(0)
+    stream = [rng.choice(paths) for _ in range(n)]
+    uncached = get_buyback_rate.__wrapped__
+    t0 = time.perf_counter()
+    trie = CategoryTrie(BUYBACK_RULES, paths, DEFAULT_RATE)
+    build = time.perf_counter() - t0
+
+    timings = {}
+    results = {}
+    for label, func in [("цикл по правилам", get_buyback_rate_linear),
+                        ("автомат", uncached),
+                        ("автомат + lru_cache", get_buyback_rate),
+                        ("дерево категорий", trie.rate)]:
+        get_buyback_rate.cache_clear()
+        t0 = time.perf_counter()
+        results[label] = [func(p) for p in stream]
+        timings[label] = time.perf_counter() - t0
+
+    reference = results["цикл по правилам"]
+    mismatches = sum(a != b for label in ("автомат", "автомат + lru_cache")
+                     for a, b in zip(reference, results[label]))
+    differ = sum(a != b for a, b in zip(reference, results["дерево категорий"]))
+    base = timings["цикл по правилам"]
+
+    print(f"Путей: {n:,} (уникальных {len(set(stream)):,}), правил: {len(BUYBACK_RULES)}, "
+          f"узлов дерева: {len(trie):,} (построение {build:.3f} с)")
+    print(f"{'Вариант':<22} {'Время, с':>9} {'мкс/путь':>9} {'Ускорение':>10}")
+    for label, t in timings.items():
+        print(f"{label:<22} {t:>9.3f} {t / n * 1e6:>9.2f} {base / t:>9.1f}x")
+    print(f"Расхождений автомата с циклом: {mismatches}")
+    print(f"Путей, где дерево уточнило ставку цикла: {differ:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Добавить процент выкупа к выгрузке ниш Ozon")
+    parser.add_argument("--benchmark", type=int, metavar="N", default=0,
+                        help="Только замерить поиск правила на N путях (без записи файла)")
+    parser.add_argument("--flat", action="store_true",
+                        help="Прежняя семантика: первое по списку правило по всему пути, без дерева категорий")
+    stageprof.add_arguments(parser)
+    args = parser.parse_args()
+    stageprof.configure_from_args(args)
+
+    input_file = "PRJ_ВЫБОР_НИШИ/OZON - выбор ниши - 12.02.2026.csv"
+    output_file = "PRJ_ВЫБОР_НИШИ/OZON - выбор ниши - с выкупом.csv"
+
+    random.seed(42)  # для воспроизводимости
+
+    if args.benchmark:
+        benchmark(read_column(input_file, 0), args.benchmark)
+        return
+
+    # Дерево достраивается по ходу единственного прохода: незнакомый путь —
+    # при первой встрече, без отдельного чтения рубрикатора
+    with stageprof.stage("rules"):
+        resolve = get_buyback_rate if args.flat else CategoryTrie(BUYBACK_RULES, default=DEFAULT_RATE).rate
+    enrichers = [BuybackEnricher(resolve)]
+
+    # Строки читаются, обогащаются и пишутся по одной; топ/антитоп — кучами
+    top = TopK(20, key=_rate_key)
+    bottom = TopK(20, key=_rate_key, smallest=True)
+    with stageprof.stage("enrich") as st:
+        header, rows = read_rows(input_file)
+        rows = watch(enrich(rows, enrichers), top, bottom)
+        n = st.rows = write_rows(output_file, enriched_header(header, enrichers), rows)
+
+    print(f"Сохранено: {output_file}")
+    print(f"Всего ниш: {n}")
+
+    # --- Сводная таблица: TOP 20 лучших и 20 худших ---
+    print_rates("TOP 20 НИШИ С САМЫМ ВЫСОКИМ ПРОЦЕНТОМ ВЫКУПА", top.items())
+    print_rates("BOTTOM 20 НИШИ С САМЫМ НИЗКИМ ПРОЦЕНТОМ ВЫКУПА", bottom.items())
 
 
 if __name__ == "__main__":
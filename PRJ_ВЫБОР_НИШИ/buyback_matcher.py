@@ -0,0 +1,87 @@
+"""
+Многошаблонный поиск ключевых слов (Aho–Corasick) для правил выкупа.
+
+Заменяет линейный проход `for keyword in rules: if keyword in path` одним
+проходом по строке: автомат строится один раз по всем ключевым словам,
+затем каждый символ пути — один переход. Время не зависит от числа правил.
+
+Семантика «первое правило побеждает» сохраняется: в каждом состоянии
+автомата хранится минимальный индекс правила среди всех слов, которые
+оканчиваются в этой позиции (включая суффиксные), и по строке берётся
+минимум — ровно то правило, которое первым сработало бы в цикле.
+
+Автомат детерминированный (DFA): переходы по неудаче заранее свёрнуты
+в таблицу, поэтому на символ приходится один dict.get без цепочек fail.
+
+Использование:
+    matcher = KeywordMatcher([kw for kw, _ in BUYBACK_RULES])
+    idx = matcher.first_match("Одежда / Женская одежда / Платья и сарафаны")
+    # idx — индекс первого сработавшего правила или -1
+"""
+
+from collections import deque
+
+NO_MATCH = -1
+
+
+class KeywordMatcher:
+    """Aho–Corasick DFA: минимальный индекс ключевого слова, входящего в строку."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        goto = [{}]
+        best = [len(self.keywords)]        # «нет совпадения» = индекс за концом списка
+
+        # 1. Бор по ключевым словам; в узле — минимальный индекс слова
+        for idx, word in enumerate(self.keywords):
+            if not word:
+                raise ValueError(f'пустое ключевое слово (индекс {idx})')
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    best.append(len(self.keywords))
+                state = nxt
+            best[state] = min(best[state], idx)
+
+        # 2. BFS: ссылки неудачи, минимум по суффиксам и полная таблица переходов
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = deque()
+        for nxt in goto[0].values():
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            f = fail[state]
+            best[state] = min(best[state], best[f])
+            table = dict(delta[f])
+            table.update(goto[state])
+            delta[state] = table
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[f].get(ch, 0) if state else 0
+                queue.append(nxt)
+
+        self._delta = delta
+        self._best = best
+        self._none = len(self.keywords)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def first_match(self, text):
+        """Индекс первого (по порядку правил) слова, входящего в text, или -1."""
+        delta, best = self._delta, self._best
+        found = self._none
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            b = best[state]
+            if b < found:
+                found = b
+                if found == 0:
+                    break
+        return found if found < self._none else NO_MATCH
@@ -0,0 +1,89 @@
+"""
+Процент выкупа по дереву категорий: путь «Одежда / Женская одежда / …»
+разбирается на сегменты, ставки привязаны к узлам дерева.
+
+Поиск — спуск от корня по сегментам, O(глубины): ставка пути — правило
+самого глубокого сегмента, у которого оно есть. Сегмент без правила
+наследует ставку ближайшего предка (корень — default), поэтому
+«Товары для животных / Товары для собак / Одежда для собак» остаётся в
+товарах для животных, а «Электроника / Аксессуары для электроники /
+Батарейки» — в электронике.
+
+Правило сегмента — из тех же пар (ключевое слово, ставка), что BUYBACK_RULES:
+  - слово совпадает с названием сегмента целиком («Одежда», «Наушники»,
+    «Одежда для девочек») — правило узла
+  - иначе — первое по списку слово из нескольких слов, входящее в сегмент
+    подстрокой («Платья и сарафаны» → «Платья и сарафаны женские»), поиск
+    автоматом KeywordMatcher
+Однословные ключи («Одежда», «Наушники», «Инструменты») — родовые названия
+разделов, и подстрокой они ловили чужие ветки: «Одежда для собак»,
+«Наушники меховые женские», «Инструменты для маникюра». Такие ключи
+срабатывают только на узле с тем же названием.
+
+Ставки отличаются от прежнего цикла (--flat) там, где цикл брал правило
+чужого раздела; дерево строится лениво — незнакомый путь достраивается
+при первом запросе, повторный путь — O(глубины) переходов по словарям.
+
+Использование:
+    trie = CategoryTrie(BUYBACK_RULES, default=80)
+    trie.rate("Одежда / Женская одежда / Платья и сарафаны женские")
+"""
+
+from buyback_matcher import NO_MATCH, KeywordMatcher
+
+SEPARATOR = " / "
+
+
+class _Node:
+    __slots__ = ("children", "rate")
+
+    def __init__(self, rate):
+        self.children = {}
+        self.rate = rate
+
+
+class CategoryTrie:
+    """Дерево категорий со ставками в узлах; ставка пути — от глубочайшего предка с правилом."""
+
+    def __init__(self, rules, paths=(), default=80, sep=SEPARATOR):
+        self.sep = sep
+        self.default = default
+        self._exact = {}
+        phrases = []
+        for keyword, rate in rules:
+            if sep.strip() in keyword or keyword != keyword.strip():
+                raise ValueError(f"ключевое слово {keyword!r} может пересечь разделитель {sep!r}")
+            self._exact.setdefault(keyword, rate)
+            if " " in keyword:
+                phrases.append((keyword, rate))
+        self._matcher = KeywordMatcher(keyword for keyword, _ in phrases)
+        self._phrase_rates = [rate for _, rate in phrases]
+
+        self._root = _Node(default)
+        self._size = 0
+        for path in paths:
+            self.rate(path)
+
+    def __len__(self):
+        """Число узлов (без корня)."""
+        return self._size
+
+    def segment_rate(self, segment):
+        """Ставка правила самого сегмента (без предков) или None."""
+        rate = self._exact.get(segment)
+        if rate is not None:
+            return rate
+        idx = self._matcher.first_match(segment)
+        return None if idx == NO_MATCH else self._phrase_rates[idx]
+
+    def rate(self, path):
+        """Ставка пути: правило самого глубокого сегмента, у которого оно есть (иначе default)."""
+        node = self._root
+        for segment in path.split(self.sep):
+            child = node.children.get(segment)
+            if child is None:
+                own = self.segment_rate(segment)
+                child = node.children[segment] = _Node(node.rate if own is None else own)
+                self._size += 1
+            node = child
+        return node.rate
@@ -0,0 +1,196 @@
+"""
+Многокритериальный отбор ниш: Парето-фронты вместо одного взвешенного балла.
+
+Ниша A доминирует B, если A не хуже B по всем целям и лучше хотя бы по
+одной. Первый фронт — недоминируемые ниши (ни одну нельзя улучшить по
+одной цели, не ухудшив другую), второй — недоминируемые после удаления
+первого и т.д. Взвешенный балл (niche_scoring.py) выбирает одну точку
+фронта; сам фронт показывает все компромиссы.
+
+Алгоритмы (без попарного сравнения всех ниш, O(n²)):
+  - 2 цели: сортировка + проход с бегущим минимумом — O(n log n);
+    все фронты сразу — бинарным поиском по минимумам фронтов, O(n log n)
+  - m ≥ 3 цели: разделяй и властвуй Kung–Luccio–Preparata — точки
+    сортируются лексикографически, фронты половин сливаются; точка нижней
+    половины не может доминировать точку верхней, поэтому проверяется
+    только «нижние против фронта верхних» (векторно, блоками).
+    Последующие фронты — снятием предыдущего (peeling)
+Совпадающие точки друг друга не доминируют и попадают в один фронт.
+
+Цели — колонки niche_table / метрики niche_scoring с направлением
+(+1 — максимизировать, −1 — минимизировать); пропуск — худшее значение.
+
+Использование:
+    from niche_pareto import DEFAULT_OBJECTIVES, objective_matrix, pareto_fronts
+    points = objective_matrix(table, DEFAULT_OBJECTIVES, mask)
+    front = pareto_fronts(points, max_fronts=3)      # 0, 1, 2; −1 — дальше
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+from niche_scoring import metric
+
+# Выручка ↑, конкуренция (продавцы с продажами) ↓, упущенная выручка ↑,
+# замороженный остаток ↓, процент выкупа ↑
+DEFAULT_OBJECTIVES = [
+    ("revenue", +1),
+    ("sellers_with_sales", -1),
+    ("pct_lost_revenue", +1),
+    ("pct_frozen_stock", -1),
+    ("buyback_pct", +1),
+]
+
+LEAF = 64          # блок, который проще проверить попарно целиком
+BLOCK = 4096       # размер пачки при векторной проверке доминирования
+
+
+def parse_objectives(text):
+    """'revenue+,sellers_with_sales-' → [('revenue', 1), ('sellers_with_sales', -1)]."""
+    objectives = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part or part[-1] not in "+-":
+            raise ValueError(f"цель вида КЛЮЧ+ или КЛЮЧ- (максимизировать / минимизировать), получено: {part!r}")
+        objectives.append((part[:-1], +1 if part[-1] == "+" else -1))
+    return objectives
+
+
+def objective_matrix(table, objectives, mask=None):
+    """(N, m) матрица целей «чем меньше, тем лучше»; пропуск → +inf.
+
+    Возвращает (points, index): index — номера строк table.
+    """
+    index = np.arange(table["n_rows"]) if mask is None else np.flatnonzero(mask)
+    points = np.empty((len(index), len(objectives)))
+    for j, (key, direction) in enumerate(objectives):
+        values = metric(table, key)[index] * (-1.0 if direction > 0 else 1.0)
+        points[:, j] = np.where(np.isfinite(values), values, np.inf)
+    return points, index
+
+
+def _weakly_dominates(T, B, columns):
+    """(len(B), len(T)): T[j] ≤ B[i] по всем columns.
+
+    Поколоночное «и» двумерных сравнений — заметно быстрее, чем
+    трёхмерное сравнение и .all() по короткой оси целей.
+    """
+    out = T[None, :, columns[0]] <= B[:, None, columns[0]]
+    for c in columns[1:]:
+        out &= T[None, :, c] <= B[:, None, c]
+    return out
+
+
+def _dominated_by(B, T):
+    """Маска строк B, которые доминирует хоть одна строка T.
+
+    Строки уникальны, T лексикографически меньше B, поэтому по первой цели
+    T заведомо не хуже — сравниваются остальные. T перебирается пачками от
+    «сильных» точек (малая сумма целей) к слабым, доминируемые строки B
+    сразу выбывают — полная проверка нужна только выжившим.
+    """
+    out = np.zeros(len(B), dtype=bool)
+    if len(T) == 0 or len(B) == 0:
+        return out
+    columns = list(range(1, B.shape[1]))
+    with np.errstate(invalid="ignore"):
+        T = T[np.argsort(T[:, 1:].sum(axis=1), kind="stable")]
+    alive = np.arange(len(B))
+    t_step = 256
+    for t0 in range(0, len(T), t_step):
+        Tb = T[t0:t0 + t_step]
+        b_step = max(1, BLOCK * 16 // len(Tb))
+        hit = np.zeros(len(alive), dtype=bool)
+        for b0 in range(0, len(alive), b_step):
+            chunk = B[alive[b0:b0 + b_step]]
+            hit[b0:b0 + b_step] = _weakly_dominates(Tb, chunk, columns).any(axis=1)
+        out[alive[hit]] = True
+        alive = alive[~hit]
+        if len(alive) == 0:
+            break
+    return out
+
+
+def _kung(P):
+    """Индексы недоминируемых строк P (уникальны, отсортированы лексикографически)."""
+    n = len(P)
+    if n <= LEAF:
+        le = _weakly_dominates(P, P, list(range(P.shape[1])))
+        np.fill_diagonal(le, False)
+        return np.flatnonzero(~le.any(axis=1))
+    half = n // 2
+    top = _kung(P[:half])
+    bottom = half + _kung(P[half:])
+    return np.concatenate([top, bottom[~_dominated_by(P[bottom], P[top])]])
+
+
+def _unique_sorted(points):
+    """Уникальные точки в лексикографическом порядке + обратное отображение."""
+    uniq, inverse = np.unique(points, axis=0, return_inverse=True)
+    return uniq, inverse.reshape(-1)
+
+
+def pareto_front(points):
+    """Маска недоминируемых точек (N,) для матрицы «меньше — лучше» (N, m)."""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    uniq, inverse = _unique_sorted(points)
+    if uniq.shape[1] == 1:
+        keep = np.zeros(len(uniq), dtype=bool)
+        keep[0] = True
+    elif uniq.shape[1] == 2:
+        # По x уже отсортировано: точка недоминируема, если её y меньше всех предыдущих
+        y = uniq[:, 1]
+        prev_min = np.concatenate([[np.inf], np.minimum.accumulate(y)[:-1]])
+        keep = y < prev_min
+    else:
+        keep = np.zeros(len(uniq), dtype=bool)
+        keep[_kung(uniq)] = True
+    return keep[inverse]
+
+
+def _fronts_2d(uniq):
+    """Номер фронта каждой уникальной точки для двух целей, O(n log n)."""
+    front = np.empty(len(uniq), dtype=np.int64)
+    min_y = []                       # минимальный y в каждом фронте — неубывающий
+    for i, y in enumerate(uniq[:, 1].tolist()):
+        f = bisect_right(min_y, y)   # первый фронт, где нет точки с y' ≤ y
+        if f == len(min_y):
+            min_y.append(y)
+        else:
+            min_y[f] = y
+        front[i] = f
+    return front
+
+
+def pareto_fronts(points, max_fronts=None):
+    """Номер Парето-фронта каждой точки (0 — недоминируемые).
+
+    max_fronts — сколько фронтов считать; точки дальше получают −1
+    (для m ≥ 3 каждый фронт — отдельное снятие, лишние не считаются).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+    uniq, inverse = _unique_sorted(points)
+
+    if uniq.shape[1] <= 2:
+        if uniq.shape[1] == 1:
+            front = np.arange(len(uniq))
+        else:
+            front = _fronts_2d(uniq)
+        if max_fronts is not None:
+            front = np.where(front < max_fronts, front, -1)
+        return front[inverse]
+
+    front = np.full(len(uniq), -1, dtype=np.int64)
+    remaining = np.arange(len(uniq))          # подмножество отсортированного — тоже отсортировано
+    f = 0
+    while len(remaining) and (max_fronts is None or f < max_fronts):
+        nd = remaining[_kung(uniq[remaining])]
+        front[nd] = f
+        remaining = np.setdiff1d(remaining, nd, assume_unique=True)
+        f += 1
+    return front[inverse]
@@ -0,0 +1,114 @@
+"""
+Потоковое обогащение выгрузок ниш (CSV «;», как у Ozon / MPStats).
+
+Строки читаются лениво, проходят цепочку обогатителей и сразу пишутся в
+выходной файл — в памяти одна строка, а не вся выгрузка. Сводки вроде
+«топ-20 / антитоп-20» собираются по ходу кучами размера k (heapq), без
+сортировки всех строк. Многогигабайтные выгрузки по всем маркетплейсам
+обрабатываются в постоянной памяти.
+
+Обогатитель — объект с атрибутом columns (имена добавляемых колонок) и
+методом __call__(row) → список значений этих колонок. Каждый следующий
+обогатитель видит строку с колонками предыдущих.
+
+Использование:
+    header, rows = read_rows(input_file)
+    header = enriched_header(header, enrichers)
+    top = TopK(20, key=lambda row: float(row[-1]))
+    rows = watch(enrich(rows, enrichers), top)
+    n = write_rows(output_file, header, rows)
+    top.items()                                    # по убыванию ключа
+"""
+
+import csv
+import heapq
+import itertools
+
+DELIMITER = ";"
+
+
+def read_rows(path, delimiter=DELIMITER, encoding="utf-8"):
+    """(header, итератор строк). Файл открыт, пока итератор не исчерпан."""
+    f = open(path, "r", encoding=encoding, newline="")
+    reader = csv.reader(f, delimiter=delimiter)
+    header = next(reader)
+
+    def rows():
+        with f:
+            yield from reader
+
+    return header, rows()
+
+
+def read_column(path, index=0, delimiter=DELIMITER, encoding="utf-8"):
+    """Уникальные значения одной колонки — отдельный лёгкий проход по файлу."""
+    _, rows = read_rows(path, delimiter, encoding)
+    return list(dict.fromkeys(row[index] for row in rows if len(row) > index))
+
+
+def enriched_header(header, enrichers):
+    """Заголовок с колонками всех обогатителей."""
+    return header + [name for enricher in enrichers for name in enricher.columns]
+
+
+def enrich(rows, enrichers):
+    """Лениво дописать к каждой строке колонки обогатителей (по порядку цепочки)."""
+    for row in rows:
+        for enricher in enrichers:
+            row.extend(enricher(row))
+        yield row
+
+
+def watch(rows, *trackers):
+    """Пропустить строки дальше, попутно передав каждую трекерам (TopK и т.п.)."""
+    for seq, row in enumerate(rows):
+        for tracker in trackers:
+            tracker.push(row, seq)
+        yield row
+
+
+def write_rows(path, header, rows, delimiter=DELIMITER, encoding="utf-8"):
+    """Записать строки по мере поступления; возвращает их число."""
+    n = 0
+    with open(path, "w", encoding=encoding, newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    return n
+
+
+class TopK:
+    """k строк с наибольшим (smallest=True — наименьшим) ключом.
+
+    Куча размера k, O(log k) на строку. items() возвращает строки в том же
+    порядке, что срез стабильной сортировки всех строк по убыванию ключа:
+    sorted(...)[:k] для наибольших и sorted(...)[-k:] для наименьших.
+    key(row) → None — строка пропускается.
+    """
+
+    def __init__(self, k, key, smallest=False):
+        self.k = k
+        self.key = key
+        self.smallest = smallest
+        self._heap = []
+        self._seq = itertools.count()
+
+    def push(self, row, seq=None):
+        value = self.key(row)
+        if value is None or self.k <= 0:
+            return
+        seq = next(self._seq) if seq is None else seq
+        # В куче — k наибольших порядковых ключей; при равенстве значений
+        # в топ попадает строка раньше, в антитоп — позже (как у среза)
+        rank = (-value, seq) if self.smallest else (value, -seq)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (rank, row))
+        elif rank > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (rank, row))
+
+    def items(self):
+        """Строки в порядке стабильной сортировки по убыванию ключа."""
+        ordered = sorted(self._heap, key=lambda e: e[0], reverse=not self.smallest)
+        return [row for _, row in ordered]
@@ -0,0 +1,153 @@
+"""
+Скоринг и ранжирование ниш по выгрузке (niche-selection-plan.md, фаза 3).
+
+Каждый критерий — колонка таблицы niche_table (или производная метрика)
+с направлением: +1 — чем больше, тем лучше, −1 — наоборот. Значения
+переводятся в перцентильные ранги [0, 1] внутри ниш, прошедших жёсткие
+фильтры (ничьи — средний ранг, пропуск — 0.5), и складываются с весами:
+  score = 100 · Σ w_c · rank_c / Σ w_c
+
+Ранги считаются один раз (criteria_ranks), смена весов — одно умножение
+матрицы (N × C) на вектор и argpartition для топ-N (rank_niches), поэтому
+пересчёт на тысячах ниш занимает доли миллисекунды.
+
+Использование:
+    table = read_niches(path)
+    mask = apply_filters(table, ["sales_price_median>=800", "revenue>=1e6"])
+    ranks = criteria_ranks(table, mask)
+    result = rank_niches(ranks, {**DEFAULT_WEIGHTS, "buyback_pct": 0.3}, top=20)
+    result['index'], result['score']          # строки table и баллы
+"""
+
+import re
+
+import numpy as np
+
+# (ключ, подпись, направление, вес по умолчанию) — веса по матрице из плана:
+# объём рынка 20%, конкуренция 20%, спрос/оборот/выкуп вместо маржи, сезонность 10%
+CRITERIA = [
+    ("revenue", "Выручка ниши", +1, 0.20),
+    ("revenue_per_seller", "Выручка на продавца с продажами", +1, 0.10),
+    ("sellers_with_sales", "Продавцы с продажами", -1, 0.10),
+    ("pct_lost_revenue", "Упущенная выручка, %", +1, 0.15),
+    ("turnover_days", "Оборачиваемость, дн.", -1, 0.10),
+    ("pct_frozen_stock", "Замороженный остаток, %", -1, 0.05),
+    ("buyback_pct", "Процент выкупа, %", +1, 0.15),
+    ("seasonality", "Сезонность ниши", -1, 0.10),
+    ("pct_items_with_sales", "% товаров с продажами", +1, 0.05),
+]
+DEFAULT_WEIGHTS = {key: weight for key, _, _, weight in CRITERIA}
+DIRECTION = {key: direction for key, _, direction, _ in CRITERIA}
+LABELS = {key: label for key, label, _, _ in CRITERIA}
+
+# Жёсткие фильтры по умолчанию (план, фаза 1): средний чек 800–3000 ₽,
+# потолок ниши выше 1 млн выручки
+DEFAULT_FILTERS = ["sales_price_median>=800", "sales_price_median<=3000", "revenue>=1000000"]
+
+_OPS = {
+    ">=": np.greater_equal, "<=": np.less_equal, "==": np.equal, "!=": np.not_equal,
+    ">": np.greater, "<": np.less,
+}
+_FILTER_RE = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(\S+)\s*$")
+
+
+def metric(table, key):
+    """Колонка таблицы или производная метрика как float64 (NaN — нет значения)."""
+    if key == "revenue_per_seller":
+        sellers = table["sellers_with_sales"].astype(np.float64)
+        return np.divide(table["revenue"], sellers, out=np.full(table["n_rows"], np.nan), where=sellers > 0)
+    if key not in table["columns"]:
+        raise KeyError(f"нет колонки или метрики {key!r}")
+    values = table[key].astype(np.float64)
+    null = table["null"].get(key)
+    return values if null is None else np.where(null, np.nan, values)
+
+
+def parse_filter(text):
+    """'revenue>=1e6' → (ключ, оператор, число)."""
+    m = _FILTER_RE.match(text)
+    try:
+        if not m:
+            raise ValueError
+        key, op, value = m.groups()
+        return key, op, float(value)
+    except ValueError:
+        raise ValueError(f"фильтр вида КЛЮЧ>=ЧИСЛО (операторы {' '.join(_OPS)}), получено: {text!r}") from None
+
+
+def apply_filters(table, filters):
+    """Маска ниш, прошедших все фильтры; пропуск значения фильтр не проходит."""
+    mask = np.ones(table["n_rows"], dtype=bool)
+    for text in filters:
+        key, op, value = parse_filter(text)
+        values = metric(table, key)
+        with np.errstate(invalid="ignore"):
+            mask &= np.isfinite(values) & _OPS[op](values, value)
+    return mask
+
+
+def percentile_ranks(values):
+    """Перцентильные ранги [0, 1]: ничьи — средний ранг, NaN — 0.5."""
+    x = np.asarray(values, dtype=np.float64)
+    out = np.full(x.shape, 0.5)
+    ok = np.isfinite(x)
+    n = int(ok.sum())
+    if n > 1:
+        _, inverse, counts = np.unique(x[ok], return_inverse=True, return_counts=True)
+        avg_rank = np.cumsum(counts) - (counts + 1) / 2       # средний 0-based ранг группы равных
+        out[ok] = avg_rank[inverse] / (n - 1)
+    return out
+
+
+def criteria_ranks(table, mask=None, keys=None):
+    """Ранги критериев для ниш из mask.
+
+    Возвращает dict:
+      index   — номера строк table (N,)
+      keys    — критерии (колонки matrix); без колонки в таблице — пропускаются
+      matrix  — (N, C) ранги с учётом направления (1 — лучшее значение)
+    """
+    index = np.arange(table["n_rows"]) if mask is None else np.flatnonzero(mask)
+    keys = [k for k in (keys or DEFAULT_WEIGHTS)
+            if k in table["columns"] or k == "revenue_per_seller"]
+    matrix = np.empty((len(index), len(keys)))
+    for j, key in enumerate(keys):
+        r = percentile_ranks(metric(table, key)[index])
+        matrix[:, j] = r if DIRECTION.get(key, +1) > 0 else 1 - r
+    return {"index": index, "keys": keys, "matrix": matrix}
+
+
+def rank_niches(ranks, weights=None, top=20):
+    """Топ-N ниш по взвешенной сумме рангов.
+
+    weights — {критерий: вес}; критерии без веса не учитываются, веса
+    нормируются на сумму. Критерий из CRITERIA, которого нет в таблице
+    (например, buyback_pct в выгрузке без выкупа), пропускается.
+    Возвращает dict: index (строки table), score (0–100),
+    contrib (N_top, C) — вклад критериев в балл, keys.
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    unknown = [k for k, v in weights.items() if v and k not in ranks["keys"] and k not in DIRECTION]
+    if unknown:
+        raise ValueError(f"нет рангов для критериев: {', '.join(unknown)} (передайте их в criteria_ranks)")
+    w = np.array([float(weights.get(k, 0.0)) for k in ranks["keys"]])
+    if (w < 0).any() or w.sum() <= 0:
+        raise ValueError("веса должны быть неотрицательными и не все нулевыми")
+    w = w / w.sum()
+
+    score = ranks["matrix"] @ w * 100
+    top = min(top, len(score))
+    if top <= 0:
+        best = np.array([], dtype=np.int64)
+    else:
+        # Кандидаты — все с баллом не ниже k-го (ничьи на границе не теряются),
+        # затем по баллу, при равенстве — по порядку строк
+        kth = np.partition(score, len(score) - top)[len(score) - top]
+        best = np.flatnonzero(score >= kth)
+        best = best[np.lexsort((best, -score[best]))][:top]
+    return {
+        "index": ranks["index"][best],
+        "score": score[best],
+        "contrib": ranks["matrix"][best] * w * 100,
+        "keys": ranks["keys"],
+    }
@@ -0,0 +1,177 @@
+"""
+Типизированное чтение выгрузок ниш Ozon («OZON - выбор ниши - *.csv»).
+
+Формат выгрузки: разделитель «;», десятичная запятая, пробел / неразрывный
+пробел как разделитель тысяч, кавычки вокруг значений (название категории
+может занимать несколько строк), пропуски — пустые строки или «nan».
+
+Схема SCHEMA задаёт для каждой из 36 колонок короткий ключ и тип; колонка
+«Процент выкупа, %» (add_buyback_rate.py) необязательна. Колонки
+переводятся в числа целиком, за один проход по колонке (замена
+разделителей одним str.translate на всю колонку, пропуски → NaN, разбор
+в C через np.fromiter), а не поштучным float() с replace в цикле.
+
+Результат — dict колонок numpy по ключам схемы плюс маски пропусков:
+    table = read_niches(path)
+    table['revenue']            # float64 (N,)
+    table['null']['revenue']    # bool (N,) — True, если значения нет
+    table['n_rows'], table['columns'] (ключи колонок, которые есть в файле)
+Целые колонки — int64 (пропуск → 0, см. маску), даты — datetime64[D]
+(пропуск → NaT), дробные — float64 (пропуск → NaN).
+
+Для потоковой обработки (niche_pipeline.py) — parse_number(text) по тем же
+правилам для одного значения.
+"""
+
+import csv
+
+import numpy as np
+
+# (заголовок в выгрузке, ключ, тип)
+SCHEMA = [
+    ("Название предмета", "name", "str"),
+    ("Сезонность ниши", "seasonality", "int"),
+    ("Дата обнаружения", "discovered", "date"),
+    ("Товары, шт.", "items", "int"),
+    ("Количество новинок", "new_items", "int"),
+    ("Товары с остатками, шт.", "items_in_stock", "int"),
+    ("% товаров с остатками", "pct_items_in_stock", "float"),
+    ("Товары с продажами, шт.", "items_with_sales", "int"),
+    ("% товаров с продажами", "pct_items_with_sales", "float"),
+    ("% товаров с продажами от товаров с движением", "pct_items_with_sales_moving", "float"),
+    ("Бренды", "brands", "int"),
+    ("Бренды с продажами", "brands_with_sales", "int"),
+    ("% брендов с продажами", "pct_brands_with_sales", "float"),
+    ("Продавцы", "sellers", "int"),
+    ("Продавцы с продажами", "sellers_with_sales", "int"),
+    ("% продавцов с продажами", "pct_sellers_with_sales", "float"),
+    ("Продажи, шт.", "sales", "int"),
+    ("Выручка, ₽", "revenue", "float"),
+    ("Упущенная выручка, ₽", "lost_revenue", "float"),
+    ("Упущенная выручка %", "pct_lost_revenue", "float"),
+    ("Потенциал, ₽", "potential", "float"),
+    ("Суммарные остатки, шт.", "stock", "int"),
+    ("Замороженный остаток, шт.", "frozen_stock", "int"),
+    ("Замороженный остаток в цене, ₽", "frozen_stock_value", "float"),
+    ("Замороженный остаток, %", "pct_frozen_stock", "float"),
+    ("Оборачиваемость, дн.", "turnover_days", "float"),
+    ("Минимальная цена, ₽", "price_min", "float"),
+    ("Максимальная цена, ₽", "price_max", "float"),
+    ("Средняя цена, ₽", "price_mean", "float"),
+    ("Медианная цена, ₽", "price_median", "float"),
+    ("Минимальная цена с продажами, ₽", "sales_price_min", "float"),
+    ("Максимальная цена с продажами, ₽", "sales_price_max", "float"),
+    ("Средняя цена с продажами, ₽", "sales_price_mean", "float"),
+    ("Медианная цена с продажами, ₽", "sales_price_median", "float"),
+    ("Средний рейтинг", "rating", "float"),
+    ("Средний рейтинг с продажами", "rating_with_sales", "float"),
+    ("Процент выкупа, %", "buyback_pct", "float"),
+]
+OPTIONAL = {"buyback_pct"}
+
+NULL_TOKENS = ["", "nan", "none", "null", "-", "—", "н/д"]
+THOUSANDS = [" ", "\xa0", "\u202f"]
+# Разделители тысяч убираются, десятичная запятая → точка — одной таблицей
+_NUMBER = str.maketrans({**{sep: None for sep in THOUSANDS}, ",": "."})
+
+
+def _to_float(values):
+    """Колонка строк → (float64, маска пропусков).
+
+    Вся колонка склеивается в одну строку и нормализуется одним
+    str.translate, пустые значения становятся «nan», затем строка
+    разбивается и переводится в числа на уровне C (np.fromiter + float).
+    Если в колонке есть нечисловой мусор («—», «н/д») — медленный путь
+    parse_number только для такой колонки.
+    """
+    n = len(values)
+    text = "\n".join(values).translate(_NUMBER)
+    # Пустые значения: в середине — «\n\n» (дважды: соседние пустые), по краям
+    text = text.replace("\n\n", "\nnan\n").replace("\n\n", "\nnan\n")
+    if text.startswith("\n") or not text:
+        text = "nan" + text
+    if text.endswith("\n"):
+        text += "nan"
+    parts = text.split("\n")
+    try:
+        if len(parts) != n:
+            raise ValueError("перевод строки внутри числа")
+        out = np.fromiter(map(float, parts), dtype=np.float64, count=n)
+    except ValueError:
+        out = np.fromiter(map(parse_number, values), dtype=np.float64, count=n)
+    return out, np.isnan(out)
+
+
+def _to_int(values):
+    out, null = _to_float(values)
+    return np.where(null, 0, np.rint(out)).astype(np.int64), null
+
+
+def _to_date(values):
+    """Колонка дат ГГГГ-ММ-ДД → (datetime64[D], маска пропусков)."""
+    try:
+        out = np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        out = np.array([_date_or_nat(v) for v in values], dtype="datetime64[D]")
+    return out, np.isnat(out)
+
+
+def _date_or_nat(text):
+    text = text.strip()
+    if text.lower() in NULL_TOKENS:
+        return np.datetime64("NaT", "D")
+    try:
+        return np.datetime64(text, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def _to_str(values):
+    arr = np.array(values, dtype=object)
+    return arr, arr == ""
+
+
+CONVERTERS = {"str": _to_str, "int": _to_int, "float": _to_float, "date": _to_date}
+
+
+def parse_number(text):
+    """Одно значение в русском формате → float (NaN — пропуск или не число)."""
+    text = text.strip().translate(_NUMBER)
+    if text.lower() in NULL_TOKENS:
+        return float("nan")
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
+
+
+def convert_columns(header, rows):
+    """Строки CSV (списки строк) → таблица по SCHEMA (см. описание модуля)."""
+    # BOM и лишние кавычки в первом заголовке (файлы, пересохранённые без utf-8-sig)
+    header = [h.strip().lstrip("\ufeff").strip('"') for h in header]
+    position = {name: i for i, name in enumerate(header)}
+    missing = [name for name, key, _ in SCHEMA if name not in position and key not in OPTIONAL]
+    if missing:
+        raise ValueError(f"в выгрузке нет колонок: {', '.join(missing)}")
+
+    width = len(header)
+    rows = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+    columns = list(zip(*rows)) if rows else [()] * width
+
+    table = {"n_rows": len(rows), "columns": [], "null": {}}
+    for name, key, kind in SCHEMA:
+        if name not in position:
+            continue
+        values, null = CONVERTERS[kind](columns[position[name]])
+        table[key] = values
+        table["null"][key] = null
+        table["columns"].append(key)
+    return table
+
+
+def read_niches(path, delimiter=";", encoding="utf-8-sig"):
+    """Прочитать выгрузку ниш в типизированную таблицу колонок."""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader)
+        return convert_columns(header, list(reader))
@@ -0,0 +1,202 @@
+"""
+Скоринг ниш Ozon: жёсткие фильтры, взвешенный балл по перцентильным рангам, топ-N.
+
+Использование (из корня репозитория):
+  python PRJ_ВЫБОР_НИШИ/score_niches.py
+  python PRJ_ВЫБОР_НИШИ/score_niches.py --filter "pct_items_with_sales>=5" --weight buyback_pct=0.3 --top 30
+  python PRJ_ВЫБОР_НИШИ/score_niches.py --interactive        # менять веса и сразу видеть новый топ
+  python PRJ_ВЫБОР_НИШИ/score_niches.py --pareto 3           # три первых Парето-фронта (niche_pareto.py)
+  python PRJ_ВЫБОР_НИШИ/score_niches.py --pareto --objectives "revenue+,sellers_with_sales-,buyback_pct+"
+
+Критерии и веса по умолчанию — niche_scoring.CRITERIA, фильтры —
+niche_scoring.DEFAULT_FILTERS (свои --filter заменяют фильтры по умолчанию).
+Ключи колонок для фильтров — niche_table.SCHEMA.
+
+Замер этапов (load, filter, rank, pareto; см. scripts/stageprof.py):
+  python PRJ_ВЫБОР_НИШИ/score_niches.py --pareto 3 --stages --profile pareto
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from niche_pareto import DEFAULT_OBJECTIVES, objective_matrix, parse_objectives, pareto_fronts
+from niche_scoring import (
+    CRITERIA, DEFAULT_FILTERS, DEFAULT_WEIGHTS, LABELS,
+    apply_filters, criteria_ranks, parse_filter, rank_niches,
+)
+from niche_table import read_niches
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "scripts"))
+import stageprof
+
+DEFAULT_DATA = os.path.join(SCRIPT_DIR, "OZON - выбор ниши - с выкупом.csv")
+
+
+def parse_weight(text):
+    """'buyback_pct=0.3' → ('buyback_pct', 0.3)."""
+    key, _, value = text.partition("=")
+    try:
+        return key.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"вес вида КРИТЕРИЙ=ЧИСЛО, получено: {text!r}")
+
+
+def check_filter(text):
+    try:
+        parse_filter(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+
+def check_objectives(text):
+    try:
+        return parse_objectives(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    criteria = ", ".join(f"{key} ({label})" for key, label, _, _ in CRITERIA)
+    parser = argparse.ArgumentParser(description="Скоринг и ранжирование ниш по выгрузке Ozon",
+                                     epilog=f"Критерии: {criteria}")
+    parser.add_argument("data_file", nargs="?", default=DEFAULT_DATA,
+                        help="CSV выгрузки ниш (по умолчанию — с процентом выкупа)")
+    parser.add_argument("--filter", dest="filters", type=check_filter, action="append",
+                        metavar="КЛЮЧ>=ЧИСЛО", help="Жёсткий фильтр (можно несколько раз)")
+    parser.add_argument("--weight", dest="weights", type=parse_weight, action="append", default=[],
+                        metavar="КРИТЕРИЙ=ВЕС", help="Вес критерия; 0 — не учитывать (можно несколько раз)")
+    parser.add_argument("--top", type=int, default=20, help="Сколько ниш показать")
+    parser.add_argument("--interactive", action="store_true",
+                        help="После первого топа читать новые веса из stdin и пересчитывать")
+    parser.add_argument("--pareto", type=int, nargs="?", const=1, default=0, metavar="K",
+                        help="Вместо одного топа — K первых Парето-фронтов (внутри фронта — по баллу)")
+    parser.add_argument("--objectives", type=check_objectives, default=DEFAULT_OBJECTIVES,
+                        metavar="КЛЮЧ+,КЛЮЧ-", help="Цели Парето: + максимизировать, - минимизировать")
+    stageprof.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def print_top(table, result):
+    print("=" * 130)
+    print(f"{'#':>3} {'Балл':>5} {'Выручка, ₽':>15} {'Продавцы':>8} {'Упущ. %':>7} "
+          f"{'Оборот, дн':>10} {'Выкуп %':>7}  Ниша")
+    print("=" * 130)
+    has_buyback = "buyback_pct" in table["columns"]
+    for rank, (i, score) in enumerate(zip(result["index"], result["score"]), 1):
+        name = table["name"][i]
+        short = name if len(name) <= 70 else name[:67] + "..."
+        buyback = f"{table['buyback_pct'][i]:>7.1f}" if has_buyback else f"{'—':>7}"
+        print(f"{rank:>3} {score:>5.1f} {table['revenue'][i]:>15,.0f} {table['sellers_with_sales'][i]:>8,} "
+              f"{table['pct_lost_revenue'][i]:>7.1f} {table['turnover_days'][i]:>10.1f} {buyback}  {short}")
+
+
+def print_weights(weights, keys):
+    total = sum(weights.get(k, 0) for k in keys) or 1
+    parts = [f"{k}={weights[k] / total:.2f}" for k in keys if weights.get(k)]
+    print("Веса: " + ", ".join(parts))
+
+
+def print_pareto(table, mask, ranks, weights, objectives, n_fronts, top):
+    """K первых Парето-фронтов; внутри фронта ниши по взвешенному баллу."""
+    points, index = objective_matrix(table, objectives, mask)
+    with stageprof.stage("pareto", rows=len(index)) as st:
+        front = pareto_fronts(points, max_fronts=n_fronts)
+    elapsed = st.wall
+
+    scored = rank_niches(ranks, weights, top=len(ranks["index"]))
+    order = np.empty(table["n_rows"], dtype=np.int64)
+    order[scored["index"]] = np.arange(len(scored["index"]))
+    score = np.zeros(table["n_rows"])
+    score[scored["index"]] = scored["score"]
+
+    goals = ", ".join(f"{k}{'↑' if d > 0 else '↓'}" for k, d in objectives)
+    print(f"Парето по целям: {goals} — {elapsed * 1e3:.0f} мс")
+    for f in range(n_fronts):
+        members = index[front == f]
+        if len(members) == 0:
+            break
+        members = members[np.argsort(order[members])]
+        print(f"\nФронт {f + 1}: {len(members):,} ниш" + (f", показаны {top} по баллу" if len(members) > top else ""))
+        members = members[:top]
+        print_top(table, {"index": members, "score": score[members]})
+
+
+def interactive(table, ranks, weights, top):
+    """Цикл: строка «критерий=вес ...» → новый топ; пустая строка — выход."""
+    print(f"\nКритерии: {', '.join(ranks['keys'])}. Введите веса (например, buyback_pct=0.4 revenue=0), "
+          f"пустая строка — выход.")
+    while True:
+        try:
+            line = input("веса> ").strip()
+        except EOFError:
+            break
+        if not line:
+            break
+        try:
+            new = dict(parse_weight(part) for part in line.split())
+            candidate = {**weights, **new}
+            t0 = time.perf_counter()
+            result = rank_niches(ranks, candidate, top)
+            elapsed = time.perf_counter() - t0
+        except (argparse.ArgumentTypeError, ValueError) as e:
+            print(f"Ошибка: {e}")
+            continue
+        weights = candidate
+        print_weights(weights, ranks["keys"])
+        print(f"Пересчёт: {elapsed * 1e3:.2f} мс")
+        print_top(table, result)
+
+
+def main():
+    args = parse_args()
+    stageprof.configure_from_args(args)
+    if not os.path.exists(args.data_file):
+        print(f"Файл не найден: {args.data_file}")
+        sys.exit(1)
+
+    with stageprof.stage("load") as st:
+        table = read_niches(args.data_file)
+        st.rows = table["n_rows"]
+    filters = args.filters or DEFAULT_FILTERS
+    weights = {**DEFAULT_WEIGHTS, **dict(args.weights)}
+
+    try:
+        with stageprof.stage("filter", rows=table["n_rows"]):
+            mask = apply_filters(table, filters)
+        with stageprof.stage("rank", rows=int(mask.sum())):
+            ranks = criteria_ranks(table, mask, keys=list(weights))
+            result = rank_niches(ranks, weights, args.top)
+    except (KeyError, ValueError) as e:
+        print(f"Ошибка: {e.args[0]}")
+        sys.exit(1)
+
+    print(f"Источник данных: {args.data_file}")
+    print(f"Ниш: {table['n_rows']:,}, после фильтров: {int(mask.sum()):,} ({'; '.join(filters)})")
+    missing = [LABELS[k] for k in DEFAULT_WEIGHTS if k not in ranks["keys"]]
+    if missing:
+        print(f"Нет в выгрузке, не учитываются: {', '.join(missing)}")
+    print_weights(weights, ranks["keys"])
+    if args.pareto:
+        objectives = [(k, d) for k, d in args.objectives if k in table["columns"] or k == "revenue_per_seller"]
+        skipped = [k for k, _ in args.objectives if (k, _) not in objectives]
+        if skipped:
+            print(f"Целей нет в выгрузке, не учитываются: {', '.join(skipped)}")
+        if not objectives:
+            print("Ошибка: не осталось ни одной цели для Парето")
+            sys.exit(1)
+        print_pareto(table, mask, ranks, weights, objectives, args.pareto, args.top)
+    else:
+        print_top(table, result)
+
+    if args.interactive:
+        interactive(table, ranks, weights, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Дерево категорий: ставка пути — правило самого глубокого сегмента, у
+которого оно есть, иначе ближайшего предка. На путях, где разделы
+пересекаются («Одежда для собак», «Наушники меховые»), ставка должна быть
+ставкой раздела, а не первого по списку правила, как у прежнего цикла
+(get_buyback_rate_linear).
+
+Запуск (из корня репозитория):
+    python -m pytest PRJ_ВЫБОР_НИШИ/test_category_trie.py -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE))
+
+from add_buyback_rate import BUYBACK_RULES, DEFAULT_RATE, get_buyback_rate_linear  # noqa: E402
+from category_trie import CategoryTrie  # noqa: E402
+from niche_pipeline import read_column  # noqa: E402
+
+PATHS = read_column(str(HERE / "OZON - выбор ниши - 12.02.2026.csv"), 0)
+
+
+@pytest.fixture(scope="module")
+def trie():
+    return CategoryTrie(BUYBACK_RULES, default=DEFAULT_RATE)
+
+
+@pytest.mark.parametrize("path, rate, linear", [
+    # однословный ключ раздела не ловит чужие ветки
+    ("Товары для животных / Товары для собак / Одежда для собак", 92, 42),
+    ("Туризм, рыбалка, охота / Рыбалка / Одежда для рыбалки и охоты / Костюмы", 83, 42),
+    ("Спорт и отдых / Виды спорта / Конный спорт / Одежда для конного спорта", 78, 42),
+    ("Аксессуары / Женские аксессуары / Головные уборы женские / Наушники меховые женские", 68, 85),
+    ("Туризм, рыбалка, охота / Товары для охоты / Спортивная стрельба / Наушники для стрельбы", 83, 85),
+    ("Аптека / Одежда и текстиль медицинские / Взрослая адаптивная одежда", 92, 42),
+])
+def test_collision_paths_get_their_section_rate(trie, path, rate, linear):
+    assert get_buyback_rate_linear(path) == linear
+    assert trie.rate(path) == rate
+
+
+@pytest.mark.parametrize("path, rate", [
+    ("Одежда / Детская одежда / Одежда для девочек / Платья", 45),
+    ("Электроника / Наушники и аудиотехника / Наушники", 85),
+    ("Красота и здоровье / Маникюр и педикюр / Инструменты для маникюра", 85),
+    # сегмент без правила наследует ставку ближайшего предка
+    ("Электроника / Аксессуары для электроники / Батарейки", 88),
+    ("Товары для животных / Товары для собак / Совсем новая подкатегория", 92),
+    ("Несуществующая категория / Совсем новая", DEFAULT_RATE),
+])
+def test_deepest_rule_and_ancestor_fallback(trie, path, rate):
+    assert trie.rate(path) == rate
+
+
+def test_segment_rule_is_exact_name_or_phrase(trie):
+    assert trie.segment_rate("Одежда") == 42
+    assert trie.segment_rate("Одежда для собак") is None
+    assert trie.segment_rate("Платья и сарафаны") is not None
+
+
+def test_every_export_path_has_a_rate(trie):
+    """Все пути выгрузки разбираются; ставка — одна из ставок правил или default."""
+    rates = {rate for _, rate in BUYBACK_RULES} | {DEFAULT_RATE}
+    assert all(trie.rate(p) in rates for p in PATHS)
+    assert len(trie) >= len(set(PATHS))
+
+
+def test_keyword_that_could_span_separator_is_rejected():
+    with pytest.raises(ValueError):
+        CategoryTrie([("Одежда / Женская", 40)])
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""Бенчмарк аналитических пайплайнов на синтетических данных.
+
+Использование:
+    uv run --with openpyxl --with matplotlib --with numpy --with httpx scripts/bench.py
+    uv run ... scripts/bench.py --scales 1,100 --pipelines elasticity,abcdx -o bench.json
+    uv run ... scripts/bench.py --scales 10000 --pipelines abcdx,elasticity   # 12 млн строк
+    uv run ... scripts/bench.py --compare old.json new.json --threshold 0.10
+
+Данные — синтетический корпус с фиксированным seed в формате генераторов
+PRJ_MARKETPLACE (листы «Каталог», «Продажи», «Трафик и реклама»). Масштаб 1×
+— как исходный корпус: 50 SKU × 2 площадки × 12 недель = 1 200 строк;
+N× — в N раз больше SKU (и строк).
+
+Пайплайны и этапы:
+  elasticity — PRJ_PRICING/pricing: load (load_data + load_panel), aggregate
+               (уровни цены), classify (arc-эластичность и тип спроса),
+               fit (log-log OLS), render (графики 01–05)
+  abcdx      — PRJ_MARKETPLACE/abcdx_classifier: load, aggregate (маржа
+               последнего месяца по SKU), classify (ABCDX по категориям), export
+  funnel     — PRJ_MARKETPLACE/funnel_analysis.py целиком, отдельным процессом;
+               его этапы (load, aggregate, ..., render) — из JSON
+               scripts/stageprof.py, в итог не суммируются (входят в total)
+  mpstats    — MPStatsClient через поддельный транспорт (httpx.MockTransport,
+               без сети): fetch (товары и листинг категории), parse (модели)
+
+Каждый пайплайн × масштаб выполняется в отдельном процессе: пиковая память
+(ru_maxrss) не смешивается между прогонами. Для этапа записываются wall и CPU
+время, пиковая память процесса на конец этапа и число строк. Этапы,
+невозможные на масштабе, помечаются skipped с причиной: xlsx вмещает не
+больше 1 048 575 строк данных, графики строятся до RENDER_MAX_SKUS SKU.
+Подготовка входных файлов (setup) в итоговое время не входит.
+
+Результат — JSON (-o); --compare сравнивает два прогона и помечает
+регрессии: время этапа выросло больше чем на --threshold (и больше чем на
+--min-delta секунд) или пиковая память — больше чем на --threshold.
+Код выхода 1 при регрессиях.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FUNNEL_SCRIPT = REPO_ROOT / "PRJ_MARKETPLACE" / "funnel_analysis.py"
+
+PIPELINES = ["elasticity", "abcdx", "funnel", "mpstats"]
+DEFAULT_SCALES = [1, 100]
+SEED = 42
+
+BASE_SKUS = 50
+WEEKS = [datetime(2025, 11, 17) + timedelta(weeks=i) for i in range(12)]
+LAST_MONTH_WEEKS = 4               # ABCDX: маржа за последние 4 недели
+NOVELTY_WEEK = 4                   # первая продажа с 5-й недели — новинка
+PLATFORMS = ["WB", "Ozon"]
+CATEGORIES = ["Подушки", "Одеяла", "Постельное бельё", "Наматрасники", "Пледы", "Детский сон", "Аксессуары"]
+COMMISSION = {"WB": 0.15, "Ozon": 0.12}
+PRICE_STEPS = [1.0, 1.0, 1.0, 0.9, 0.85, 1.1]   # акции и повышения цены по неделям
+
+XLSX_MAX_ROWS = 1_048_575
+RENDER_MAX_SKUS = 500
+
+
+# ── Синтетические данные ───────────────────────────────────────────
+
+
+def synthetic_sales(scale, seed=SEED):
+    """Колоночный корпус продаж: 50·scale SKU × 2 площадки × 12 недель.
+
+    Возвращает dict колонок: по SKU — skus, names, categories, cost, weight;
+    по строкам продаж (порядок неделя → SKU → площадка, как у генераторов) —
+    week_idx, sku_idx, platform_idx, qty, price, revenue и юнит-экономика.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n_skus, n_weeks, n_plat = BASE_SKUS * scale, len(WEEKS), len(PLATFORMS)
+    skus = np.arange(1, n_skus + 1)
+    cat_idx = rng.integers(0, len(CATEGORIES), n_skus)
+    cost = np.round(rng.uniform(150, 1200, n_skus), -1)
+    weight = np.round(rng.uniform(0.2, 3.0, n_skus), 1)
+    markup = rng.uniform(2.5, 3.5, (n_skus, n_plat))
+    base_price = np.round(cost[:, None] * markup, -1) - 10
+    base_volume = rng.gamma(2.0, 15.0, (n_skus, n_plat)) * np.array([1.0, 0.6])
+    elasticity = rng.uniform(-3.0, -0.3, n_skus)
+    season = 1 + 0.4 * np.sin(np.linspace(0, np.pi, n_weeks))
+    first_week = np.where(rng.random(n_skus) < 0.1, rng.integers(NOVELTY_WEEK, n_weeks, n_skus), 0)
+
+    shape = (n_weeks, n_skus, n_plat)
+    step = np.asarray(PRICE_STEPS)[rng.integers(0, len(PRICE_STEPS), shape)]
+    price = np.round(base_price[None] * step, -1) - 10
+    mean_qty = base_volume[None] * season[:, None, None] * step ** elasticity[None, :, None]
+    qty = rng.poisson(mean_qty)
+    qty[(rng.random(shape) < 0.03) | (np.arange(n_weeks)[:, None, None] < first_week[None, :, None])] = 0
+
+    week_idx, sku_idx, plat_idx = (a.reshape(-1) for a in np.indices(shape, dtype=np.int32))
+    qty = qty.reshape(-1).astype(np.int64)
+    price = price.reshape(-1)
+    revenue = qty * price
+    return {
+        "skus": skus,
+        "names": [f"Товар {i} {CATEGORIES[c].lower()}" for i, c in zip(skus.tolist(), cat_idx.tolist())],
+        "categories": [CATEGORIES[c] for c in cat_idx.tolist()],
+        "cost": cost,
+        "weight": weight,
+        "week_idx": week_idx,
+        "sku_idx": sku_idx,
+        "platform_idx": plat_idx,
+        "qty": qty,
+        "price": price,
+        "revenue": revenue,
+        "commission": np.asarray([COMMISSION[p] for p in PLATFORMS])[plat_idx],
+        "logistics": np.round(qty * (40 + 25 * weight[sku_idx]), 0),
+        "storage": np.round(weight[sku_idx] * rng.uniform(5, 20, len(qty)), 0),
+        "ad_spend": np.round(revenue * rng.uniform(0.02, 0.15, len(qty)), 0),
+        "seed": seed,
+    }
+
+
+def synthetic_traffic(data):
+    """Колонки листа «Трафик и реклама» к тем же строкам: воронка от заказов назад."""
+    import numpy as np
+
+    rng = np.random.default_rng(data["seed"] + 1)
+    n = len(data["qty"])
+    orders = data["qty"]
+    atc = np.ceil(orders / rng.uniform(0.25, 0.5, n)).astype(np.int64)
+    clicks = np.ceil(np.maximum(atc, 1) / rng.uniform(0.05, 0.15, n)).astype(np.int64)
+    impr = np.ceil(clicks / rng.uniform(0.01, 0.05, n)).astype(np.int64)
+    ad_share = rng.uniform(0.2, 0.6, n)
+    return {
+        "impr_total": impr,
+        "impr_ad": np.round(impr * ad_share).astype(np.int64),
+        "clicks_total": clicks,
+        "clicks_ad": np.round(clicks * ad_share).astype(np.int64),
+        "atc": atc,
+        "orders_ad": np.round(orders * ad_share * 0.8).astype(np.int64),
+    }
+
+
+def _safe_div(a, b):
+    return a / b if b else 0
+
+
+def write_sales_xlsx(data, path):
+    """Листы «Каталог» и «Продажи» (значения вместо формул) — write-only."""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Каталог")
+    ws.append(["SKU", "Название", "Категория", "Себестоимость, ₽", "Цена WB, ₽", "Цена Ozon, ₽", "Вес, кг"])
+    for sku, name, cat, cost, weight in zip(data["skus"].tolist(), data["names"], data["categories"],
+                                            data["cost"].tolist(), data["weight"].tolist()):
+        ws.append([sku, name, cat, cost, round(cost * 3), round(cost * 3.1), weight])
+
+    ws = wb.create_sheet("Продажи")
+    ws.append(["Неделя", "SKU", "Название", "Категория", "Площадка", "Продажи, шт", "Цена, ₽", "Выручка, ₽",
+               "Себест. ед., ₽", "Себест. итого, ₽", "Комиссия МП, %", "Комиссия МП, ₽", "Логистика, ₽",
+               "Хранение, ₽", "Реклама, ₽", "Прибыль, ₽", "Маржа, %"])
+    cost, names, cats = data["cost"].tolist(), data["names"], data["categories"]
+    columns = [data[k].tolist() for k in ("week_idx", "sku_idx", "platform_idx", "qty", "price", "commission",
+                                          "logistics", "storage", "ad_spend")]
+    for w, s, p, qty, price, comm, logistics, storage, ad in zip(*columns):
+        revenue, cogs = qty * price, qty * cost[s]
+        profit = revenue - cogs - revenue * comm - logistics - storage - ad
+        ws.append([WEEKS[w], s + 1, names[s], cats[s], PLATFORMS[p], qty, price, revenue, cost[s], cogs,
+                   comm, revenue * comm, logistics, storage, ad, profit, _safe_div(profit, revenue)])
+    wb.save(path)
+
+
+def write_ads_xlsx(data, path):
+    """Лист «Трафик и реклама» (25 колонок, как в ads_data_v2.0.xlsx) — write-only."""
+    import openpyxl
+
+    traffic = synthetic_traffic(data)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Трафик и реклама")
+    ws.append(["Неделя", "SKU", "Название", "Категория", "Площадка", "Показы (всего)", "Показы (реклама)",
+               "Доля рекл. показов, %", "Клики (всего)", "Клики (реклама)", "CTR общий, %", "CTR реклама, %",
+               "Добавления в корзину", "CR клик→корзина, %", "Заказы (всего)", "Заказы (с рекламы)",
+               "CR клик→заказ, %", "Доля рекл. заказов, %", "Цена, ₽", "Выручка, ₽", "Расход на рекламу, ₽",
+               "CPC, ₽", "CPO, ₽", "ДРР, %", "ROAS"])
+    names, cats = data["names"], data["categories"]
+    columns = [data[k].tolist() for k in ("week_idx", "sku_idx", "platform_idx", "qty", "price", "ad_spend")]
+    columns += [traffic[k].tolist() for k in ("impr_total", "impr_ad", "clicks_total", "clicks_ad", "atc",
+                                              "orders_ad")]
+    for w, s, p, orders, price, ad, impr, impr_ad, clicks, clicks_ad, atc, orders_ad in zip(*columns):
+        revenue = orders * price
+        ws.append([WEEKS[w], s + 1, names[s], cats[s], PLATFORMS[p], impr, impr_ad, _safe_div(impr_ad, impr),
+                   clicks, clicks_ad, _safe_div(clicks, impr), _safe_div(clicks_ad, impr_ad), atc,
+                   _safe_div(atc, clicks), orders, orders_ad, _safe_div(orders, clicks),
+                   _safe_div(orders_ad, orders), price, revenue, ad, _safe_div(ad, clicks_ad),
+                   _safe_div(ad, orders_ad), _safe_div(ad, revenue), _safe_div(revenue, ad)])
+    wb.save(path)
+
+
+def panel_from_memory(data):
+    """Панель в формате pricing.load_panel без xlsx (масштабы больше листа Excel)."""
+    import numpy as np
+
+    sold = (data["qty"] > 0) & (data["price"] > 0)
+    sku_idx = data["sku_idx"][sold]
+    return {
+        "skus": data["skus"],
+        "names": data["names"],
+        "categories": data["categories"],
+        "platforms": list(PLATFORMS),
+        "weeks": list(WEEKS),
+        "sku_idx": sku_idx.astype(np.int64),
+        "platform_idx": data["platform_idx"][sold].astype(np.int64),
+        "week_idx": data["week_idx"][sold].astype(np.int64),
+        "price": data["price"][sold],
+        "qty": data["qty"][sold].astype(np.float64),
+        "unit_cost": data["cost"][sku_idx],
+        "commission": data["commission"][sold],
+        "logistics": data["logistics"][sold],
+        "ad_spend": data["ad_spend"][sold],
+    }
+
+
+# ── Замер этапов ───────────────────────────────────────────────────
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Пиковая память процесса (или завершившихся потомков), МБ."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10   # macOS — байты, Linux — КБ
+
+
+class Run:
+    """Замеры одного прогона: пайплайн × масштаб."""
+
+    def __init__(self, pipeline, scale, seed, workdir):
+        self.pipeline = pipeline
+        self.scale = scale
+        self.seed = seed
+        self.workdir = Path(workdir)
+        self.rows = BASE_SKUS * scale * len(PLATFORMS) * len(WEEKS)
+        self.stages = []
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, setup=False, rss=resource.RUSAGE_SELF):
+        """Замерить этап; вывод print внутри этапа подавляется."""
+        record = {"stage": name, "rows": self.rows if rows is None else rows}
+        if setup:
+            record["setup"] = True
+        wall, cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield record
+        record["wall"] = time.perf_counter() - wall
+        record["cpu"] = time.process_time() - cpu
+        record["peak_rss_mb"] = peak_rss_mb(rss)
+        self.stages.append(record)
+
+    def inner_stages(self, path, before):
+        """Этапы дочернего скрипта (scripts/stageprof.py, JSON) — перед его итоговым этапом."""
+        if not Path(path).exists():
+            return
+        inner = []
+        for st in json.loads(Path(path).read_text(encoding="utf-8"))["stages"]:
+            if st["depth"] == 0:
+                inner.append({"stage": st["stage"], "rows": st.get("rows") or 0, "inner": True,
+                              "wall": st["wall"], "cpu": st["cpu"], "peak_rss_mb": st["peak_rss_mb"]})
+        i = self.stages.index(before)
+        self.stages[i:i] = inner
+
+    def skip(self, name, reason):
+        self.stages.append({"stage": name, "skipped": reason})
+
+    def fits_xlsx(self):
+        return self.rows <= XLSX_MAX_ROWS
+
+    def result(self):
+        timed = [s for s in self.stages if "wall" in s and not s.get("setup") and not s.get("inner")]
+        return {
+            "pipeline": self.pipeline,
+            "scale": self.scale,
+            "rows": self.rows,
+            "stages": self.stages,
+            "total_wall": sum(s["wall"] for s in timed),
+            "total_cpu": sum(s["cpu"] for s in timed),
+            "peak_rss_mb": max([peak_rss_mb()] + [s.get("peak_rss_mb", 0) for s in self.stages]),
+        }
+
+
+# ── Пайплайны ──────────────────────────────────────────────────────
+
+
+def bench_elasticity(run):
+    sys.path.insert(0, str(REPO_ROOT / "PRJ_PRICING"))
+    from pricing import load_data, load_panel, price_levels, calc_elasticity_levels
+    from pricing.ols import fit_loglog
+
+    with run.stage("generate", setup=True):
+        data = synthetic_sales(run.scale, run.seed)
+
+    if run.fits_xlsx():
+        path = run.workdir / f"sales_x{run.scale}.xlsx"
+        with run.stage("prepare", setup=True):
+            write_sales_xlsx(data, path)
+        with run.stage("load"):
+            sku_price_qty, sku_platform_data, costs = load_data(path)
+            panel = load_panel(path)
+        with run.stage("aggregate"):
+            levels = price_levels(sku_price_qty)
+        with run.stage("classify", rows=len(levels)):
+            results = calc_elasticity_levels(levels, costs)
+    else:
+        reason = f"{run.rows:,} строк > лимита листа xlsx"
+        for name in ("load", "aggregate", "classify"):
+            run.skip(name, reason)
+        panel = panel_from_memory(data)
+    del data
+
+    with run.stage("fit", rows=len(panel["qty"])):
+        fit_loglog(panel)
+
+    if not run.fits_xlsx():
+        run.skip("render", "нет результатов classify")
+    elif len(results) > RENDER_MAX_SKUS:
+        run.skip("render", f"{len(results):,} SKU > {RENDER_MAX_SKUS} (графики по SKU нечитаемы)")
+    else:
+        from pricing.plotting import plot_all
+        with run.stage("render", rows=len(results)):
+            plot_all(results, sku_price_qty, sku_platform_data, run.workdir / "elasticity_png")
+
+
+def bench_abcdx(run):
+    import numpy as np
+
+    sys.path.insert(0, str(REPO_ROOT / "PRJ_MARKETPLACE"))
+    sys.path.insert(0, str(REPO_ROOT / "PRJ_PRICING"))
+    from abcdx_classifier import classify_abcdx
+    from pricing import load_panel
+
+    with run.stage("generate", setup=True):
+        data = synthetic_sales(run.scale, run.seed)
+
+    if run.fits_xlsx():
+        path = run.workdir / f"sales_x{run.scale}.xlsx"
+        with run.stage("prepare", setup=True):
+            write_sales_xlsx(data, path)
+        with run.stage("load"):
+            panel = load_panel(path)
+    else:
+        run.skip("load", f"{run.rows:,} строк > лимита листа xlsx")
+        panel = panel_from_memory(data)
+    del data
+
+    n_skus = len(panel["skus"])
+    with run.stage("aggregate", rows=len(panel["qty"])):
+        last = panel["week_idx"] >= len(panel["weeks"]) - LAST_MONTH_WEEKS
+        revenue = panel["price"] * panel["qty"]
+        profit = (revenue * (1 - panel["commission"]) - panel["qty"] * panel["unit_cost"]
+                  - panel["logistics"] - panel["ad_spend"])
+        margin = np.bincount(panel["sku_idx"][last], profit[last], minlength=n_skus)
+        sku_revenue = np.bincount(panel["sku_idx"][last], revenue[last], minlength=n_skus)
+        marginality = np.divide(margin * 100, sku_revenue, out=np.zeros(n_skus), where=sku_revenue > 0)
+        first_week = np.full(n_skus, len(panel["weeks"]))
+        np.minimum.at(first_week, panel["sku_idx"], panel["week_idx"])
+        is_novelty = first_week >= NOVELTY_WEEK
+
+    with run.stage("classify", rows=n_skus):
+        classes, _ = classify_abcdx(margin, marginality, is_novelty, groups=panel["categories"])
+
+    if n_skus > XLSX_MAX_ROWS:
+        run.skip("export", f"{n_skus:,} SKU > лимита листа xlsx")
+        return
+    import openpyxl
+    with run.stage("export", rows=n_skus):
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("ABCDX")
+        ws.append(["SKU", "Категория", "Маржа, ₽", "Маржинальность, %", "Класс"])
+        for row in zip(panel["skus"].tolist(), panel["categories"], margin.round(2).tolist(),
+                       marginality.round(1).tolist(), classes.tolist()):
+            ws.append(list(row))
+        wb.save(run.workdir / f"abcdx_x{run.scale}.xlsx")
+
+
+def bench_funnel(run):
+    if not run.fits_xlsx():
+        run.skip("total", f"{run.rows:,} строк > лимита листа xlsx")
+        return
+    with run.stage("generate", setup=True):
+        data = synthetic_sales(run.scale, run.seed)
+    sales, ads = run.workdir / f"sales_x{run.scale}.xlsx", run.workdir / f"ads_x{run.scale}.xlsx"
+    with run.stage("prepare", setup=True):
+        write_sales_xlsx(data, sales)
+        write_ads_xlsx(data, ads)
+    del data
+
+    cmd = [sys.executable, str(FUNNEL_SCRIPT), "--ads", str(ads), "--sales", str(sales),
+           "--output-dir", str(run.workdir / "funnel_output")]
+    stages_json = run.workdir / f"funnel_stages_x{run.scale}.json"
+    env = {**os.environ, "STAGEPROF_JSON": str(stages_json)}
+    with run.stage("total", rss=resource.RUSAGE_CHILDREN) as record:
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        record["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"код {proc.returncode}"
+    record["cpu"] = _children_cpu()
+    run.inner_stages(stages_json, before=record)
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def fake_mpstats_transport(seed=SEED, n_products=5000, latency=0.0):
+    """httpx.MockTransport с детерминированными ответами MPStats (товар, динамика, листинг категории)."""
+    import httpx
+
+    def item(item_id):
+        rng = random.Random(seed * 1_000_003 + item_id)
+        price = rng.randrange(300, 5000, 10)
+        return {"item": {
+            "id": item_id, "name": f"Товар {item_id}", "brand": f"Бренд {item_id % 97}",
+            "seller": f"Продавец {item_id % 211}", "seller_id": item_id % 211,
+            "category": rng.choice(CATEGORIES), "price": price, "final_price": round(price * 0.8),
+            "rating": rng.randint(380, 500), "comments": rng.randint(0, 5000), "balance": rng.randint(0, 900),
+            "discount": 20, "delivery_scheme": "FBO",
+        }}
+
+    def by_date(item_id):
+        rng = random.Random(seed * 7919 + item_id)
+        return [{"date": f"2026-01-{d:02d}", "sales": rng.randint(0, 40), "balance": rng.randint(0, 900),
+                 "final_price": rng.randrange(300, 5000, 10)} for d in range(1, 31)]
+
+    def listing(start, end):
+        return {"data": [{"id": i, "name": f"Товар {i}", "brand": f"Бренд {i % 97}", "seller": f"Продавец {i % 211}",
+                          "supplier_id": i % 211, "category": CATEGORIES[i % len(CATEGORIES)],
+                          "final_price": 300 + i % 4700, "sales": (i * 37) % 900, "revenue": (i * 37) % 900 * 990.0,
+                          "comments": i % 3000, "rating": 4.0 + i % 10 / 10, "category_position": i}
+                         for i in range(start, min(end, n_products))],
+                "total": n_products}
+
+    def handler(request):
+        if latency:
+            time.sleep(latency)
+        parts = request.url.path.strip("/").split("/")[1:]          # без префикса /api
+        if parts[1:3] == ["get", "item"]:
+            item_id = int(parts[3])
+            return httpx.Response(200, json=by_date(item_id) if parts[-1] == "by_date" else item(item_id))
+        if parts[1:3] == ["get", "category"] and request.method == "POST":
+            body = json.loads(request.content)
+            return httpx.Response(200, json=listing(body["startRow"], body["endRow"]))
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+def bench_mpstats(run, latency=0.0):
+    sys.path.insert(0, str(REPO_ROOT / "PRJ_ANALYTICS" / "mpstats"))
+    from client import MPStatsClient
+    from models import CategoryProduct, ItemSummary
+
+    n_items = BASE_SKUS * run.scale
+    n_products = 100 * run.scale
+    transport = fake_mpstats_transport(run.seed, n_products, latency)
+    with MPStatsClient(api_key="bench", transport=transport) as client:
+        with run.stage("fetch", rows=2 * n_items + n_products) as record:
+            items = [client.get_item(i) for i in range(1, n_items + 1)]
+            series = [client.get_item_by_date(i, "2026-01-01", "2026-01-30") for i in range(1, n_items + 1)]
+            listing = []
+            for start in range(0, n_products, 5000):
+                page = client.get_category_products("Дом/Спальня", "2026-01-01", "2026-01-30",
+                                                    start_row=start, end_row=start + 5000)
+                listing.extend(page["data"])
+            record["requests"] = 2 * n_items + -(-n_products // 5000)
+        with run.stage("parse", rows=len(items) + len(listing)):
+            parsed = [ItemSummary.from_api(raw) for raw in items]
+            products = [CategoryProduct.from_api(raw) for raw in listing]
+            sales = sum(day["sales"] for s in series for day in s)
+    assert len(parsed) == n_items and len(products) == n_products and sales >= 0
+
+
+BENCHES = {"elasticity": bench_elasticity, "abcdx": bench_abcdx, "funnel": bench_funnel, "mpstats": bench_mpstats}
+
+
+# ── Запуск, сводка, сравнение ──────────────────────────────────────
+
+
+def run_child(pipeline, scale, seed, workdir, latency):
+    """Один прогон в этом процессе; результат — JSON в stdout."""
+    run = Run(pipeline, scale, seed, workdir)
+    if pipeline == "mpstats":
+        bench_mpstats(run, latency)
+    else:
+        BENCHES[pipeline](run)
+    print(json.dumps(run.result(), ensure_ascii=False))
+
+
+def run_isolated(pipeline, scale, seed, latency, repeat):
+    """repeat прогонов в отдельных процессах; по этапам — минимум времени, максимум памяти."""
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            cmd = [sys.executable, __file__, "--child", pipeline, str(scale), "--seed", str(seed),
+                   "--workdir", workdir, "--latency-ms", str(latency * 1000)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            tail = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"код {proc.returncode}"
+            return {"pipeline": pipeline, "scale": scale, "error": tail, "stages": []}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        best = result if best is None else _merge(best, result)
+    return best
+
+
+def _merge(a, b):
+    by_name = {s["stage"]: s for s in b["stages"]}
+    for s in a["stages"]:
+        other = by_name.get(s["stage"], {})
+        if "wall" in s and "wall" in other:
+            s["wall"] = min(s["wall"], other["wall"])
+            s["cpu"] = min(s["cpu"], other["cpu"])
+            s["peak_rss_mb"] = max(s["peak_rss_mb"], other["peak_rss_mb"])
+    a["total_wall"] = min(a["total_wall"], b["total_wall"])
+    a["total_cpu"] = min(a["total_cpu"], b["total_cpu"])
+    a["peak_rss_mb"] = max(a["peak_rss_mb"], b["peak_rss_mb"])
+    return a
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_run(result):
+    title = f"{result['pipeline']} ×{result['scale']}"
+    if result.get("error"):
+        print(f"{title}: ОШИБКА — {result['error']}")
+        return
+    print(f"{title} — {result['rows']:,} строк, {result['total_wall']:.2f} с, "
+          f"пик памяти {result['peak_rss_mb']:.0f} МБ")
+    for s in result["stages"]:
+        if "skipped" in s:
+            print(f"    {s['stage']:<16} пропущен: {s['skipped']}")
+            continue
+        note = " (подготовка)" if s.get("setup") else " (внутри total)" if s.get("inner") else ""
+        error = f"  ОШИБКА: {s['error']}" if s.get("error") else ""
+        print(f"    {s['stage']:<16} {s['wall']:>8.3f} с  CPU {s['cpu']:>8.3f} с  "
+              f"{s['peak_rss_mb']:>7.0f} МБ  {s['rows']:>12,} строк{note}{error}")
+
+
+def compare(old, new, threshold=0.10, min_delta=0.01):
+    """Сравнить два прогона; возвращает список регрессий (строк описания)."""
+    def stages(report):
+        out = {}
+        for r in report["runs"]:
+            for s in r["stages"]:
+                if "wall" in s and not s.get("setup") and not s.get("error"):
+                    out[(r["pipeline"], r["scale"], s["stage"])] = s
+            if "peak_rss_mb" in r:
+                out[(r["pipeline"], r["scale"], "*")] = {"peak_rss_mb": r["peak_rss_mb"]}
+        return out
+
+    before, after = stages(old), stages(new)
+    regressions = []
+    print(f"{'пайплайн':<12}{'×':>7}  {'этап':<16}{'было, с':>10}{'стало, с':>10}{'Δ':>9}")
+    for key in sorted(before.keys() & after.keys(), key=str):
+        pipeline, scale, stage = key
+        a, b = before[key], after[key]
+        if stage == "*":
+            ratio = b["peak_rss_mb"] / a["peak_rss_mb"] if a["peak_rss_mb"] else 1
+            if ratio > 1 + threshold and b["peak_rss_mb"] - a["peak_rss_mb"] > 5:
+                regressions.append(f"{pipeline} ×{scale}: пик памяти {a['peak_rss_mb']:.0f} → "
+                                   f"{b['peak_rss_mb']:.0f} МБ ({ratio - 1:+.0%})")
+            continue
+        ratio = b["wall"] / a["wall"] if a["wall"] else 1
+        slower = ratio > 1 + threshold and b["wall"] - a["wall"] > min_delta
+        mark = "  ← регрессия" if slower else ""
+        print(f"{pipeline:<12}{scale:>7}  {stage:<16}{a['wall']:>10.3f}{b['wall']:>10.3f}{ratio - 1:>+9.0%}{mark}")
+        if slower:
+            regressions.append(f"{pipeline} ×{scale} {stage}: {a['wall']:.3f} → {b['wall']:.3f} с ({ratio - 1:+.0%})")
+    only = (before.keys() ^ after.keys())
+    if only:
+        print(f"\nЕсть только в одном из прогонов: {len(only)} этапов")
+    return regressions
+
+
+def _int_list(text):
+    try:
+        values = [int(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидаются целые через запятую, получено: {text!r}")
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError("масштабы — целые ≥ 1")
+    return values
+
+
+def _pipelines(text):
+    names = [v.strip() for v in text.split(",") if v.strip()]
+    unknown = [n for n in names if n not in PIPELINES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"неизвестные пайплайны: {', '.join(unknown)} (есть: {', '.join(PIPELINES)})")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк аналитических пайплайнов на синтетических данных")
+    parser.add_argument("--scales", type=_int_list, default=DEFAULT_SCALES,
+                        help="Масштабы корпуса через запятую, 1 = 1 200 строк (по умолчанию 1,100)")
+    parser.add_argument("--pipelines", type=_pipelines, default=PIPELINES,
+                        help=f"Пайплайны через запятую (по умолчанию все: {','.join(PIPELINES)})")
+    parser.add_argument("--repeat", type=int, default=1, help="Повторов на прогон, берётся лучшее время")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Seed синтетических данных (по умолчанию {SEED})")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="mpstats: задержка поддельного транспорта на запрос, мс")
+    parser.add_argument("-o", "--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Сравнить два JSON-прогона")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Порог регрессии, доля (по умолчанию 0.10 = +10%%)")
+    parser.add_argument("--min-delta", type=float, default=0.01,
+                        help="Игнорировать замедления меньше N секунд (по умолчанию 0.01)")
+    parser.add_argument("--child", nargs=2, metavar=("PIPELINE", "SCALE"), help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.seed, args.workdir, args.latency_ms / 1000)
+        return
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        regressions = compare(old, new, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\nРегрессии ({len(regressions)}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nРегрессий нет")
+        return
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "runs": [],
+    }
+    for scale in args.scales:
+        for pipeline in args.pipelines:
+            result = run_isolated(pipeline, scale, args.seed, args.latency_ms / 1000, max(1, args.repeat))
+            report["runs"].append(result)
+            print_run(result)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"\nСохранено: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
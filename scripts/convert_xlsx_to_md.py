@@ -5,58 +5,313 @@
     uv run --with openpyxl scripts/convert_xlsx_to_md.py файл.xlsx
     uv run --with openpyxl scripts/convert_xlsx_to_md.py файл.xlsx -o output.md
     uv run --with openpyxl scripts/convert_xlsx_to_md.py файл.xlsx --sheet "Лист1"
+    uv run --with openpyxl scripts/convert_xlsx_to_md.py файл.xlsx --max-rows 1000            # первые 1000 строк
+    uv run --with openpyxl scripts/convert_xlsx_to_md.py файл.xlsx --max-rows 1000 --sample   # случайные 1000
+
+  Пакетный режим (несколько файлов, маски, все листы):
+    uv run --with openpyxl scripts/convert_xlsx_to_md.py funnel_report.xlsx --all-sheets
+    uv run --with openpyxl scripts/convert_xlsx_to_md.py "PRJ_*/**/*.xlsx" --all-sheets --out-dir docs/xlsx --workers 4
+
+Лист читается потоково (openpyxl read_only) и строки таблицы пишутся в
+выходной файл сразу по мере чтения: время линейно по числу строк, память не
+зависит от размера листа. --max-rows без --sample прекращает чтение после N
+строк; с --sample — равномерная выборка N строк по всему листу (резервуар,
+порядок строк сохраняется).
+
+Пакетный режим включается, если файлов несколько (или маска), задан
+--all-sheets или --out-dir. Каждая книга открывается один раз и пишется
+в <имя>.md (рядом с файлом или в --out-dir); с --all-sheets — все листы
+разделами «## Лист». Книги конвертируются параллельно (--workers
+процессов). Если .md новее исходного .xlsx и собран с теми же параметрами
+(--sheet, --all-sheets, --max-rows, --sample — их ключ хранится в манифесте
+.convert_xlsx_to_md.json каталога с .md, сам .md остаётся чистой таблицей),
+файл пропускается (--force — пересобрать всё). Две книги с одинаковым именем из разных каталогов в один --out-dir
+не пишутся: это ошибка до начала конвертации.
 """
 
 import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from openpyxl import load_workbook
 
+FORMAT_VERSION = 1           # менять при изменении формата вывода — пересборка всех .md
+MANIFEST = ".convert_xlsx_to_md.json"     # {имя .md: ключ параметров} в каталоге вывода
+
+
+def _cells(row) -> list[str]:
+    return ["" if cell is None else str(cell) for cell in row]
+
+
+def _reservoir(rows, k: int, seed: int = 0):
+    """Равномерная выборка k строк за один проход, в исходном порядке."""
+    rng = random.Random(seed)
+    sample = []
+    for i, row in enumerate(rows):
+        if i < k:
+            sample.append((i, row))
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                sample[j] = (i, row)
+    sample.sort(key=lambda item: item[0])
+    return [row for _, row in sample]
+
+
+def write_markdown(rows, out, max_rows: int | None = None, sample: bool = False) -> int:
+    """Записать строки листа (первая — заголовок) Markdown-таблицей в out.
+
+    rows — итератор кортежей значений (ws.iter_rows(values_only=True)).
+    Возвращает число записанных строк данных.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        out.write("_Пустой лист_")
+        return 0
+
+    headers = _cells(first)
+    width = len(headers)
+    out.write("| " + " | ".join(headers) + " |\n")
+    out.write("| " + " | ".join(["---"] * width) + " |\n")
+
+    if max_rows is not None:
+        if sample:
+            rows = _reservoir(rows, max_rows)
+        else:
+            rows = (row for _, row in zip(range(max_rows), rows))
+
+    n = 0
+    for row in rows:
+        cells = _cells(row)
+        if len(cells) < width:
+            cells += [""] * (width - len(cells))
+        out.write("| " + " | ".join(cells) + " |\n")
+        n += 1
+    return n
+
+
+def convert_sheet(filepath: str, out, sheet_name: str | None = None,
+                  max_rows: int | None = None, sample: bool = False) -> int:
+    """Потоково конвертировать лист файла в out; возвращает число строк данных."""
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        return write_markdown(ws.iter_rows(values_only=True), out, max_rows, sample)
+    finally:
+        wb.close()
+
+
+def xlsx_to_markdown(filepath: str, sheet_name: str | None = None,
+                     max_rows: int | None = None, sample: bool = False) -> str:
+    buf = io.StringIO()
+    convert_sheet(filepath, buf, sheet_name, max_rows, sample)
+    return buf.getvalue()
+
+
+def convert_workbook(filepath: str, out, sheet_name: str | None = None, all_sheets: bool = False,
+                     max_rows: int | None = None, sample: bool = False) -> list[tuple[str, int]]:
+    """Конвертировать один или все листы книги, открыв её один раз.
 
-def xlsx_to_markdown(filepath: str, sheet_name: str | None = None) -> str:
+    С all_sheets каждый лист — раздел «## имя». Возвращает [(лист, строк)].
+    """
     wb = load_workbook(filepath, read_only=True, data_only=True)
-    ws = wb[sheet_name] if sheet_name else wb.active
+    try:
+        if all_sheets:
+            done = []
+            for i, ws in enumerate(wb.worksheets):
+                out.write(("\n\n" if i else "") + f"## {ws.title}\n\n")
+                done.append((ws.title, write_markdown(ws.iter_rows(values_only=True), out, max_rows, sample)))
+            out.write("\n")
+            return done
+        ws = wb[sheet_name] if sheet_name else wb.active
+        return [(ws.title, write_markdown(ws.iter_rows(values_only=True), out, max_rows, sample))]
+    finally:
+        wb.close()
 
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows:
-        return "_Пустой лист_"
 
-    # Header
-    headers = [str(cell) if cell is not None else "" for cell in rows[0]]
-    md = "| " + " | ".join(headers) + " |\n"
-    md += "| " + " | ".join(["---"] * len(headers)) + " |\n"
+def expand_inputs(patterns: list[str]) -> list[str]:
+    """Пути и маски (в том числе **) → существующие файлы без повторов, по порядку."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        files.extend(m for m in matches if not Path(m).name.startswith("~$"))   # lock-файлы Excel
+    return list(dict.fromkeys(files))
 
-    # Data rows
-    for row in rows[1:]:
-        cells = [str(cell) if cell is not None else "" for cell in row]
-        # Pad if row is shorter than header
-        while len(cells) < len(headers):
-            cells.append("")
-        md += "| " + " | ".join(cells) + " |\n"
 
-    wb.close()
-    return md
+def output_path(source: str, out_dir: str | None) -> Path:
+    src = Path(source)
+    return (Path(out_dir) if out_dir else src.parent) / f"{src.stem}.md"
+
+
+def options_key(source: str, sheet_name: str | None, all_sheets: bool,
+                max_rows: int | None, sample: bool) -> str:
+    """Хэш всего, что влияет на .md, кроме содержимого .xlsx."""
+    options = {"source": str(Path(source).resolve()), "sheet": sheet_name, "all_sheets": all_sheets,
+               "max_rows": max_rows, "sample": sample, "format": FORMAT_VERSION}
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def read_manifest(out_dir: Path) -> dict:
+    """Ключи параметров .md каталога: {имя .md: ключ} ({} — манифеста нет или он повреждён)."""
+    try:
+        entries = json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def write_manifest(out_dir: Path, entries: dict) -> None:
+    """Записать манифест (через временный файл); записи удалённых .md отбрасываются."""
+    entries = {name: key for name, key in sorted(entries.items()) if (out_dir / name).exists()}
+    path = out_dir / MANIFEST
+    tmp = Path(f"{path}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(entries, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def is_fresh(source: str, target: Path, key: str, manifest: dict) -> bool:
+    """.md не старше .xlsx и собран с теми же параметрами — пересобирать не нужно."""
+    if not target.exists() or target.stat().st_mtime < Path(source).stat().st_mtime:
+        return False
+    return manifest.get(target.name) == key
+
+
+def find_collisions(targets: list[tuple[str, Path]]) -> dict[Path, list[str]]:
+    """Выходные .md, в которые попадает больше одной книги: {target: [источники]}."""
+    by_target = {}
+    for source, target in targets:
+        by_target.setdefault(target.resolve(), []).append(source)
+    return {target: sources for target, sources in by_target.items() if len(sources) > 1}
+
+
+def _convert_job(job: tuple) -> tuple:
+    """Задача пула: одна книга → один .md (через временный файл)."""
+    source, target, sheet_name, all_sheets, max_rows, sample = job
+    t0 = time.perf_counter()
+    tmp = Path(f"{target}.{os.getpid()}.tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as out:
+            sheets = convert_workbook(source, out, sheet_name, all_sheets, max_rows, sample)
+        os.replace(tmp, target)
+    except Exception as e:          # ошибка одной книги не останавливает остальные
+        tmp.unlink(missing_ok=True)
+        return source, str(target), None, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+    return source, str(target), sheets, None, time.perf_counter() - t0
+
+
+def convert_batch(files: list[str], out_dir: str | None = None, output: str | None = None,
+                  sheet_name: str | None = None, all_sheets: bool = False, max_rows: int | None = None,
+                  sample: bool = False, workers: int = 1, force: bool = False) -> int:
+    """Пакетная конвертация; возвращает число книг с ошибками.
+
+    ValueError — если несколько книг попадают в один .md (до конвертации).
+    """
+    targets = [(source, Path(output) if output else output_path(source, out_dir)) for source in files]
+    collisions = find_collisions(targets)
+    if collisions:
+        raise ValueError("несколько книг пишутся в один .md:\n" + "\n".join(
+            f"  {target}: {', '.join(sources)}" for target, sources in collisions.items()))
+
+    manifests = {target.parent: read_manifest(target.parent) for _, target in targets}
+    jobs, keys, skipped = [], {}, []
+    for source, target in targets:
+        key = options_key(source, sheet_name, all_sheets, max_rows, sample)
+        if not force and is_fresh(source, target, key, manifests[target.parent]):
+            skipped.append(target)
+        else:
+            keys[str(target)] = key
+            jobs.append((source, target, sheet_name, all_sheets, max_rows, sample))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_convert_job, jobs))
+    else:
+        results = [_convert_job(job) for job in jobs]
+
+    errors, changed = 0, set()
+    for source, target, sheets, error, seconds in results:
+        target = Path(target)
+        if error:
+            errors += 1
+            manifests[target.parent].pop(target.name, None)
+            changed.add(target.parent)
+            print(f"Ошибка: {source}: {error}", file=sys.stderr)
+            continue
+        manifests[target.parent][target.name] = keys[str(target)]
+        changed.add(target.parent)
+        rows = sum(n for _, n in sheets)
+        print(f"Сохранено: {target} (листов: {len(sheets)}, строк: {rows:,}, {seconds:.1f} с)")
+    for out_dir in changed:
+        write_manifest(out_dir, manifests[out_dir])
+    for target in skipped:
+        print(f"Без изменений: {target}")
+    return errors
 
 
 def main():
     parser = argparse.ArgumentParser(description="Excel → Markdown")
-    parser.add_argument("file", help="Путь к .xlsx файлу")
+    parser.add_argument("files", nargs="+", metavar="file",
+                        help="Путь к .xlsx файлу; несколько файлов или маска — пакетный режим")
     parser.add_argument("-o", "--output", help="Выходной .md файл (по умолчанию — stdout)")
     parser.add_argument("--sheet", help="Имя листа (по умолчанию — активный)")
+    parser.add_argument("--all-sheets", action="store_true", help="Все листы книги, разделами «## Лист»")
+    parser.add_argument("--out-dir", help="Каталог для .md в пакетном режиме (по умолчанию — рядом с .xlsx)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Процессов в пакетном режиме (по умолчанию — число CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="Пересобрать, даже если .md новее .xlsx и собран с теми же параметрами")
+    parser.add_argument("--max-rows", type=int, metavar="N",
+                        help="Не больше N строк данных (по умолчанию — все)")
+    parser.add_argument("--sample", action="store_true",
+                        help="С --max-rows: случайная выборка N строк по всему листу вместо первых N")
     args = parser.parse_args()
 
-    if not Path(args.file).exists():
-        print(f"Файл не найден: {args.file}", file=sys.stderr)
+    files = expand_inputs(args.files)
+    missing = [f for f in files if not Path(f).exists()]
+    if missing or not files:
+        print(f"Файл не найден: {', '.join(missing or args.files)}", file=sys.stderr)
         sys.exit(1)
+    if args.max_rows is not None and args.max_rows < 0:
+        parser.error("--max-rows должен быть ≥ 0")
+    if args.sample and args.max_rows is None:
+        parser.error("--sample работает только вместе с --max-rows")
+    if args.all_sheets and args.sheet:
+        parser.error("--sheet и --all-sheets взаимоисключающие")
 
-    result = xlsx_to_markdown(args.file, args.sheet)
+    batch = len(files) > 1 or len(args.files) > 1 or any(glob.has_magic(p) for p in args.files) \
+        or args.all_sheets or args.out_dir
+    if batch:
+        if args.output and len(files) > 1:
+            parser.error("-o — только для одного файла; для нескольких — --out-dir")
+        try:
+            errors = convert_batch(files, args.out_dir, args.output, args.sheet, args.all_sheets,
+                                   args.max_rows, args.sample, args.workers, args.force)
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(1 if errors else 0)
 
     if args.output:
-        Path(args.output).write_text(result, encoding="utf-8")
+        with open(args.output, "w", encoding="utf-8") as out:
+            convert_sheet(files[0], out, args.sheet, args.max_rows, args.sample)
+        # .md перезаписан без пакетного режима — его ключ в манифесте больше не верен
+        target = Path(args.output)
+        manifest = read_manifest(target.parent)
+        if manifest.pop(target.name, None) is not None:
+            write_manifest(target.parent, manifest)
         print(f"Сохранено: {args.output}")
     else:
-        print(result)
+        convert_sheet(files[0], sys.stdout, args.sheet, args.max_rows, args.sample)
+        sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
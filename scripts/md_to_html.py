@@ -4,10 +4,32 @@
 Использование:
     uv run --with markdown scripts/md_to_html.py отчёт.md
     uv run --with markdown scripts/md_to_html.py отчёт.md -o отчёт.html
+
+  Сайт из каталога отчётов (пакетный режим):
+    uv run --with markdown scripts/md_to_html.py PRJ_ANALYTICS/mpstats/reports --site site/reports
+    uv run --with markdown scripts/md_to_html.py PRJ_ANALYTICS PRJ_ВЫБОР_НИШИ "docs/*.md" --site site --workers 4
+
+В режиме --site входы — файлы, каталоги (все .md внутри) и маски. Страницы
+пишутся в каталог сайта с той же структурой папок, ссылки на .md
+переписываются на .html, строится index.html со списком страниц.
+Пересобираются только изменённые страницы: хэш содержимого каждого .md
+хранится в манифесте .md_to_html.json в каталоге сайта под путём страницы
+относительно сайта (вместе с хэшем шаблона и корнем входов — смена шаблона
+или корня, т.е. другой набор входов, пересобирает всё). Страницы удалённых
+.md удаляются, опустевшие папки сайта — тоже. Один конвертер Markdown на процесс переиспользуется через
+reset(); при большом числе изменённых страниц — параллельно (--workers).
 """
 
 import argparse
+import glob
+import hashlib
+import html
+import json
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import markdown
@@ -35,26 +57,175 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </body>
 </html>"""
 
+EXTENSIONS = ["tables", "fenced_code"]
+MANIFEST = ".md_to_html.json"
+PARALLEL_MIN = 32          # меньше изменённых страниц — быстрее без пула процессов
+# Хэш всего, что влияет на вывод, кроме самого .md: смена — пересборка всех страниц
+BUILD_KEY = hashlib.sha256(f"{HTML_TEMPLATE}{EXTENSIONS}{markdown.__version__}".encode()).hexdigest()[:16]
+
+_converter = None
+_MD_LINK = re.compile(r'href="(?![a-z][a-z0-9+.-]*:|/|#)([^"#]+)\.md(#[^"]*)?"', re.IGNORECASE)
+_HEADING = re.compile(r"^#\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+def render(text: str) -> str:
+    """Markdown → HTML-фрагмент одним конвертером на процесс (reset вместо создания)."""
+    global _converter
+    if _converter is None:
+        _converter = markdown.Markdown(extensions=EXTENSIONS)
+    return _converter.reset().convert(text)
+
 
 def md_to_html(filepath: str) -> str:
     text = Path(filepath).read_text(encoding="utf-8")
     title = Path(filepath).stem
-    html_content = markdown.markdown(text, extensions=["tables", "fenced_code"])
+    html_content = render(text)
     return HTML_TEMPLATE.format(title=title, content=html_content)
 
 
+def page_title(text: str, fallback: str) -> str:
+    """Первый заголовок «# …» страницы или имя файла."""
+    m = _HEADING.search(text)
+    return m.group(1) if m else fallback
+
+
+def collect_pages(inputs: list[str]) -> tuple[Path, list[Path]]:
+    """Файлы, каталоги и маски → (общий корень, .md файлы без повторов)."""
+    files = []
+    for item in inputs:
+        if glob.has_magic(item):
+            files.extend(Path(p) for p in sorted(glob.glob(item, recursive=True)))
+        elif Path(item).is_dir():
+            files.extend(sorted(Path(item).rglob("*.md")))
+        else:
+            files.append(Path(item))
+    files = [p.resolve() for p in dict.fromkeys(files) if p.suffix.lower() == ".md" and p.is_file()]
+    if not files:
+        return Path.cwd(), []
+    root = Path(os.path.commonpath([p.parent for p in files]))
+    return root, files
+
+
+def _build_page(job: tuple) -> tuple:
+    """Задача (возможно, в пуле): одна страница сайта."""
+    source, target, digest = job
+    text = Path(source).read_text(encoding="utf-8")
+    title = page_title(text, Path(source).stem)
+    content = _MD_LINK.sub(r'href="\1.html\2"', render(text))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(HTML_TEMPLATE.format(title=html.escape(title), content=content), encoding="utf-8")
+    return str(target), digest, title
+
+
+def remove_pages(site: Path, rels: list[str]) -> None:
+    """Удалить страницы сайта и папки, которые после этого опустели."""
+    site = site.resolve()
+    for rel in rels:
+        target = site / Path(rel).with_suffix(".html")
+        target.unlink(missing_ok=True)
+        for folder in target.parents:
+            if folder == site or site not in folder.parents:
+                break
+            try:
+                folder.rmdir()
+            except OSError:         # не пустая или уже удалена
+                break
+
+
+def render_index(pages: dict, title: str) -> str:
+    """index.html: страницы по папкам, в алфавитном порядке путей."""
+    lines, folder = [f"<h1>{html.escape(title)}</h1>"], None
+    for rel in sorted(pages):
+        parent = str(Path(rel).parent)
+        if parent != folder:
+            if folder is not None:
+                lines.append("</ul>")
+            if parent != ".":
+                lines.append(f"<h2>{html.escape(parent)}</h2>")
+            lines.append("<ul>")
+            folder = parent
+        href = html.escape(str(Path(rel).with_suffix(".html").as_posix()), quote=True)
+        lines.append(f'<li><a href="{href}">{html.escape(pages[rel]["title"])}</a></li>')
+    if folder is not None:
+        lines.append("</ul>")
+    return HTML_TEMPLATE.format(title=html.escape(title), content="\n".join(lines))
+
+
+def build_site(inputs: list[str], site_dir: str, workers: int = 1, force: bool = False,
+               title: str = "Отчёты") -> dict:
+    """Инкрементальная сборка сайта; возвращает статистику сборки."""
+    t0 = time.perf_counter()
+    site = Path(site_dir)
+    root, files = collect_pages(inputs)
+    manifest_path = site / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    # Ключи манифеста — пути страниц в каталоге сайта; хэши переиспользуются,
+    # только если входы разбирались от того же корня
+    reuse = manifest.get("build") == BUILD_KEY and manifest.get("root") == str(root) and not force
+    old = manifest.get("pages", {}) if reuse else {}
+
+    pages, jobs = {}, []
+    for source in files:
+        rel = source.relative_to(root).with_suffix(".html").as_posix()
+        target = site / rel
+        digest = hashlib.sha256(source.read_bytes()).hexdigest()
+        entry = old.get(rel)
+        if entry and entry["hash"] == digest and target.exists():
+            pages[rel] = entry
+        else:
+            jobs.append((str(source), target, digest))
+
+    if workers > 1 and len(jobs) >= PARALLEL_MIN:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(_build_page, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        built = [_build_page(job) for job in jobs]
+    for (_, target, _), (_, digest, page) in zip(jobs, built):
+        pages[target.relative_to(site).as_posix()] = {"hash": digest, "title": page}
+
+    removed = [rel for rel in manifest.get("pages", {}) if Path(rel).with_suffix(".html").as_posix() not in pages]
+    remove_pages(site, removed)
+
+    site.mkdir(parents=True, exist_ok=True)
+    (site / "index.html").write_text(render_index(pages, title), encoding="utf-8")
+    manifest_path.write_text(json.dumps({"build": BUILD_KEY, "root": str(root), "pages": pages},
+                                        ensure_ascii=False, indent=1), encoding="utf-8")
+    return {"pages": len(pages), "built": len(jobs), "removed": len(removed),
+            "seconds": time.perf_counter() - t0}
+
+
 def main():
     parser = argparse.ArgumentParser(description="Markdown → HTML")
-    parser.add_argument("file", help="Путь к .md файлу")
+    parser.add_argument("files", nargs="+", metavar="file",
+                        help="Путь к .md файлу; с --site — файлы, каталоги и маски")
     parser.add_argument("-o", "--output", help="Выходной .html файл (по умолчанию — <имя>.html)")
+    parser.add_argument("--site", metavar="DIR", help="Собрать сайт в каталог DIR (инкрементально, с index.html)")
+    parser.add_argument("--title", default="Отчёты", help="Заголовок index.html (по умолчанию — «Отчёты»)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Процессов для сборки сайта (по умолчанию — число CPU)")
+    parser.add_argument("--force", action="store_true", help="Пересобрать все страницы сайта")
     args = parser.parse_args()
 
-    if not Path(args.file).exists():
-        print(f"Файл не найден: {args.file}", file=sys.stderr)
+    if args.site:
+        if args.output:
+            parser.error("-o не используется вместе с --site")
+        stats = build_site(args.files, args.site, args.workers, args.force, args.title)
+        print(f"Сайт: {args.site} — страниц: {stats['pages']}, пересобрано: {stats['built']}, "
+              f"удалено: {stats['removed']}, {stats['seconds']:.2f} с")
+        return
+
+    if len(args.files) > 1:
+        parser.error("несколько файлов — только с --site")
+    file = args.files[0]
+    if not Path(file).exists():
+        print(f"Файл не найден: {file}", file=sys.stderr)
         sys.exit(1)
 
-    result = md_to_html(args.file)
-    output = args.output or Path(args.file).with_suffix(".html").name
+    result = md_to_html(file)
+    output = args.output or Path(file).with_suffix(".html").name
 
     Path(output).write_text(result, encoding="utf-8")
     print(f"Сохранено: {output}")
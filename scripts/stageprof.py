@@ -0,0 +1,303 @@
+"""Замер этапов аналитических скриптов: время, CPU, память, строки, профиль.
+
+Скрипт размечает этапы (загрузка, агрегация, Excel, графики), а флаги
+командной строки решают, что с ними делать:
+  --stages              таблица этапов в stderr по завершении
+  --trace-memory        пик и прирост выделенной памяти этапа (tracemalloc)
+  --profile STAGE       профиль этапа (несколько через запятую, all — все)
+  --profile-format      pstats (cProfile, для snakeviz / python -m pstats) или
+                        collapsed (стеки «a;b;c N» для flamegraph.pl / speedscope)
+  --profile-dir DIR     куда писать профили (по умолчанию profiles/)
+  --stage-json FILE     записи этапов в JSON (или переменная STAGEPROF_JSON)
+
+Без флагов этап стоит два вызова таймера и одну запись в список — вывод
+скрипта не меняется. Этапы могут быть вложенными; повторяющийся этап
+(в цикле) профилируется накопительно, файл профиля — один на имя.
+
+Использование:
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+    import stageprof
+
+    stageprof.add_arguments(parser)
+    args = parser.parse_args()
+    stageprof.configure_from_args(args)
+
+    with stageprof.stage("load") as st:
+        rows = read_rows(path)
+        st.rows = len(rows)
+
+    # длинный участок кода модуля — без лишнего отступа
+    stageprof.begin("render")
+    ...
+    stageprof.end(rows=8)
+"""
+
+import atexit
+import cProfile
+import contextlib
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+ENV_JSON = "STAGEPROF_JSON"
+SAMPLE_INTERVAL = 0.005      # collapsed: период сэмплирования, с (чаще GIL всё равно не отдаётся)
+FORMATS = ("pstats", "collapsed")
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10   # macOS — байты, Linux — КБ
+
+
+class Stage:
+    """Запись одного прохода этапа; rows можно задать внутри этапа."""
+
+    __slots__ = ("name", "depth", "rows", "wall", "cpu", "peak_rss_mb", "alloc_peak_mb", "alloc_net_mb",
+                 "_wall0", "_cpu0", "_mem0", "_mem_peak")
+
+    def __init__(self, name, depth, rows=None):
+        self.name = name
+        self.depth = depth
+        self.rows = rows
+        self.wall = self.cpu = self.peak_rss_mb = None
+        self.alloc_peak_mb = self.alloc_net_mb = None
+
+    def as_dict(self):
+        out = {"stage": self.name, "depth": self.depth, "wall": self.wall, "cpu": self.cpu,
+               "peak_rss_mb": self.peak_rss_mb}
+        if self.rows is not None:
+            out["rows"] = self.rows
+        if self.alloc_peak_mb is not None:
+            out["alloc_peak_mb"] = self.alloc_peak_mb
+            out["alloc_net_mb"] = self.alloc_net_mb
+        return out
+
+
+class _Sampler(threading.Thread):
+    """Сэмплер стека потока: счётчик свёрнутых стеков «файл:функция;...»."""
+
+    def __init__(self, thread_id, counts, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.counts = counts
+        self.interval = interval
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+class StageProfiler:
+    """Стек открытых этапов и список завершённых записей."""
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self.report = False
+        self.trace_memory = False
+        self.profile = set()
+        self.profile_format = "pstats"
+        self.profile_dir = Path("profiles")
+        self.json_path = os.environ.get(ENV_JSON)
+        self._profiles = {}       # имя этапа → cProfile.Profile (накопительно)
+        self._stacks = {}         # имя этапа → Counter свёрнутых стеков
+        self._active = None       # (имя, профилировщик) — профилируется один этап за раз
+        self._atexit = False
+        if self.json_path:
+            self._register()
+
+    def configure(self, report=False, trace_memory=False, profile=(), profile_format="pstats",
+                  profile_dir="profiles", json_path=None):
+        if profile_format not in FORMATS:
+            raise ValueError(f"формат профиля: {' или '.join(FORMATS)}, получено: {profile_format!r}")
+        self.report = report
+        self.trace_memory = trace_memory
+        self.profile = set(profile)
+        self.profile_format = profile_format
+        self.profile_dir = Path(profile_dir)
+        self.json_path = json_path or self.json_path
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if report or self.profile or self.json_path:
+            self._register()
+
+    def _register(self):
+        if not self._atexit:
+            atexit.register(self.finish)
+            self._atexit = True
+
+    # ── Этапы ──
+
+    def begin(self, name, rows=None):
+        st = Stage(name, len(self._stack), rows)
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._mem_peak = max(parent._mem_peak, peak)
+            tracemalloc.reset_peak()
+            st._mem0, st._mem_peak = current, current
+        self._stack.append(st)
+        self._start_profile(name)
+        st._cpu0 = time.process_time()
+        st._wall0 = time.perf_counter()
+        return st
+
+    def end(self, rows=None):
+        if not self._stack:
+            raise RuntimeError("stageprof.end() без открытого этапа")
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        st = self._stack.pop()
+        self._stop_profile(st.name)
+        st.wall = wall - st._wall0
+        st.cpu = cpu - st._cpu0
+        st.peak_rss_mb = _peak_rss_mb()
+        if rows is not None:
+            st.rows = rows
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, st._mem_peak)
+            st.alloc_peak_mb = (peak - st._mem0) / 2**20
+            st.alloc_net_mb = (current - st._mem0) / 2**20
+            if self._stack:
+                parent = self._stack[-1]
+                parent._mem_peak = max(parent._mem_peak, peak)
+        self.records.append(st)
+        return st
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        st = self.begin(name, rows)
+        try:
+            yield st
+        finally:
+            if self._stack and self._stack[-1] is st:
+                self.end()
+
+    # ── Профили ──
+
+    def _wants_profile(self, name):
+        return self._active is None and ("all" in self.profile or name in self.profile)
+
+    def _start_profile(self, name):
+        if not self._wants_profile(name):
+            return
+        if self.profile_format == "pstats":
+            prof = self._profiles.setdefault(name, cProfile.Profile())
+            prof.enable()
+        else:
+            prof = _Sampler(threading.get_ident(), self._stacks.setdefault(name, Counter()))
+            prof.start()
+        self._active = (name, prof)
+
+    def _stop_profile(self, name):
+        if self._active is None or self._active[0] != name:
+            return
+        prof = self._active[1]
+        if isinstance(prof, cProfile.Profile):
+            prof.disable()
+        else:
+            prof.stop()
+        self._active = None
+
+    def _write_profiles(self):
+        written = []
+        if self._profiles or self._stacks:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+        for name, prof in self._profiles.items():
+            path = self.profile_dir / f"{_slug(name)}.pstats"
+            prof.dump_stats(path)
+            written.append(path)
+        for name, counts in self._stacks.items():
+            path = self.profile_dir / f"{_slug(name)}.collapsed"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, n in sorted(counts.items()):
+                    f.write(f"{stack} {n}\n")
+            written.append(path)
+        return written
+
+    # ── Итоги ──
+
+    def finish(self):
+        """Закрыть незавершённые этапы, записать профили, JSON и таблицу."""
+        while self._stack:
+            self.end()
+        for path in self._write_profiles():
+            print(f"Профиль: {path}", file=sys.stderr)
+        if self.json_path:
+            Path(self.json_path).write_text(json.dumps(
+                {"script": sys.argv[0], "stages": [st.as_dict() for st in self.records]},
+                ensure_ascii=False, indent=1), encoding="utf-8")
+        if self.report:
+            print_report(self.records, file=sys.stderr)
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "stage"
+
+
+def print_report(records, file=None):
+    """Таблица этапов: отступ — вложенность, строк/с — если задано число строк."""
+    file = file or sys.stdout
+    memory = any(st.alloc_peak_mb is not None for st in records)
+    header = f"\n{'Этап':<28}{'Время, с':>10}{'CPU, с':>10}{'Строк':>12}{'Строк/с':>12}{'RSS, МБ':>9}"
+    print(header + (f"{'Пик alloc, МБ':>15}" if memory else ""), file=file)
+    # Вложенные этапы завершаются раньше родителя — выводим в порядке начала
+    for st in sorted(records, key=lambda s: s._wall0):
+        rows = f"{st.rows:,}" if st.rows is not None else ""
+        rate = f"{st.rows / st.wall:,.0f}" if st.rows and st.wall > 0 else ""
+        line = (f"{'  ' * st.depth + st.name:<28}{st.wall:>10.3f}{st.cpu:>10.3f}{rows:>12}{rate:>12}"
+                f"{st.peak_rss_mb:>9.0f}")
+        if memory:
+            line += f"{st.alloc_peak_mb:>15.1f}" if st.alloc_peak_mb is not None else ""
+        print(line, file=file)
+
+
+# ── Модульный интерфейс (один профилировщик на процесс) ──
+
+PROFILER = StageProfiler()
+stage = PROFILER.stage
+begin = PROFILER.begin
+end = PROFILER.end
+configure = PROFILER.configure
+
+
+def add_arguments(parser):
+    """Добавить в argparse флаги профилирования этапов."""
+    group = parser.add_argument_group("профилирование этапов")
+    group.add_argument("--stages", action="store_true", help="Таблица времени этапов в stderr по завершении")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="Пик выделенной памяти по этапам (tracemalloc, замедляет работу)")
+    group.add_argument("--profile", metavar="STAGE",
+                       help="Профилировать этапы (через запятую; all — все)")
+    group.add_argument("--profile-format", choices=FORMATS, default="pstats",
+                       help="pstats (cProfile) или collapsed (стеки для флейм-графа)")
+    group.add_argument("--profile-dir", default="profiles", help="Каталог профилей (по умолчанию profiles/)")
+    group.add_argument("--stage-json", metavar="FILE", help=f"Записи этапов в JSON (или ${ENV_JSON})")
+    return group
+
+
+def configure_from_args(args):
+    profile = [p.strip() for p in (args.profile or "").split(",") if p.strip()]
+    configure(report=args.stages, trace_memory=args.trace_memory, profile=profile,
+              profile_format=args.profile_format, profile_dir=args.profile_dir, json_path=args.stage_json)